@@ -0,0 +1,134 @@
+"""Before/after benchmark for the pairing and ordering engine.
+
+Compares the previous row-wise implementation (``apply`` + per-group sort +
+``concat``) with :func:`order_by_pairing` on synthetic filtered frames.
+
+Usage::
+
+    python -m backend.benchmarks.bench_pairing --sizes 10000,100000,1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from backend.repository.xls_parser import order_by_pairing
+
+STATIONS = ["TNR", "TLE", "SVB", "DIE", "NOS", "CDG", "MRU", "RUN", "FTU"]
+IMMAS = ["5RMJF", "5REJC", "5REJH", "5REJK", "5REJB", "F-1"]
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return a filtered-looking frame with ``rows`` legs on a single day."""
+    rng = np.random.default_rng(seed)
+    stations = np.array(STATIONS)
+    origin = rng.integers(0, len(STATIONS), rows)
+    offset = rng.integers(1, len(STATIONS), rows)
+    depart = stations[origin]
+    arrivee = stations[(origin + offset) % len(STATIONS)]
+    start = pd.Timestamp(datetime(2025, 7, 11))
+    minutes = rng.integers(0, 24 * 60, rows)
+    sd_loc = start + pd.to_timedelta(minutes, unit="m")
+    return pd.DataFrame(
+        {
+            "Num Vol": [f"MD{i}" for i in range(rows)],
+            "Départ": depart,
+            "Arrivée": arrivee,
+            "Imma": rng.choice(IMMAS, rows),
+            "SD LOC": sd_loc,
+            "SA LOC": sd_loc + pd.Timedelta(hours=2),
+        }
+    )
+
+
+def legacy_order(filtered: pd.DataFrame) -> pd.DataFrame:
+    """Reference implementation of the previous row-wise ordering."""
+    filtered = filtered.copy()
+    filtered["pair_key"] = filtered.apply(
+        lambda r: tuple(sorted([r["Départ"], r["Arrivée"]])), axis=1
+    )
+
+    grouped = []
+    for _, group in filtered.groupby("pair_key"):
+        group_sorted = group.sort_values("SD LOC")
+        grouped.append((group_sorted["SD LOC"].iloc[0], group_sorted))
+
+    grouped.sort(key=lambda x: x[0])
+    ordered = pd.concat([g[1] for g in grouped], ignore_index=True)
+    return ordered.drop(columns=["pair_key"])
+
+
+def legacy_walk(ordered: pd.DataFrame) -> int:
+    """Walk rows with ``iterrows`` like the previous row builder did."""
+    count = 0
+    for _, row in ordered.iterrows():
+        _ = (row["Num Vol"], row["Départ"], row["Arrivée"], row["Imma"])
+        count += 1
+    return count
+
+
+def ordering_key(ordered: pd.DataFrame) -> list[tuple]:
+    """Return the (SD LOC, pair) sequence that defines operational order.
+
+    Legs sharing a pair and departure time are ties; the previous engine
+    broke them with an unstable per-group sort, the columnar one keeps
+    input order.
+    """
+    pairs = [
+        tuple(sorted(p)) for p in zip(ordered["Départ"], ordered["Arrivée"])
+    ]
+    return list(zip(ordered["SD LOC"], pairs))
+
+
+def _timed(func: Callable[..., Any], *args: Any) -> tuple[float, Any]:
+    start = time.perf_counter()
+    value = func(*args)
+    return time.perf_counter() - start, value
+
+
+def run(sizes: list[int]) -> list[dict[str, float]]:
+    """Time both engines for each size and return one result per size."""
+    results = []
+    for rows in sizes:
+        frame = make_frame(rows)
+        legacy_s, legacy = _timed(legacy_order, frame)
+        walk_s, _ = _timed(legacy_walk, legacy)
+        columnar_s, columnar = _timed(order_by_pairing, frame)
+        assert ordering_key(legacy) == ordering_key(columnar)
+        results.append(
+            {
+                "rows": rows,
+                "before_s": legacy_s + walk_s,
+                "after_s": columnar_s,
+                "speedup": (legacy_s + walk_s) / columnar_s,
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000,1000000",
+        help="Comma-separated row counts",
+    )
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    print(f"{'rows':>10} {'before (s)':>12} {'after (s)':>12} {'speedup':>9}")
+    for r in run(sizes):
+        print(
+            f"{r['rows']:>10} {r['before_s']:>12.3f} "
+            f"{r['after_s']:>12.3f} {r['speedup']:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Per-stage benchmark of the /process pipeline with regression checks.
+
+Each size is generated with :mod:`schedule_generator`, written as a real
+workbook and pushed through every stage separately: read, date coercion,
+filter, pairing, row building, JSON serialization and a full HTTP round
+trip through the FastAPI app. Results are written as JSON and can be
+compared with a saved baseline; a stage slower than the baseline by more
+than the tolerance is reported as a regression and the exit status is 1.
+
+Usage::
+
+    python -m backend.benchmarks.bench_pipeline --sizes 1000,10000 \\
+        --formats xls,xlsx --output results.json
+    python -m backend.benchmarks.bench_pipeline --baseline results.json \\
+        --tolerance 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from io import BytesIO
+from typing import Any
+
+import pandas as pd
+
+from backend.benchmarks.schedule_generator import (
+    FORMATS,
+    XLS_MAX_ROWS,
+    generate_schedule,
+    write_schedule,
+)
+from backend.repository.xls_parser import (
+    MODE_OFFSETS,
+    allocate_batch,
+    default_rules,
+    encode_codes,
+    normalize_dates,
+    order_by_pairing,
+)
+from backend.repository.xls_reader import read_schedule
+
+STAGES = (
+    "read",
+    "coerce",
+    "filter",
+    "pairing",
+    "build",
+    "serialize",
+    "http",
+)
+
+# Stages faster than this are too noisy to flag as regressions
+MIN_SECONDS = 0.005
+
+
+@dataclass(frozen=True)
+class Regression:
+    """A stage slower than its baseline beyond the tolerance."""
+
+    fmt: str
+    rows: int
+    stage: str
+    baseline_s: float
+    current_s: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_s / self.baseline_s
+
+
+def run(
+    sizes: Iterable[int],
+    formats: Iterable[str] = FORMATS,
+    repeat: int = 3,
+    seed: int = 0,
+    mode: str = "commandes",
+    http: bool = True,
+) -> dict[str, Any]:
+    """Time every stage for each format and size.
+
+    The fastest of ``repeat`` runs is kept per stage. ``.xls`` sizes
+    beyond one sheet are skipped.
+    """
+    today = date.today()
+    results = []
+    for fmt in formats:
+        for rows in sizes:
+            if fmt == "xls" and rows > XLS_MAX_ROWS:
+                continue
+            frame = generate_schedule(rows, seed=seed, start=today)
+            buffer = BytesIO()
+            write_schedule(frame, buffer, fmt)
+            data = buffer.getvalue()
+            stages = time_stages(data, mode, today, repeat, http)
+            results.append(
+                {
+                    "format": fmt,
+                    "rows": rows,
+                    "file_bytes": len(data),
+                    "stages": stages,
+                    "total_s": sum(stages.values()),
+                }
+            )
+    return {"meta": _meta(seed, repeat, mode), "results": results}
+
+
+def time_stages(
+    data: bytes, mode: str, today: date, repeat: int, http: bool = True
+) -> dict[str, float]:
+    """Return the best time in seconds of each stage over ``repeat`` runs."""
+    target = pd.Timestamp(today + timedelta(days=MODE_OFFSETS[mode]))
+    rules = default_rules()
+    best: dict[str, float] = {}
+    for _ in range(max(1, repeat)):
+        timings: dict[str, float] = {}
+        raw = _timed(
+            timings,
+            "read",
+            lambda: encode_codes(read_schedule(BytesIO(data))),
+        )
+        df = _timed(timings, "coerce", normalize_dates, raw)
+        filtered = _timed(
+            timings,
+            "filter",
+            lambda: df[df["SD LOC"].dt.normalize() == target],
+        )
+        ordered = _timed(timings, "pairing", order_by_pairing, filtered)
+        batch = _timed(timings, "build", allocate_batch, ordered, mode, rules)
+        _timed(timings, "serialize", batch.to_json)
+        if http:
+            _timed(timings, "http", _post_process, data, mode)
+        for stage, seconds in timings.items():
+            best[stage] = min(seconds, best.get(stage, seconds))
+    return best
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+    min_seconds: float = MIN_SECONDS,
+) -> list[Regression]:
+    """Return the stages of ``current`` slower than ``baseline``.
+
+    A stage regresses when it takes more than ``(1 + tolerance)`` times
+    its baseline and more than ``min_seconds``. Sizes or stages missing
+    from either side are ignored.
+    """
+    previous = {
+        (r["format"], r["rows"]): r["stages"] for r in baseline["results"]
+    }
+    regressions = []
+    for result in current["results"]:
+        reference = previous.get((result["format"], result["rows"]))
+        if reference is None:
+            continue
+        for stage, seconds in result["stages"].items():
+            base = reference.get(stage)
+            if base is None or seconds <= min_seconds:
+                continue
+            if seconds > base * (1 + tolerance):
+                regressions.append(
+                    Regression(
+                        result["format"], result["rows"], stage, base, seconds
+                    )
+                )
+    return regressions
+
+
+def format_table(report: dict[str, Any]) -> str:
+    header = f"{'format':>6} {'rows':>8} " + " ".join(
+        f"{stage:>9}" for stage in STAGES
+    )
+    lines = [header]
+    for r in report["results"]:
+        cells = " ".join(
+            f"{r['stages'][s]:>9.4f}" if s in r["stages"] else f"{'-':>9}"
+            for s in STAGES
+        )
+        lines.append(f"{r['format']:>6} {r['rows']:>8} {cells}")
+    return "\n".join(lines)
+
+
+def _post_process(data: bytes, mode: str) -> None:
+    from backend.usecase.process_flight_data import (
+        shared_response_cache,
+        shared_schedule_cache,
+    )
+
+    # Every round trip must parse the upload, not hit a cache
+    shared_schedule_cache().clear()
+    shared_response_cache().clear()
+    response = _client().post(
+        "/process",
+        files={"file": ("schedule.xls", data, "application/vnd.ms-excel")},
+        data={"mode": mode},
+    )
+    response.raise_for_status()
+
+
+_CLIENT: Any = None
+
+
+def _client() -> Any:
+    global _CLIENT
+    if _CLIENT is None:
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from backend.delivery.api_routes import router
+
+        app = FastAPI()
+        app.include_router(router)
+        _CLIENT = TestClient(app)
+    return _CLIENT
+
+
+def _timed(
+    timings: dict[str, float],
+    stage: str,
+    func: Callable[..., Any],
+    *args: Any,
+) -> Any:
+    start = time.perf_counter()
+    value = func(*args)
+    timings[stage] = time.perf_counter() - start
+    return value
+
+
+def _meta(seed: int, repeat: int, mode: str) -> dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "seed": seed,
+        "repeat": repeat,
+        "mode": mode,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Per-stage benchmark of the /process pipeline"
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="Comma-separated row counts, up to 1000000",
+    )
+    parser.add_argument(
+        "--formats", default="xls,xlsx", help="Comma-separated: xls,xlsx"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--mode", choices=list(MODE_OFFSETS), default="commandes"
+    )
+    parser.add_argument(
+        "--no-http", action="store_true", help="Skip the HTTP round trip"
+    )
+    parser.add_argument("--output", help="Write the JSON results here")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown per stage, 0.2 meaning 20%% (default)",
+    )
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    formats = [f for f in args.formats.split(",") if f]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(sorted(unknown))}")
+
+    report = run(
+        sizes, formats, args.repeat, args.seed, args.mode, not args.no_http
+    )
+    print(format_table(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(report, out, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.tolerance)
+    for r in regressions:
+        print(
+            f"REGRESSION {r.fmt} {r.rows} {r.stage}: "
+            f"{r.baseline_s:.4f}s -> {r.current_s:.4f}s ({r.ratio:.2f}x)"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Import-time report and cold-start budget for the CLI.
+
+Runs a command under ``python -X importtime`` and reports, per module,
+the self and cumulative import time in microseconds, indented like the
+interpreter's own output. Modules the bare interpreter already imports
+at startup are left out of the total. The run fails when the total
+exceeds the budget, a heavy module shows up or the command exits with
+another status than ``--expect-status``.
+
+Usage::
+
+    python -m backend.benchmarks.import_report -- cli/main.py --help
+    python -m backend.benchmarks.import_report --budget-ms 100 \\
+        -- cli/main.py batch --help
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Cold-start budget of `cli/main.py --help` beyond interpreter startup
+COLD_START_BUDGET_MS = 150.0
+
+# Modules argument handling must never import
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "pydantic",
+    "fastapi",
+    "starlette",
+    "xlrd",
+    "openpyxl",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """One line of ``-X importtime`` output."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass(frozen=True)
+class ImportReport:
+    records: list[ImportRecord]
+    startup: frozenset[str]
+    returncode: int
+
+    @property
+    def own(self) -> list[ImportRecord]:
+        """Top-level imports not done by the bare interpreter."""
+        return [
+            r
+            for r in self.records
+            if r.depth == 0 and r.module not in self.startup
+        ]
+
+    @property
+    def total_ms(self) -> float:
+        return sum(r.cumulative_us for r in self.own) / 1000
+
+    def heavy(self) -> list[str]:
+        """Return the heavy top-level packages that were imported."""
+        found = {
+            r.module.partition(".")[0]
+            for r in self.records
+            if r.module.partition(".")[0] in HEAVY_MODULES
+        }
+        return sorted(found)
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Parse ``-X importtime`` lines, ignoring everything else."""
+    records = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(
+                ImportRecord(
+                    module, int(self_us), int(cumulative_us), len(indent) // 2
+                )
+            )
+    return records
+
+
+def measure(argv: list[str]) -> ImportReport:
+    """Run ``python -X importtime *argv`` from the repository root."""
+    records, returncode = _run(argv)
+    startup, _ = _run(["-c", "pass"])
+    return ImportReport(
+        records, frozenset(r.module for r in startup), returncode
+    )
+
+
+def format_report(report: ImportReport, top: int = 20) -> str:
+    lines = [f"{'self [us]':>10} | {'cumul [us]':>10} | module"]
+    slowest = sorted(report.own, key=lambda r: r.cumulative_us, reverse=True)
+    lines.extend(
+        f"{r.self_us:>10} | {r.cumulative_us:>10} | {r.module}"
+        for r in slowest[:top]
+    )
+    lines.append(f"total: {report.total_ms:.1f} ms")
+    return "\n".join(lines)
+
+
+def _run(argv: list[str]) -> tuple[list[ImportRecord], int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    return parse_importtime(result.stderr), result.returncode
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Per-module import times of a command"
+    )
+    parser.add_argument(
+        "--budget-ms", type=float, default=COLD_START_BUDGET_MS
+    )
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument(
+        "--expect-status",
+        type=int,
+        default=0,
+        help="Exit status the command must return (argparse errors: 2)",
+    )
+    parser.add_argument(
+        "command",
+        nargs=argparse.REMAINDER,
+        help="Script and arguments (default: cli/main.py --help)",
+    )
+    args = parser.parse_args(argv)
+    command = [c for c in args.command if c != "--"] or [
+        "cli/main.py",
+        "--help",
+    ]
+
+    report = measure(command)
+    print(format_report(report, args.top))
+    status = 0
+    if report.returncode != args.expect_status:
+        print(
+            f"COMMAND FAILED: exit status {report.returncode}, "
+            f"expected {args.expect_status}"
+        )
+        status = 1
+    if report.total_ms > args.budget_ms:
+        print(f"OVER BUDGET: {report.total_ms:.1f} > {args.budget_ms} ms")
+        status = 1
+    heavy = report.heavy()
+    if heavy:
+        print(f"HEAVY IMPORTS: {', '.join(heavy)}")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
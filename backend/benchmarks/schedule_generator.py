@@ -0,0 +1,209 @@
+"""Seeded generator of realistic flight schedules for benchmarks.
+
+Legs come in rotations: an aircraft flies out and back on the same day,
+so station pairs repeat the way they do in real exports. Station and
+aircraft mixes are weights, e.g. ``{"TNR": 6, "TLE": 1}``.
+
+Usage::
+
+    python -m backend.benchmarks.schedule_generator --rows 100000 \\
+        --format xlsx --output schedule.xlsx
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterator, Mapping
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+import pandas as pd
+import xlwt
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+from backend.repository.xls_reader import REQUIRED_COLUMNS
+
+FORMATS = ("xls", "xlsx")
+
+# Data rows that fit on one BIFF8 sheet below the header
+XLS_MAX_ROWS = 65535
+
+DEFAULT_STATIONS: dict[str, float] = {
+    "TNR": 8,
+    "TLE": 2,
+    "SVB": 2,
+    "DIE": 2,
+    "NOS": 2,
+    "MJN": 1,
+    "FTU": 1,
+    "RUN": 1,
+    "MRU": 1,
+    "CDG": 1,
+}
+DEFAULT_IMMAS: dict[str, float] = {
+    "5RMJF": 1,
+    "5REJC": 1,
+    "5REJH": 1,
+    "5REJK": 1,
+    "5REJB": 1,
+    "F-OMAD": 0.5,
+}
+
+DATE_FORMAT = "YYYY-MM-DD HH:MM:SS"
+
+
+def generate_schedule(
+    rows: int,
+    seed: int = 0,
+    start: date = date(2025, 7, 10),
+    days: int = 3,
+    stations: Mapping[str, float] | None = None,
+    immas: Mapping[str, float] | None = None,
+) -> pd.DataFrame:
+    """Return ``rows`` legs spread over ``days`` days from ``start``."""
+    if rows < 0 or days < 1:
+        raise ValueError("rows must be >= 0 and days >= 1")
+    station_mix = _weights(stations or DEFAULT_STATIONS)
+    imma_mix = _weights(immas or DEFAULT_IMMAS)
+    if len(station_mix[0]) < 2:
+        raise ValueError("At least two stations are required")
+    rng = np.random.default_rng(seed)
+    rotations = (rows + 1) // 2
+
+    origin = rng.choice(station_mix[0], rotations, p=station_mix[1])
+    destination = rng.choice(station_mix[0], rotations, p=station_mix[1])
+    clash = origin == destination
+    while clash.any():
+        destination[clash] = rng.choice(
+            station_mix[0], int(clash.sum()), p=station_mix[1]
+        )
+        clash = origin == destination
+    imma = rng.choice(imma_mix[0], rotations, p=imma_mix[1])
+
+    day = pd.Timestamp(start) + pd.to_timedelta(
+        rng.integers(0, days, rotations), unit="D"
+    )
+    out_sd = day + pd.to_timedelta(rng.integers(300, 1200, rotations), "m")
+    block = pd.to_timedelta(rng.integers(45, 180, rotations), unit="m")
+    turn = pd.to_timedelta(rng.integers(30, 90, rotations), unit="m")
+    back_sd = out_sd + block + turn
+
+    number = np.arange(rotations) * 2 + 100
+    frame = pd.DataFrame(
+        {
+            "Num Vol": np.concatenate(
+                [[f"MD{n}" for n in number], [f"MD{n + 1}" for n in number]]
+            ),
+            "Départ": np.concatenate([origin, destination]),
+            "Arrivée": np.concatenate([destination, origin]),
+            "Imma": np.concatenate([imma, imma]),
+            "SD LOC": np.concatenate([out_sd, back_sd]),
+            "SA LOC": np.concatenate([out_sd + block, back_sd + block]),
+        }
+    )
+    # Exports list legs by departure, not by rotation
+    order = np.argsort(frame["SD LOC"].to_numpy(), kind="stable")
+    return frame.iloc[order[:rows]].reset_index(drop=True)
+
+
+def write_schedule(
+    frame: pd.DataFrame, target: str | Path | BinaryIO, fmt: str
+) -> None:
+    """Write ``frame`` as a real ``.xls`` (xlwt) or ``.xlsx`` workbook."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    if fmt == "xls":
+        _write_xls(frame, target)
+    else:
+        _write_xlsx(frame, target)
+
+
+def _write_xls(frame: pd.DataFrame, target: str | Path | BinaryIO) -> None:
+    if len(frame) > XLS_MAX_ROWS:
+        raise ValueError(f".xls sheets hold at most {XLS_MAX_ROWS} rows")
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet("Sheet1")
+    date_style = xlwt.easyxf(num_format_str=DATE_FORMAT)
+    for col, header in enumerate(REQUIRED_COLUMNS):
+        sheet.write(0, col, header)
+    for row_index, values in enumerate(_records(frame), 1):
+        for col, value in enumerate(values):
+            if isinstance(value, datetime):
+                sheet.write(row_index, col, value, date_style)
+            else:
+                sheet.write(row_index, col, value)
+    workbook.save(target)
+
+
+def _write_xlsx(frame: pd.DataFrame, target: str | Path | BinaryIO) -> None:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(list(REQUIRED_COLUMNS))
+    for values in _records(frame):
+        row = []
+        for value in values:
+            cell = WriteOnlyCell(sheet, value)
+            if isinstance(value, datetime):
+                cell.number_format = DATE_FORMAT
+            row.append(cell)
+        sheet.append(row)
+    workbook.save(target)
+
+
+def _records(frame: pd.DataFrame) -> Iterator[tuple[Any, ...]]:
+    columns = [
+        frame[name].dt.to_pydatetime()
+        if pd.api.types.is_datetime64_any_dtype(frame[name])
+        else frame[name].to_numpy(object)
+        for name in REQUIRED_COLUMNS
+    ]
+    return zip(*columns)
+
+
+def _weights(mix: Mapping[str, float]) -> tuple[np.ndarray, np.ndarray]:
+    codes = np.array(list(mix), dtype=object)
+    weights = np.array(list(mix.values()), dtype=float)
+    if not len(codes) or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("Mix weights must be >= 0 with a positive sum")
+    return codes, weights / weights.sum()
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse ``"TNR:6,TLE,SVB:2"`` into weights, 1 being the default."""
+    mix: dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        code, _, weight = part.partition(":")
+        try:
+            mix[code] = float(weight) if weight else 1.0
+        except ValueError as exc:
+            raise ValueError(f"Invalid weight in {part!r}") from exc
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--format", choices=FORMATS, default="xls")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="First day of the schedule (default: today)",
+    )
+    parser.add_argument("--stations", type=parse_mix, help="e.g. TNR:6,TLE")
+    parser.add_argument("--immas", type=parse_mix, help="e.g. 5REJK:2,5REJB")
+    args = parser.parse_args()
+    frame = generate_schedule(
+        args.rows, args.seed, args.start, args.days, args.stations, args.immas
+    )
+    write_schedule(frame, args.output, args.format)
+
+
+if __name__ == "__main__":
+    main()
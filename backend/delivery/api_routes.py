@@ -1,35 +1,202 @@
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict
 from datetime import date
 from typing import Literal
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Message
 
 from backend.domain import FlightRow
-from backend.usecase.process_flight_data import process_flight_data
+from backend.internal.infrastructure import (
+    PoolSaturatedError,
+    WorkerLostError,
+    WorkerPool,
+    profiled_call,
+    server_timing,
+    shared_worker_pool,
+)
+from backend.repository.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    etag_matches,
+)
+from backend.repository.upload_spool import UploadTooLargeError
+from backend.usecase.offsets import resolve_offsets
+from backend.usecase.process_flight_data import (
+    iter_encoded,
+    process_upload,
+    process_upload_batches,
+    receive_upload,
+    response_key,
+    shared_response_cache,
+    upload_max_bytes,
+)
+
+# Allowance for multipart boundaries and the small form fields
+FORM_OVERHEAD_BYTES = 16 << 10
+
+
+class UploadLimitRoute(APIRoute):
+    """Refuse a request body over the UPLOAD_MAX_BYTES setting with 413.
+
+    FastAPI reads the whole multipart form, spooling file parts to disk,
+    before the endpoint runs. A declared Content-Length over the limit is
+    therefore refused before anything is read, and a body without one is
+    counted as it arrives and cut off once it passes the limit.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+
+        async def limited(request: Request) -> Response:
+            limit = upload_max_bytes()
+            if not limit:
+                return await handler(request)
+            allowed = limit + FORM_OVERHEAD_BYTES
+            too_large = HTTPException(
+                status_code=413, detail=str(UploadTooLargeError(limit))
+            )
+            length = request.headers.get("content-length", "")
+            if length.isdigit() and int(length) > allowed:
+                raise too_large
+            received = 0
 
-router = APIRouter()
+            async def receive() -> Message:
+                nonlocal received
+                message = await request.receive()
+                received += len(message.get("body", b""))
+                if received > allowed:
+                    raise too_large
+                return message
+
+            return await handler(Request(request.scope, receive))
+
+        return limited
+
+
+router = APIRouter(route_class=UploadLimitRoute)
+
+STREAM_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
 
 
 @router.post(
     "/process",
-    response_model=list[FlightRow],
+    response_model=list[FlightRow] | dict[date, list[FlightRow]],
     summary="Filter and return structured flights",
     description=(
-        "Parses XLS, filters by J+1 or J+2, "
-        "returns formatted rows for pairing and layout."
+        "Parses XLS or XLSX (detected from the file content, not its "
+        "name), filters by J+1 or J+2, "
+        "returns formatted rows for pairing and layout. "
+        "With mode=all (optionally days=1,2,3) the file is parsed once "
+        "and rows are returned per date. stream=json sends the same body "
+        "in chunks, stream=ndjson one flight per line. The Server-Timing "
+        "header reports the time spent in each parsing stage and the "
+        "number of dates that could not be parsed. Uploads are spooled "
+        "to disk and parsed through a memory map; above UPLOAD_MAX_BYTES "
+        "they are refused with 413 while the request body is read, "
+        "before any of it when Content-Length exceeds it. Unstreamed bodies "
+        "carry a strong ETag and are cached per upload hash, mode and "
+        "target dates; a matching If-None-Match is answered 304 without "
+        "parsing."
     ),
 )
 async def process(
     file: UploadFile = File(...),
-    mode: Literal["commandes", "precommandes"] = Form(...),
-) -> list[FlightRow]:
+    mode: Literal["commandes", "precommandes", "all"] = Form(...),
+    days: str | None = Form(None),
+    stream: Literal["json", "ndjson"] | None = Form(None),
+    pool: WorkerPool = Depends(shared_worker_pool),
+    max_bytes: int = Depends(upload_max_bytes),
+    responses: ResponseCache = Depends(shared_response_cache),
+    if_none_match: str | None = Header(None),
+) -> Response:
     today = date.today()
-    if not file.filename.endswith(".xls"):
-        raise HTTPException(status_code=400, detail="Invalid file type")
-
+    upload = None
     try:
-        rows = process_flight_data(file.file, mode, today)
+        offsets = resolve_offsets(mode, days)
+        if max_bytes and (file.size or 0) > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        upload = await run_in_threadpool(receive_upload, file.file, max_bytes)
+        if stream is None:
+            key = response_key(upload.sha256, mode, offsets, today)
+            cached: CachedResponse | None = responses.get(key)
+            if cached is None:
+                content, collected = await pool.run(
+                    profiled_call, process_upload, upload, mode, offsets, today
+                )
+                cached = responses.store(key, content)
+                timing = server_timing(collected)
+            else:
+                timing = 'cache;desc="hit"'
+        else:
+            result, collected = await pool.run(
+                profiled_call,
+                process_upload_batches,
+                upload,
+                mode,
+                offsets,
+                today,
+            )
+    except WorkerLostError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Worker process died, retry later",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    except PoolSaturatedError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, retry later",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    except UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return rows
+    finally:
+        if upload is not None:
+            upload.discard()
+    if stream is None:
+        headers = {"Server-Timing": timing, "ETag": cached.etag}
+        if etag_matches(if_none_match, cached.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=cached.body,
+            media_type="application/json",
+            headers=headers,
+        )
+    headers = {"Server-Timing": server_timing(collected)}
+    return StreamingResponse(
+        iter_encoded(result, stream),
+        media_type=STREAM_MEDIA_TYPES[stream],
+        headers=headers,
+    )
+
+
+@router.get(
+    "/process/stats",
+    summary="Worker pool queue metrics",
+    description="Queue depth, in-flight parses and wait times of /process.",
+)
+async def process_stats(
+    pool: WorkerPool = Depends(shared_worker_pool),
+) -> dict[str, float]:
+    return asdict(pool.stats())
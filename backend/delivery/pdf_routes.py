@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import unicodedata
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from backend.domain import GeneratePdfPayload
+from backend.repository.command_sheet import render_page
+from backend.repository.page_cache import PageCache
+from backend.usecase.generate_pdf_service import (
+    PageRenderer,
+    ParallelRendering,
+    format_filename,
+    generate_pdf,
+    shared_page_cache,
+    shared_parallel_rendering,
+    sheet_date,
+    validate_rows,
+)
+
+router = APIRouter()
+
+
+def pdf_page_renderer() -> PageRenderer:
+    """Page renderer used by /generatePDF; override it in tests."""
+    return render_page
+
+
+@router.post(
+    "/generatePDF",
+    response_class=StreamingResponse,
+    summary="Generate finalized PDF of flights",
+    description=(
+        "Renders the flights as an A4 landscape command sheet, keeping "
+        "their order and pairing. Pages are streamed as they are drawn; "
+        "long sheets are rendered on several processes, and pages whose "
+        "flights did not change since an earlier request are reused."
+    ),
+    responses={200: {"content": {"application/pdf": {}}}},
+)
+async def generate_pdf_endpoint(
+    payload: GeneratePdfPayload,
+    render: PageRenderer = Depends(pdf_page_renderer),
+    parallel: ParallelRendering | None = Depends(shared_parallel_rendering),
+    page_cache: PageCache = Depends(shared_page_cache),
+) -> StreamingResponse:
+    try:
+        validate_rows(payload.flights)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    day = sheet_date(payload.flights, payload.mode)
+    filename = format_filename(payload.mode, day)
+    return StreamingResponse(
+        generate_pdf(
+            payload.flights, payload.mode, day, render, parallel, page_cache
+        ),
+        media_type="application/pdf",
+        headers={"Content-Disposition": content_disposition(filename)},
+    )
+
+
+def content_disposition(filename: str) -> str:
+    """Attachment header with an ASCII fallback and the UTF-8 name."""
+    fallback = (
+        unicodedata.normalize("NFKD", filename)
+        .encode("ascii", "ignore")
+        .decode()
+    )
+    return (
+        f'attachment; filename="{fallback}"; '
+        f"filename*=UTF-8''{quote(filename)}"
+    )
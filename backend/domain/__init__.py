@@ -1,5 +1,45 @@
-"""Domain models used across backend layers."""
+"""Domain models used across backend layers.
 
-from .models import FlightRow
+Exports are loaded on first access so that light modules such as
+:mod:`backend.domain.modes` import without pandas or pydantic.
+"""
 
-__all__ = ["FlightRow"]
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .flight_batch import (
+        FlightBatch,
+        batches_to_json,
+        iter_batches_json,
+        iter_batches_ndjson,
+    )
+    from .models import FlightRow, GeneratePdfPayload
+
+_EXPORTS = {
+    "FlightBatch": ".flight_batch",
+    "FlightRow": ".models",
+    "GeneratePdfPayload": ".models",
+    "batches_to_json": ".flight_batch",
+    "iter_batches_json": ".flight_batch",
+    "iter_batches_ndjson": ".flight_batch",
+}
+
+__all__ = [
+    "FlightBatch",
+    "FlightRow",
+    "GeneratePdfPayload",
+    "batches_to_json",
+    "iter_batches_json",
+    "iter_batches_ndjson",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
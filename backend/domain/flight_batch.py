@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, fields
+from datetime import date
+from json.encoder import encode_basestring
+from typing import Any, overload
+
+import numpy as np
+import pandas as pd
+
+from .models import FlightRow
+
+_STRING_FIELDS = ("num_vol", "depart", "arrivee", "imma")
+_DATETIME_FIELDS = ("sd_loc", "sa_loc")
+_INT_FIELDS = ("jc", "yc")
+
+# Rows encoded per chunk when streaming JSON/NDJSON output
+STREAM_CHUNK_ROWS = 1000
+
+
+@dataclass(frozen=True, eq=False)
+class FlightBatch(Sequence[FlightRow]):
+    """Columnar collection of flights with the same fields as FlightRow.
+
+    Columns are NumPy arrays. ``FlightRow`` objects are only built when a
+    row is accessed, and JSON is encoded straight from the columns.
+    """
+
+    num_vol: np.ndarray
+    depart: np.ndarray
+    arrivee: np.ndarray
+    imma: np.ndarray
+    sd_loc: np.ndarray
+    sa_loc: np.ndarray
+    jc: np.ndarray
+    yc: np.ndarray
+
+    def __post_init__(self) -> None:
+        lengths = {len(getattr(self, f.name)) for f in fields(self)}
+        if len(lengths) > 1:
+            raise ValueError("FlightBatch columns must have the same length")
+        for name in _STRING_FIELDS:
+            column = getattr(self, name)
+            if len(column) and pd.api.types.infer_dtype(
+                column, skipna=False
+            ) not in ("string", "empty"):
+                raise ValueError(f"Invalid value in column: {name}")
+        for name in _DATETIME_FIELDS:
+            column = getattr(self, name)
+            if np.isnat(column).any():
+                raise ValueError(f"Invalid date in column: {name}")
+
+    @classmethod
+    def from_columns(cls, **columns: Any) -> FlightBatch:
+        """Build a batch from array-likes keyed by FlightRow field name."""
+        values: dict[str, np.ndarray] = {}
+        for name in _STRING_FIELDS:
+            values[name] = np.asarray(columns[name], dtype=object)
+        for name in _DATETIME_FIELDS:
+            values[name] = np.asarray(columns[name], dtype="datetime64[us]")
+        for name in _INT_FIELDS:
+            values[name] = np.asarray(columns[name], dtype=np.int64)
+        return cls(**values)
+
+    @classmethod
+    def empty(cls) -> FlightBatch:
+        """Return a batch without any flight."""
+        return cls.from_columns(**{f.name: [] for f in fields(cls)})
+
+    def __len__(self) -> int:
+        return len(self.num_vol)
+
+    @overload
+    def __getitem__(self, index: int) -> FlightRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> FlightBatch: ...
+
+    def __getitem__(self, index: int | slice) -> FlightRow | FlightBatch:
+        if isinstance(index, slice):
+            return FlightBatch(
+                **{f.name: getattr(self, f.name)[index] for f in fields(self)}
+            )
+        return FlightRow(
+            num_vol=self.num_vol[index],
+            depart=self.depart[index],
+            arrivee=self.arrivee[index],
+            imma=self.imma[index],
+            sd_loc=self.sd_loc[index].item(),
+            sa_loc=self.sa_loc[index].item(),
+            jc=self.jc[index].item(),
+            yc=self.yc[index].item(),
+        )
+
+    def __iter__(self) -> Iterator[FlightRow]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def take(self, positions: np.ndarray) -> FlightBatch:
+        """Return the flights at ``positions``, in that order."""
+        return FlightBatch(
+            **{f.name: getattr(self, f.name)[positions] for f in fields(self)}
+        )
+
+    def to_rows(self) -> list[FlightRow]:
+        """Materialize every flight as a FlightRow."""
+        return list(self)
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Return JSON-ready dicts matching ``FlightRow.model_dump``."""
+        names = [f.name for f in fields(self)]
+        columns = [
+            (
+                _isoformat(getattr(self, name))
+                if name in _DATETIME_FIELDS
+                else getattr(self, name)
+            ).tolist()
+            for name in names
+        ]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def to_json(self) -> bytes:
+        """Encode the batch as the JSON array emitted for list[FlightRow].
+
+        Each column is factorized and only its distinct values are encoded,
+        so the per-row cost is one string template substitution.
+        """
+        return b"".join(self.iter_json(chunk_rows=max(len(self), 1)))
+
+    def iter_json(
+        self, chunk_rows: int = STREAM_CHUNK_ROWS
+    ) -> Iterator[bytes]:
+        """Yield the JSON array of :meth:`to_json` in chunks of rows."""
+        yield b"["
+        separator = ""
+        for rows in self._encoded_chunks(chunk_rows):
+            yield (separator + ",".join(rows)).encode("utf-8")
+            separator = ","
+        yield b"]"
+
+    def iter_ndjson(
+        self,
+        chunk_rows: int = STREAM_CHUNK_ROWS,
+        day: date | None = None,
+    ) -> Iterator[bytes]:
+        """Yield one JSON object per line, optionally tagged with ``day``."""
+        prefix = f'"date":"{day.isoformat()}",' if day is not None else ""
+        for rows in self._encoded_chunks(chunk_rows, prefix):
+            yield ("\n".join(rows) + "\n").encode("utf-8")
+
+    def _encoded_chunks(
+        self, chunk_rows: int, prefix: str = ""
+    ) -> Iterator[list[str]]:
+        """Yield JSON objects for consecutive slices of ``chunk_rows`` rows."""
+        names = [f.name for f in fields(self)]
+        template = (
+            "{" + prefix + ",".join(f'"{name}":%s' for name in names) + "}"
+        )
+        for start in range(0, len(self), chunk_rows):
+            stop = start + chunk_rows
+            tokens = [
+                _json_tokens(getattr(self, name)[start:stop]) for name in names
+            ]
+            yield [template % values for values in zip(*tokens)]
+
+
+def batches_to_json(batches: Mapping[date, FlightBatch]) -> bytes:
+    """Encode per-date batches as a JSON object keyed by ISO date."""
+    body = b",".join(
+        b'"' + day.isoformat().encode() + b'":' + batch.to_json()
+        for day, batch in batches.items()
+    )
+    return b"{" + body + b"}"
+
+
+def iter_batches_json(
+    batches: Mapping[date, FlightBatch],
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """Yield the JSON object of :func:`batches_to_json` in chunks."""
+    yield b"{"
+    for index, (day, batch) in enumerate(batches.items()):
+        separator = b"," if index else b""
+        yield separator + b'"' + day.isoformat().encode() + b'":'
+        yield from batch.iter_json(chunk_rows)
+    yield b"}"
+
+
+def iter_batches_ndjson(
+    batches: Mapping[date, FlightBatch],
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """Yield NDJSON lines for every batch, each tagged with its date."""
+    for day, batch in batches.items():
+        yield from batch.iter_ndjson(chunk_rows, day)
+
+
+def _json_tokens(column: np.ndarray) -> list[str]:
+    """Return the JSON encoding of every value of ``column``."""
+    codes, uniques = pd.factorize(column)
+    if column.dtype.kind == "M":
+        encoded = [f'"{value}"' for value in _isoformat(np.asarray(uniques))]
+    elif column.dtype.kind in "iu":
+        encoded = [str(value) for value in np.asarray(uniques).tolist()]
+    else:
+        encoded = [encode_basestring(value) for value in uniques]
+    return np.asarray(encoded, dtype=object)[codes].tolist()
+
+
+def _isoformat(values: np.ndarray) -> np.ndarray:
+    """Format datetimes like pydantic: microseconds only when non-zero."""
+    seconds = np.datetime_as_string(values, unit="s")
+    has_fraction = values != values.astype("datetime64[s]")
+    if not has_fraction.any():
+        return seconds
+    micros = np.datetime_as_string(values, unit="us")
+    return np.where(has_fraction, micros, seconds)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel
 
@@ -16,3 +17,10 @@ class FlightRow(BaseModel):
     sa_loc: datetime
     jc: int
     yc: int
+
+
+class GeneratePdfPayload(BaseModel):
+    """Flights to print, in sheet order, and the command mode."""
+
+    flights: list[FlightRow]
+    mode: Literal["commandes", "precommandes"]
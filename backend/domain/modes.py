@@ -0,0 +1,7 @@
+"""Command modes and planning horizons, free of heavy dependencies."""
+
+# Day offset from today of each command mode
+MODE_OFFSETS: dict[str, int] = {"commandes": 1, "precommandes": 2}
+
+# Furthest horizon accepted for multi-day planning
+MAX_OFFSET = 31
@@ -4,16 +4,39 @@ This mirrors the behavior of task_logger.go for Python tooling and tests."""
 
 from __future__ import annotations
 
+import json
+import os
 import re
-from dataclasses import dataclass
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
 BASE_DIR = ""
 CONTEXT = "backend"
 BACKLOG_FILE = "backend/backlog.md"
 TASK_LOG_FILE = "codex_task_tracker.md"
 
+# In journal mode updates are appended to JOURNAL_FILE under LOCK_FILE and
+# folded into TASK_LOG_FILE by compact_task_tracker()
+JOURNAL_MODE = False
+JOURNAL_FILE = "codex_task_tracker.journal"
+LOCK_FILE = ".codex_task_tracker.lock"
+# Journal size past which an append also compacts
+JOURNAL_MAX_BYTES = 1 << 20
+
+# Lock depth per thread, so nested tracker_lock() calls do not deadlock
+_lock_depth = threading.local()
+
 
 def normalize_dashes(text: str) -> str:
     """Replace en-dash/em-dash with hyphen."""
@@ -47,6 +70,79 @@ class TaskLogEntry:
     description: str = ""
     test_status: str = "-"
 
+    def row_values(self) -> list[str]:
+        """Return the row cells before the Created and Updated dates."""
+        return [
+            CONTEXT,
+            self.task_name,
+            self.phase,
+            self.status,
+            self.layer,
+            self.domain,
+            self.module,
+            self.epic,
+            self.feature,
+            self.description,
+            self.test_status,
+        ]
+
+
+@dataclass
+class TrackerTable:
+    """codex_task_tracker.md held in memory with rows indexed by task.
+
+    Loaded once, updated any number of times and written back with a
+    single atomic replace, so logging many tasks reads and writes the
+    file once instead of once per task.
+    """
+
+    path: Path
+    lines: list[str]
+    index: dict[tuple[str, str], int] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> TrackerTable:
+        text = path.read_text(encoding="utf-8") if path.exists() else ""
+        lines = text.split("\n")
+        if lines[-1] != "":
+            lines.append("")
+        table = cls(path, lines)
+        for i, line in enumerate(lines):
+            fields = _fields(line)
+            if len(fields) >= 14:
+                table.index.setdefault((fields[1], fields[2]), i)
+        return table
+
+    def upsert(self, entry: TaskLogEntry, now: str) -> None:
+        """Update the task's row, keeping its Created date, or append it."""
+        values = entry.row_values()
+        i = self.index.get((CONTEXT, entry.task_name))
+        if i is None:
+            self.lines.insert(len(self.lines) - 1, _row(values + [now, now]))
+            self.index[(CONTEXT, entry.task_name)] = len(self.lines) - 2
+            return
+        fields = _fields(self.lines[i])
+        created = fields[12] if len(fields) > 13 else now
+        self.lines[i] = _row(values + [created, now])
+
+    def done_tasks(self) -> set[str]:
+        return _done_names(self.lines)
+
+    def save(self) -> None:
+        """Write the table to a temporary file and rename it over the file."""
+        fd, tmp = tempfile.mkstemp(
+            prefix=f".{self.path.name}.", dir=self.path.parent
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write("\n".join(self.lines))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
 
 def resolve_base_dir() -> Path:
     """Return directory containing backlog.md and codex_task_tracker.md."""
@@ -62,15 +158,47 @@ def resolve_base_dir() -> Path:
     return directory
 
 
+@contextmanager
+def tracker_lock() -> Iterator[None]:
+    """Hold the advisory lock taken by every tracker write.
+
+    The lock is re-entrant within a thread.
+    """
+    depth = getattr(_lock_depth, "value", 0)
+    if depth:
+        _lock_depth.value = depth + 1
+        try:
+            yield
+        finally:
+            _lock_depth.value = depth
+        return
+    with (resolve_base_dir() / LOCK_FILE).open("a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        _lock_depth.value = 1
+        try:
+            yield
+        finally:
+            _lock_depth.value = 0
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
 def has_duplicate_task(task_name: str) -> bool:
     """Return True if the task already exists in codex_task_tracker.md."""
+    if JOURNAL_MODE:
+        return (CONTEXT, task_name) in _current_table().index
     base = resolve_base_dir()
     fp = base / TASK_LOG_FILE
     if not fp.exists():
         return False
     with fp.open("r", encoding="utf-8") as file:
         for line in file:
-            fields = [f.strip() for f in line.split("|")]
+            fields = _fields(line)
             if len(fields) < 14:
                 continue
             if fields[1] == CONTEXT and fields[2] == task_name:
@@ -82,49 +210,44 @@ def update_task_tracker(
     entry: TaskLogEntry,
     parent_task_name: str | None = None,
 ) -> None:
-    """Append or update a task entry in codex_task_tracker.md."""
-    task_name = entry.task_name
-    parent = parent_task_name or ""
-    if parent and not task_name.startswith(f"{parent} > "):
-        task_name = f"{parent} > {task_name}"
-    entry.task_name = task_name
+    """Append or update a task entry in codex_task_tracker.md.
+
+    In :data:`JOURNAL_MODE` the entry is appended to the journal instead;
+    the table and the backlog change on the next compaction.
+    """
+    _apply_parent(entry, parent_task_name)
+    if JOURNAL_MODE:
+        _append_journal([entry])
+        return
+    with tracker_lock():
+        _update_table(entry)
+        clean_backlog()
+
 
+def _update_table(entry: TaskLogEntry) -> None:
+    task_name = entry.task_name
     base = resolve_base_dir()
     fp = base / TASK_LOG_FILE
     now = datetime.now().strftime("%Y-%m-%d")
 
-    row_vals = [
-        CONTEXT,
-        entry.task_name,
-        entry.phase,
-        entry.status,
-        entry.layer,
-        entry.domain,
-        entry.module,
-        entry.epic,
-        entry.feature,
-        entry.description,
-        entry.test_status,
-    ]
+    row_vals = entry.row_values()
 
     if has_duplicate_task(task_name):
         data = fp.read_text(encoding="utf-8").split("\n")
         for i, line in enumerate(data):
-            fields = [f.strip() for f in line.split("|")]
+            fields = _fields(line)
             if len(fields) < 14:
                 continue
             if fields[1] == CONTEXT and fields[2] == task_name:
                 created = fields[12] if len(fields) > 13 else now
-                data[i] = "| " + " | ".join(row_vals + [created, now]) + " |"
+                data[i] = _row(row_vals + [created, now])
                 break
         fp.write_text("\n".join(data), encoding="utf-8")
     else:
-        row = "| " + " | ".join(row_vals + [now, now]) + " |\n"
+        row = _row(row_vals + [now, now]) + "\n"
         with fp.open("a", encoding="utf-8") as file:
             file.write(row)
 
-    clean_backlog()
-
 
 def append_subtask(
     parent_task: str,
@@ -135,36 +258,70 @@ def append_subtask(
     update_task_tracker(subtask_entry, parent_task)
 
 
+def update_task_tracker_batch(
+    entries: Iterable[TaskLogEntry],
+    parent_task_name: str | None = None,
+) -> None:
+    """Apply many entries with one read and one atomic write.
+
+    Same result as calling :func:`update_task_tracker` for each entry in
+    order, but the tracker is parsed once into a :class:`TrackerTable`
+    and the backlog is cleaned once at the end. In :data:`JOURNAL_MODE`
+    the entries are appended to the journal in one write.
+    """
+    entries = list(entries)
+    for entry in entries:
+        _apply_parent(entry, parent_task_name)
+    if JOURNAL_MODE:
+        _append_journal(entries)
+        return
+    now = datetime.now().strftime("%Y-%m-%d")
+    with tracker_lock():
+        table = TrackerTable.load(resolve_base_dir() / TASK_LOG_FILE)
+        for entry in entries:
+            table.upsert(entry, now)
+        table.save()
+        clean_backlog(table.done_tasks())
+
+
+def compact_task_tracker() -> None:
+    """Fold the journal into codex_task_tracker.md and clean the backlog.
+
+    Replaying an entry twice gives the same row, so a compaction stopped
+    before the journal is removed is safe to run again.
+    """
+    base = resolve_base_dir()
+    with tracker_lock():
+        journal = base / JOURNAL_FILE
+        if not journal.exists():
+            return
+        table = _replay_journal(base)
+        table.save()
+        journal.unlink()
+        clean_backlog(table.done_tasks())
+
+
 def parse_done_tasks() -> set[str]:
     """Return the set of tasks marked ✅ Done."""
+    if JOURNAL_MODE:
+        return _current_table().done_tasks()
     base = resolve_base_dir()
     fp = base / TASK_LOG_FILE
-    tasks: set[str] = set()
     if not fp.exists():
-        return tasks
+        return set()
     with fp.open("r", encoding="utf-8") as file:
-        for line in file:
-            fields = [f.strip() for f in line.split("|")]
-            if len(fields) < 14:
-                continue
-            name = normalize_dashes(fields[2].strip())
-            status = fields[4]
-            if status == "✅ Done":
-                tasks.add(name)
-                task_base = name
-                if ">" in name:
-                    task_base = name.split(">", 1)[0].strip()
-                    tasks.add(task_base)
-                trimmed = task_base.split("-", 1)[0].strip()
-                if trimmed and trimmed != task_base:
-                    tasks.add(trimmed)
-    return tasks
+        return _done_names(file)
+
 
+def clean_backlog(done: set[str] | None = None) -> None:
+    """Remove completed tasks from backend/backlog.md.
 
-def clean_backlog() -> None:
-    """Remove completed tasks from backend/backlog.md."""
+    ``done`` skips re-reading the tracker when the caller already has the
+    completed task names.
+    """
     base = resolve_base_dir()
-    done = parse_done_tasks()
+    if done is None:
+        done = parse_done_tasks()
 
     done_normalized: set[str] = set()
     for name in done:
@@ -204,3 +361,82 @@ def clean_backlog() -> None:
 
     if cleaned != backlog_content:
         backlog_path.write_text(cleaned, encoding="utf-8")
+
+
+def _append_journal(entries: list[TaskLogEntry]) -> None:
+    """Append one JSON line per entry, compacting past the size limit."""
+    now = datetime.now().strftime("%Y-%m-%d")
+    lines = "".join(
+        json.dumps({**asdict(entry), "updated": now}, ensure_ascii=False)
+        + "\n"
+        for entry in entries
+    )
+    with tracker_lock():
+        path = resolve_base_dir() / JOURNAL_FILE
+        with path.open("a+b") as file:
+            size = file.seek(0, os.SEEK_END)
+            # Start on a fresh line after a writer that crashed mid-line
+            if size:
+                file.seek(size - 1)
+                if file.read(1) != b"\n":
+                    lines = "\n" + lines
+            file.write(lines.encode("utf-8"))
+            size = file.tell()
+    if size > JOURNAL_MAX_BYTES:
+        compact_task_tracker()
+
+
+def _current_table() -> TrackerTable:
+    """Return the table with the journal applied, without writing it."""
+    with tracker_lock():
+        return _replay_journal(resolve_base_dir())
+
+
+def _replay_journal(base: Path) -> TrackerTable:
+    table = TrackerTable.load(base / TASK_LOG_FILE)
+    journal = base / JOURNAL_FILE
+    if not journal.exists():
+        return table
+    with journal.open("r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                fields = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn line left by a crashed writer
+            updated = fields.pop("updated")
+            table.upsert(TaskLogEntry(**fields), updated)
+    return table
+
+
+def _apply_parent(entry: TaskLogEntry, parent_task_name: str | None) -> None:
+    parent = parent_task_name or ""
+    if parent and not entry.task_name.startswith(f"{parent} > "):
+        entry.task_name = f"{parent} > {entry.task_name}"
+
+
+def _fields(line: str) -> list[str]:
+    return [f.strip() for f in line.split("|")]
+
+
+def _row(values: list[str]) -> str:
+    return "| " + " | ".join(values) + " |"
+
+
+def _done_names(lines: Iterable[str]) -> set[str]:
+    tasks: set[str] = set()
+    for line in lines:
+        fields = _fields(line)
+        if len(fields) < 14:
+            continue
+        name = normalize_dashes(fields[2].strip())
+        status = fields[4]
+        if status == "✅ Done":
+            tasks.add(name)
+            task_base = name
+            if ">" in name:
+                task_base = name.split(">", 1)[0].strip()
+                tasks.add(task_base)
+            trimmed = task_base.split("-", 1)[0].strip()
+            if trimmed and trimmed != task_base:
+                tasks.add(trimmed)
+    return tasks
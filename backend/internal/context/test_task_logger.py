@@ -1,5 +1,6 @@
 import importlib.util
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -42,6 +43,12 @@ def _setup_files(tmp_path: Path) -> None:
         "hyphen_cleanup",
         "dash_normalization",
         "task_number_heading",
+        "batch_updates",
+        "batch_single_write",
+        "concurrent_updates",
+        "journal_mode",
+        "journal_concurrent",
+        "journal_torn_line",
     ],
 )
 def test_task_logger(tmp_path: Path, scenario: str) -> None:
@@ -160,4 +167,157 @@ def test_task_logger(tmp_path: Path, scenario: str) -> None:
         )
         assert backlog.read_text().strip() == ""
 
+    elif scenario == "batch_updates":
+        backlog = tmp_path / "backend" / "backlog.md"
+        backlog.write_text("### Codex Task: Sample\n### Codex Task: Kept\n")
+        tl.update_task_tracker(
+            tl.TaskLogEntry(
+                task_name="Sample", phase="context", status="⏳ In Progress"
+            )
+        )
+        tl.update_task_tracker_batch(
+            [
+                tl.TaskLogEntry(
+                    task_name="Sample", phase="context", status="✅ Done"
+                ),
+                tl.TaskLogEntry(
+                    task_name="Child", phase="context", status="✅ Done"
+                ),
+                tl.TaskLogEntry(
+                    task_name="Child", phase="test", status="✅ Done"
+                ),
+            ],
+            parent_task_name="Parent",
+        )
+        tl.update_task_tracker_batch(
+            [tl.TaskLogEntry(task_name="Sample", phase="x", status="✅ Done")]
+        )
+        content = (tmp_path / "codex_task_tracker.md").read_text()
+        assert content.endswith(" |\n")
+        assert content.count("| Sample |") == 1
+        assert content.count("Parent > Child") == 1
+        assert "| Parent > Child | test |" in content
+        assert tl.has_duplicate_task("Parent > Sample")
+        assert backlog.read_text() == "### Codex Task: Kept\n"
+
+    elif scenario == "batch_single_write":
+        tracker = tmp_path / "codex_task_tracker.md"
+        writes = []
+        real_replace = tl.os.replace
+
+        def replace(src: str, dst: Path) -> None:
+            writes.append(dst)
+            real_replace(src, dst)
+
+        tl.os.replace = replace
+        try:
+            tl.update_task_tracker_batch(
+                tl.TaskLogEntry(
+                    task_name=f"Task{i}", phase="context", status="✅ Done"
+                )
+                for i in range(50)
+            )
+        finally:
+            tl.os.replace = real_replace
+        assert writes == [tracker]
+        assert len(tl.parse_done_tasks()) == 50
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            ".codex_task_tracker.lock",
+            "backend",
+            "codex_task_tracker.md",
+        ]
+
+    elif scenario == "concurrent_updates":
+        tl.update_task_tracker_batch(
+            tl.TaskLogEntry(
+                task_name=f"C{i}", phase="x", status="⏳ In Progress"
+            )
+            for i in range(8)
+        )
+
+        def finish(i: int) -> None:
+            tl.update_task_tracker(
+                tl.TaskLogEntry(task_name=f"C{i}", phase="x", status="✅ Done")
+            )
+            tl.update_task_tracker_batch(
+                [
+                    tl.TaskLogEntry(
+                        task_name=f"D{i}", phase="x", status="✅ Done"
+                    )
+                ]
+            )
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(finish, range(8)))
+        done = tl.parse_done_tasks()
+        for i in range(8):
+            assert f"C{i}" in done and f"D{i}" in done
+
+    elif scenario == "journal_mode":
+        tracker = tmp_path / "codex_task_tracker.md"
+        backlog = tmp_path / "backend" / "backlog.md"
+        tl.update_task_tracker(
+            tl.TaskLogEntry(
+                task_name="Sample", phase="context", status="⏳ In Progress"
+            )
+        )
+        table = tracker.read_text()
+        tl.JOURNAL_MODE = True
+        tl.update_task_tracker(
+            tl.TaskLogEntry(task_name="Sample", phase="test", status="✅ Done")
+        )
+        tl.append_subtask(
+            "Parent",
+            tl.TaskLogEntry(task_name="Child", phase="x", status="✅ Done"),
+        )
+        # Writes only touch the journal; readers merge it with the table
+        assert tracker.read_text() == table
+        assert backlog.read_text() == "### Codex Task: Sample\n"
+        assert tl.has_duplicate_task("Parent > Child")
+        assert {"Sample", "Parent"} <= tl.parse_done_tasks()
+
+        tl.compact_task_tracker()
+        content = tracker.read_text()
+        assert not (tmp_path / tl.JOURNAL_FILE).exists()
+        assert content.count("| Sample |") == 1
+        assert "| Sample | test | ✅ Done |" in content
+        assert "| Parent > Child | x | ✅ Done |" in content
+        assert backlog.read_text().strip() == ""
+        tl.compact_task_tracker()
+        assert tracker.read_text() == content
+
+    elif scenario == "journal_concurrent":
+        tl.JOURNAL_MODE = True
+        tl.JOURNAL_MAX_BYTES = 8 << 10
+
+        def log(worker: int) -> None:
+            for i in range(25):
+                tl.update_task_tracker(
+                    tl.TaskLogEntry(
+                        task_name=f"W{worker}-{i}",
+                        phase="context",
+                        status="✅ Done",
+                    )
+                )
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(log, range(8)))
+        tl.compact_task_tracker()
+        content = (tmp_path / "codex_task_tracker.md").read_text()
+        for worker in range(8):
+            for i in range(25):
+                assert content.count(f"| W{worker}-{i} |") == 1
+        tl.JOURNAL_MAX_BYTES = 1 << 20
+
+    elif scenario == "journal_torn_line":
+        tl.JOURNAL_MODE = True
+        (tmp_path / tl.JOURNAL_FILE).write_text('{"task_name": "Tor')
+        tl.update_task_tracker(
+            tl.TaskLogEntry(task_name="After", phase="x", status="✅ Done")
+        )
+        assert tl.has_duplicate_task("After")
+        tl.compact_task_tracker()
+        assert "| After |" in (tmp_path / "codex_task_tracker.md").read_text()
+
+    tl.JOURNAL_MODE = False
     tl.BASE_DIR = ""
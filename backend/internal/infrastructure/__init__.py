@@ -0,0 +1,74 @@
+"""Infrastructure helpers: configuration, worker pool and stage timers.
+
+Exports are loaded on first access, so importing the stage timers does
+not pull in the worker pool's executors.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .config import Settings, load_env
+    from .profiling import (
+        StageProfile,
+        StageTiming,
+        count,
+        peak_rss_bytes,
+        profile,
+        profiled_call,
+        server_timing,
+        stage,
+    )
+    from .worker_pool import (
+        PoolSaturatedError,
+        PoolStats,
+        WorkerLostError,
+        WorkerPool,
+        shared_worker_pool,
+    )
+
+_EXPORTS = {
+    "PoolSaturatedError": ".worker_pool",
+    "PoolStats": ".worker_pool",
+    "Settings": ".config",
+    "StageProfile": ".profiling",
+    "StageTiming": ".profiling",
+    "WorkerLostError": ".worker_pool",
+    "WorkerPool": ".worker_pool",
+    "count": ".profiling",
+    "load_env": ".config",
+    "peak_rss_bytes": ".profiling",
+    "profile": ".profiling",
+    "profiled_call": ".profiling",
+    "server_timing": ".profiling",
+    "shared_worker_pool": ".worker_pool",
+    "stage": ".profiling",
+}
+
+__all__ = [
+    "PoolSaturatedError",
+    "PoolStats",
+    "Settings",
+    "StageProfile",
+    "StageTiming",
+    "WorkerLostError",
+    "WorkerPool",
+    "count",
+    "load_env",
+    "peak_rss_bytes",
+    "profile",
+    "profiled_call",
+    "server_timing",
+    "shared_worker_pool",
+    "stage",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,70 @@
+"""Typed access to backend environment variables.
+
+Every entrypoint (FastAPI app, CLI) reads its configuration through
+:func:`load_env`; no other module should read ``os.environ`` directly.
+Each setting is read from the upper-cased field name, e.g.
+``SCHEDULE_CACHE_MAX_ENTRIES``.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+
+WORKER_POOL_KINDS = ("thread", "process")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Backend configuration with defaults for local use."""
+
+    schedule_cache_max_entries: int = 8
+    schedule_cache_max_bytes: int = 256 * 1024 * 1024
+    worker_pool_kind: str = "thread"
+    worker_pool_size: int = min(4, os.cpu_count() or 1)
+    worker_queue_size: int = 16
+    allocation_rules_path: str = ""
+    pdf_parallel_threshold: int = 5000
+    pdf_render_workers: int = min(4, os.cpu_count() or 1)
+    pdf_page_cache_max_entries: int = 4096
+    pdf_page_cache_max_bytes: int = 64 * 1024 * 1024
+    upload_max_bytes: int = 64 * 1024 * 1024
+    process_cache_max_entries: int = 256
+    process_cache_max_bytes: int = 64 * 1024 * 1024
+    process_cache_ttl_seconds: int = 600
+
+
+def load_env(environ: Mapping[str, str] | None = None) -> Settings:
+    """Build :class:`Settings` from environment variables."""
+    env = os.environ if environ is None else environ
+    defaults = Settings()
+    values: dict[str, object] = {}
+    for field in fields(Settings):
+        key = field.name.upper()
+        default = getattr(defaults, field.name)
+        raw = env.get(key, "").strip()
+        if not raw:
+            values[field.name] = default
+        elif isinstance(default, int):
+            values[field.name] = _int(key, raw)
+        else:
+            values[field.name] = raw
+    settings = Settings(**values)  # type: ignore[arg-type]
+    if settings.worker_pool_kind not in WORKER_POOL_KINDS:
+        raise ValueError(
+            f"WORKER_POOL_KIND must be one of {', '.join(WORKER_POOL_KINDS)}"
+        )
+    if settings.worker_pool_size < 1:
+        raise ValueError("WORKER_POOL_SIZE must be at least 1")
+    return settings
+
+
+def _int(key: str, raw: str) -> int:
+    try:
+        value = int(raw)
+    except ValueError as exc:
+        raise ValueError(f"{key} must be an integer, got {raw!r}") from exc
+    if value < 0:
+        raise ValueError(f"{key} must not be negative")
+    return value
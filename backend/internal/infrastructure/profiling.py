@@ -0,0 +1,166 @@
+"""Lightweight per-stage timers.
+
+Code marks its stages with :func:`stage`; timings are only taken while a
+:func:`profile` is active in the current context, otherwise ``stage``
+returns a shared no-op object::
+
+    with stage("read") as timer:
+        df = read_schedule(stream)
+        timer.rows = len(df)
+
+Stages entered several times in one profile (one per horizon, say) are
+summed. :func:`count` adds named counters such as invalid values.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """Wall and CPU seconds spent in one stage, and rows it produced."""
+
+    name: str
+    wall_s: float
+    cpu_s: float
+    rows: int | None
+    calls: int
+
+
+class StageProfile:
+    """Collects the :class:`StageTiming` of one profiled call."""
+
+    def __init__(self) -> None:
+        self._stages: dict[str, StageTiming] = {}
+        self.counters: dict[str, int] = {}
+
+    def record(
+        self, name: str, wall_s: float, cpu_s: float, rows: int | None
+    ) -> None:
+        previous = self._stages.get(name)
+        if previous is not None:
+            wall_s += previous.wall_s
+            cpu_s += previous.cpu_s
+            calls = previous.calls + 1
+            if previous.rows is not None:
+                rows = previous.rows + (rows or 0)
+        else:
+            calls = 1
+        self._stages[name] = StageTiming(name, wall_s, cpu_s, rows, calls)
+
+    @property
+    def stages(self) -> list[StageTiming]:
+        return list(self._stages.values())
+
+
+_ACTIVE: ContextVar[StageProfile | None] = ContextVar(
+    "stage_profile", default=None
+)
+
+
+class _Stage:
+    __slots__ = ("_profile", "_name", "_wall", "_cpu", "rows")
+
+    def __init__(self, profile: StageProfile, name: str) -> None:
+        self._profile = profile
+        self._name = name
+        self.rows: int | None = None
+
+    def __enter__(self) -> _Stage:
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._profile.record(
+            self._name,
+            time.perf_counter() - self._wall,
+            time.process_time() - self._cpu,
+            self.rows,
+        )
+
+
+class _NullStage:
+    """Stand-in used when no profile is active; ``rows`` is discarded."""
+
+    __slots__ = ("rows",)
+
+    def __enter__(self) -> _NullStage:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str) -> _Stage | _NullStage:
+    """Return a context manager timing ``name`` in the active profile."""
+    active = _ACTIVE.get()
+    if active is None:
+        return _NULL_STAGE
+    return _Stage(active, name)
+
+
+def count(name: str, value: int) -> None:
+    """Add ``value`` to the counter ``name`` of the active profile."""
+    active = _ACTIVE.get()
+    if active is not None:
+        active.counters[name] = active.counters.get(name, 0) + value
+
+
+@contextmanager
+def profile() -> Iterator[StageProfile]:
+    """Activate a new :class:`StageProfile` for the enclosed code."""
+    collected = StageProfile()
+    token = _ACTIVE.set(collected)
+    try:
+        yield collected
+    finally:
+        _ACTIVE.reset(token)
+
+
+def profiled_call(
+    func: Callable[..., T], *args: Any
+) -> tuple[T, StageProfile]:
+    """Call ``func(*args)`` under a fresh profile.
+
+    Meant to be submitted to a worker pool: executors do not carry the
+    caller's context, so the profile has to start in the worker.
+    """
+    with profile() as collected:
+        result = func(*args)
+    return result, collected
+
+
+def server_timing(collected: StageProfile) -> str:
+    """Format stages and counters as a ``Server-Timing`` header value."""
+    metrics = [
+        f"{timing.name};dur={timing.wall_s * 1000:.1f}"
+        for timing in collected.stages
+    ]
+    metrics.extend(
+        f'{name};desc="{value}"' for name, value in collected.counters.items()
+    )
+    return ", ".join(metrics)
+
+
+def peak_rss_bytes() -> int | None:
+    """Return the peak resident set size of this process, if known."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,182 @@
+"""Bounded executor for running blocking work off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import Callable
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import cache
+from typing import Any, TypeVar
+
+from .config import load_env
+
+T = TypeVar("T")
+
+
+class PoolSaturatedError(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(
+        self, retry_after: int, message: str = "Worker pool saturated"
+    ) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class WorkerLostError(PoolSaturatedError):
+    """Raised when the worker process running a call died.
+
+    The broken executor is dropped and the next call starts a fresh one,
+    so the call can be retried.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(1, "Worker process died")
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Snapshot of a :class:`WorkerPool`."""
+
+    workers: int
+    max_queue: int
+    in_flight: int
+    queue_depth: int
+    completed: int
+    rejected: int
+    last_wait_ms: float
+    avg_wait_ms: float
+    avg_run_ms: float
+
+
+class WorkerPool:
+    """Run blocking callables in a thread or process pool with backpressure.
+
+    At most ``workers`` calls run at once and at most ``max_queue`` more
+    wait for a worker; further calls fail fast with
+    :class:`PoolSaturatedError` instead of piling up. Callables and
+    arguments must be picklable when ``kind`` is ``"process"``.
+    Counters are only touched from the event loop thread.
+    """
+
+    def __init__(
+        self, workers: int, max_queue: int, kind: str = "thread"
+    ) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._last_wait = 0.0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on a worker and return its result."""
+        if self._pending >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise PoolSaturatedError(self._retry_after())
+
+        loop = asyncio.get_running_loop()
+        submitted = time.monotonic()
+        executor = self._get_executor()
+        try:
+            job = executor.submit(_timed_call, func, args)
+            self._pending += 1
+            # A cancelled caller does not stop a running job: release the
+            # slot only once the job itself is done.
+            job.add_done_callback(lambda _: _call_soon(loop, self._release))
+            started, result = await asyncio.wrap_future(job)
+        except BrokenProcessPool as exc:
+            self._discard(executor)
+            raise WorkerLostError() from exc
+
+        finished = time.monotonic()
+        self._last_wait = max(0.0, started - submitted)
+        self._total_wait += self._last_wait
+        self._total_run += finished - started
+        self._completed += 1
+        return result
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    def stats(self) -> PoolStats:
+        completed = self._completed or 1
+        return PoolStats(
+            workers=self.workers,
+            max_queue=self.max_queue,
+            in_flight=min(self._pending, self.workers),
+            queue_depth=max(0, self._pending - self.workers),
+            completed=self._completed,
+            rejected=self._rejected,
+            last_wait_ms=self._last_wait * 1000,
+            avg_wait_ms=self._total_wait / completed * 1000,
+            avg_run_ms=self._total_run / completed * 1000,
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _discard(self, executor: Executor) -> None:
+        """Drop ``executor`` unless a newer one already replaced it."""
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="worker-pool"
+                )
+        return self._executor
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up."""
+        if not self._completed:
+            return 1
+        avg_run = self._total_run / self._completed
+        return max(1, math.ceil(avg_run * self._pending / self.workers))
+
+
+def _call_soon(
+    loop: asyncio.AbstractEventLoop, callback: Callable[[], Any]
+) -> None:
+    """Run ``callback`` on ``loop``, or right away once it is closed."""
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        callback()
+
+
+def _timed_call(
+    func: Callable[..., T], args: tuple[Any, ...]
+) -> tuple[float, T]:
+    """Return when the worker picked the call up, and its result."""
+    return time.monotonic(), func(*args)
+
+
+@cache
+def shared_worker_pool() -> WorkerPool:
+    """Return the process-wide worker pool sized from the environment."""
+    settings = load_env()
+    return WorkerPool(
+        workers=settings.worker_pool_size,
+        max_queue=settings.worker_queue_size,
+        kind=settings.worker_pool_kind,
+    )
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("allocation_rules.json")
+
+_MATCH_FIELDS = ("mode", "depart", "arrivee", "imma")
+
+
+@dataclass(frozen=True)
+class AllocationRule:
+    """JC/YC allocation for legs matching every non-empty criterion.
+
+    A criterion left to ``None`` matches any value.
+    """
+
+    jc: int
+    yc: int
+    mode: frozenset[str] | None = None
+    depart: frozenset[str] | None = None
+    arrivee: frozenset[str] | None = None
+    imma: frozenset[str] | None = None
+
+    def matches(self, mode: str, depart: Any, arrivee: Any, imma: Any) -> bool:
+        return all(
+            allowed is None or value in allowed
+            for allowed, value in (
+                (self.mode, mode),
+                (self.depart, depart),
+                (self.arrivee, arrivee),
+                (self.imma, imma),
+            )
+        )
+
+
+@dataclass(frozen=True)
+class AllocationRules:
+    """Ordered allocation rules plus JC/YC caps per immatriculation.
+
+    The first matching allocation applies; legs matching none get 0/0.
+    The result is then clamped to the aircraft cap, or ``default_cap``
+    for unknown aircraft.
+    """
+
+    allocations: tuple[AllocationRule, ...]
+    caps: tuple[tuple[str, tuple[int, int]], ...]
+    default_cap: tuple[int, int] = (99, 99)
+
+    def with_caps(
+        self, caps: Mapping[str, tuple[int, int]]
+    ) -> AllocationRules:
+        """Return a copy using ``caps`` as the per-aircraft limits."""
+        return AllocationRules(
+            self.allocations, tuple(sorted(caps.items())), self.default_cap
+        )
+
+    def compile(self, mode: str) -> CompiledRules:
+        """Return the compiled lookup for ``mode``, built once per rules."""
+        return _compile(self, mode)
+
+
+class CompiledRules:
+    """Rules of one mode resolved to lookup tables.
+
+    Each distinct (Départ, Arrivée, Imma) combination is resolved once
+    and memoized. Combinations are found on the integer codes of the
+    columns, so categorical columns are never turned back into strings.
+    """
+
+    def __init__(self, rules: AllocationRules, mode: str) -> None:
+        self.mode = mode
+        self._allocations = [
+            rule
+            for rule in rules.allocations
+            if rule.mode is None or mode in rule.mode
+        ]
+        self._caps = dict(rules.caps)
+        self._default_cap = rules.default_cap
+        self._memo: dict[tuple[Any, Any, Any], tuple[int, int]] = {}
+
+    def apply(
+        self, depart: pd.Series, arrivee: pd.Series, imma: pd.Series
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the JC and YC arrays for the given leg columns."""
+        if not len(depart):
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty.copy()
+        # Fold the integer codes of each column into one combination code
+        combo = np.zeros(len(depart), dtype=np.int64)
+        for column in (depart, arrivee, imma):
+            codes, size = _column_codes(column)
+            combo, _ = pd.factorize(combo * (size + 1) + codes + 1)
+        first = np.empty(combo.max() + 1, dtype=np.int64)
+        first[combo[::-1]] = np.arange(len(combo) - 1, -1, -1)
+        combos = zip(
+            *(
+                np.asarray(column.iloc[first], dtype=object)
+                for column in (depart, arrivee, imma)
+            )
+        )
+        table = np.array(
+            [self._resolve(values) for values in combos], dtype=np.int64
+        )
+        return table[combo, 0], table[combo, 1]
+
+    def _resolve(self, combo: tuple[Any, Any, Any]) -> tuple[int, int]:
+        resolved = self._memo.get(combo)
+        if resolved is None:
+            depart, arrivee, imma = combo
+            jc = yc = 0
+            for rule in self._allocations:
+                if rule.matches(self.mode, depart, arrivee, imma):
+                    jc, yc = rule.jc, rule.yc
+                    break
+            jc_max, yc_max = self._caps.get(imma, self._default_cap)
+            resolved = (min(jc, jc_max), min(yc, yc_max))
+            self._memo[combo] = resolved
+        return resolved
+
+
+@lru_cache(maxsize=64)
+def _compile(rules: AllocationRules, mode: str) -> CompiledRules:
+    return CompiledRules(rules, mode)
+
+
+def _column_codes(column: pd.Series) -> tuple[np.ndarray, int]:
+    """Return integer codes of ``column`` (-1 when missing) and their count."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return (
+            column.cat.codes.to_numpy(np.int64),
+            len(column.cat.categories),
+        )
+    codes, uniques = pd.factorize(column)
+    return codes.astype(np.int64), len(uniques)
+
+
+def load_rules(path: str | Path = DEFAULT_RULES_PATH) -> AllocationRules:
+    """Load allocation rules from a JSON configuration file."""
+    try:
+        config = json.loads(Path(path).read_text(encoding="utf-8"))
+        return parse_rules(config)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Invalid allocation rules: {exc}") from exc
+
+
+def parse_rules(config: Mapping[str, Any]) -> AllocationRules:
+    """Build :class:`AllocationRules` from a decoded configuration."""
+    try:
+        allocations = tuple(
+            AllocationRule(
+                jc=_count(entry["jc"]),
+                yc=_count(entry["yc"]),
+                **{
+                    name: _codes(entry[name])
+                    for name in _MATCH_FIELDS
+                    if entry.get(name) is not None
+                },
+            )
+            for entry in config.get("allocations", [])
+        )
+        caps = {
+            str(imma): (_count(cap["jc"]), _count(cap["yc"]))
+            for imma, cap in config.get("caps", {}).items()
+        }
+        default = config.get("default_cap", {"jc": 99, "yc": 99})
+        default_cap = (_count(default["jc"]), _count(default["yc"]))
+    except (KeyError, TypeError, AttributeError) as exc:
+        raise ValueError(f"Invalid allocation rules: {exc!r}") from exc
+    return AllocationRules(
+        allocations, tuple(sorted(caps.items())), default_cap
+    )
+
+
+def _codes(value: Any) -> frozenset[str]:
+    if isinstance(value, str):
+        return frozenset([value])
+    return frozenset(str(item) for item in value)
+
+
+def _count(value: Any) -> int:
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise TypeError(f"expected a non-negative integer, got {value!r}")
+    return value
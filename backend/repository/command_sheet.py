@@ -0,0 +1,142 @@
+"""Page layout of the printed command sheet.
+
+Pages are A4 landscape content streams built from :class:`FlightRow`
+values, one page per :data:`ROWS_PER_PAGE` flights, in the order given so
+outbound/inbound pairs stay next to each other. The frame shared by all
+pages of a mode is built once by :func:`sheet_form`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date
+from functools import cache
+from itertools import islice
+
+from backend.domain import FlightRow
+from backend.repository.pdf_writer import PAGE_SIZE, pdf_string
+
+SHEET_TITLES = {
+    "commandes": "Commandes définitives",
+    "precommandes": "Pré-commandes",
+}
+
+ROWS_PER_PAGE = 24
+
+# Bump whenever the drawing of a page changes, so cached pages expire
+LAYOUT_VERSION = 1
+
+# Name of the form XObject holding the static frame of a page
+FORM_NAME = "Sheet"
+
+MARGIN = 36
+ROW_HEIGHT = 18
+HEADER_HEIGHT = 22
+TABLE_TOP = PAGE_SIZE[1] - 96
+TITLE_Y = PAGE_SIZE[1] - 60
+FOOTER_Y = 20
+DATE_X = PAGE_SIZE[0] - MARGIN - 70
+PAGE_X = PAGE_SIZE[0] - MARGIN - 16
+
+# Caption, left edge and width in points of each column
+COLUMNS: tuple[tuple[str, int, int], ...] = (
+    ("N° Vol", MARGIN, 90),
+    ("Départ", MARGIN + 90, 80),
+    ("Arrivée", MARGIN + 170, 80),
+    ("Imma", MARGIN + 250, 90),
+    ("SD LOC", MARGIN + 340, 130),
+    ("SA LOC", MARGIN + 470, 130),
+    ("J/C", MARGIN + 600, 85),
+    ("Y/C", MARGIN + 685, 85),
+)
+TABLE_WIDTH = sum(width for _, _, width in COLUMNS)
+
+
+def paginate(
+    flights: Iterable[FlightRow], rows_per_page: int = ROWS_PER_PAGE
+) -> Iterator[list[FlightRow]]:
+    """Split ``flights`` into consecutive pages without reordering."""
+    iterator = iter(flights)
+    while page := list(islice(iterator, rows_per_page)):
+        yield page
+
+
+@cache
+def sheet_form(mode: str) -> bytes:
+    """Static frame of a ``mode`` page, drawn once and painted by pages.
+
+    Holds the title, captions, header band and the grid of a full page;
+    pages only add the date, page number and flight cells.
+    """
+    bottom = TABLE_TOP - HEADER_HEIGHT - ROWS_PER_PAGE * ROW_HEIGHT
+    ops = [
+        _text("F2", 16, MARGIN, TITLE_Y, SHEET_TITLES[mode]),
+        _text("F1", 10, DATE_X - 32, TITLE_Y, "Date :"),
+        _text("F1", 8, PAGE_X - 26, FOOTER_Y, "Page"),
+        b"0.5 w 0.9 g %d %d %d %d re f 0 g\n"
+        % (MARGIN, TABLE_TOP - HEADER_HEIGHT, TABLE_WIDTH, HEADER_HEIGHT),
+        b"%d %d %d %d re S\n"
+        % (MARGIN, bottom, TABLE_WIDTH, TABLE_TOP - bottom),
+    ]
+    for caption, left, _ in COLUMNS:
+        ops.append(_text("F2", 10, left + 4, TABLE_TOP - 15, caption))
+        if left > MARGIN:
+            ops.append(
+                b"%d %d m %d %d l S\n" % (left, TABLE_TOP, left, bottom)
+            )
+    for index in range(ROWS_PER_PAGE + 1):
+        y = TABLE_TOP - HEADER_HEIGHT - index * ROW_HEIGHT
+        ops.append(
+            b"%d %d m %d %d l S\n" % (MARGIN, y, MARGIN + TABLE_WIDTH, y)
+        )
+    return b"".join(ops)
+
+
+def render_page(
+    rows: Sequence[FlightRow], mode: str, day: date, page_number: int
+) -> bytes:
+    """Return the content stream of one page: the form plus flight text."""
+    ops = [
+        b"/%s Do\nBT\n/F1 10 Tf\n" % FORM_NAME.encode(),
+        _show(DATE_X, TITLE_Y, day.strftime("%d/%m/%Y")),
+        b"/F1 8 Tf\n",
+        _show(PAGE_X, FOOTER_Y, str(page_number)),
+        b"/F1 9 Tf\n",
+    ]
+    for index, row in enumerate(rows):
+        top = TABLE_TOP - HEADER_HEIGHT - index * ROW_HEIGHT
+        ops.append(_cells(row, top))
+    ops.append(b"ET\n")
+    return b"".join(ops)
+
+
+def _cells(row: FlightRow, top: int) -> bytes:
+    values = (
+        row.num_vol,
+        row.depart,
+        row.arrivee,
+        row.imma,
+        row.sd_loc.strftime("%d/%m/%Y %H:%M"),
+        row.sa_loc.strftime("%d/%m/%Y %H:%M"),
+        str(row.jc),
+        str(row.yc),
+    )
+    return b"".join(
+        _show(left + 4, top - 12, value)
+        for value, (_, left, _) in zip(values, COLUMNS)
+    )
+
+
+def _show(x: int, y: int, value: str) -> bytes:
+    # Inside a BT block with the font already selected
+    return b"1 0 0 1 %d %d Tm %s Tj\n" % (x, y, pdf_string(value))
+
+
+def _text(font: str, size: int, x: int, y: int, value: str) -> bytes:
+    return b"BT /%s %d Tf %d %d Td %s Tj ET\n" % (
+        font.encode(),
+        size,
+        x,
+        y,
+        pdf_string(value),
+    )
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Day 0 of Excel serial dates in the default 1900 date system
+EXCEL_EPOCH = np.datetime64("1899-12-30", "ms")
+
+# Serial of 9999-12-31, the last date Excel can represent
+MAX_EXCEL_SERIAL = 2958465
+
+_MS_PER_DAY = 86_400_000
+
+# Text layouts found in schedule exports, tried in order on a sample.
+# Slashed dates are day first, as in the French exports.
+STRING_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+)
+
+# Strings inspected to pick the dominant format
+SAMPLE_SIZE = 256
+
+RESULT_DTYPE = "datetime64[us]"
+
+
+@dataclass(frozen=True)
+class DateCoercion:
+    """How one column was converted to datetimes.
+
+    ``kind`` is the dominant input: ``"datetime"``, ``"serial"``, a
+    strptime pattern from :data:`STRING_FORMATS`, or ``"mixed"`` when
+    nothing matched in bulk. ``slow`` values went through per-value
+    parsing; ``nat`` non-empty values could not be parsed at all.
+    """
+
+    column: str
+    kind: str
+    fast: int
+    slow: int
+    nat: int
+    examples: tuple[str, ...] = ()
+
+
+def coerce_datetimes(values: pd.Series) -> tuple[pd.Series, DateCoercion]:
+    """Convert ``values`` to datetimes, invalid values becoming NaT.
+
+    Native datetimes are kept, numbers are read as Excel serials and
+    strings are parsed in bulk with the format most of a sample matches.
+    Only values no bulk path accepts are parsed one by one.
+    """
+    column = str(values.name)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        converted = values.astype(RESULT_DTYPE)
+        present = int(converted.notna().sum())
+        return converted, DateCoercion(column, "datetime", present, 0, 0)
+
+    result = np.full(len(values), np.datetime64("NaT"), dtype=RESULT_DTYPE)
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    present = values.notna().to_numpy()
+    counts: dict[str, int] = {}
+    for kind, index in _split_by_type(values, inferred, present).items():
+        if kind == "other" or not index.size:
+            continue
+        part = values if index.size == len(values) else values.iloc[index]
+        if kind == "number":
+            kind = "serial"
+            converted = _from_serials(part.to_numpy(np.float64))
+        elif kind == "datetime":
+            converted = pd.to_datetime(part, errors="coerce").to_numpy(
+                RESULT_DTYPE
+            )
+        else:
+            kind = _dominant_format(part) or "mixed"
+            if kind == "mixed":
+                continue
+            converted = pd.to_datetime(
+                part, format=kind, errors="coerce"
+            ).to_numpy(RESULT_DTYPE)
+        result[index] = converted
+        counts[kind] = int((~np.isnat(converted)).sum())
+
+    # Blank strings count as missing, not as invalid dates
+    rest = [
+        (position, value)
+        for position, value in zip(
+            np.flatnonzero(present & np.isnat(result)).tolist(),
+            values.iloc[present & np.isnat(result)].tolist(),
+        )
+        if not (isinstance(value, str) and not value.strip())
+    ]
+    failed = []
+    for position, value in rest:
+        result[position] = _parse_one(value)
+        if np.isnat(result[position]):
+            failed.append(str(value))
+
+    fast = sum(counts.values())
+    stats = DateCoercion(
+        column,
+        max(counts, key=counts.__getitem__) if fast else "mixed",
+        fast,
+        len(rest),
+        len(failed),
+        tuple(failed[:5]),
+    )
+    return pd.Series(result, index=values.index, name=values.name), stats
+
+
+def _split_by_type(
+    values: pd.Series, inferred: str, present: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Return row positions of datetimes, numbers, strings and the rest."""
+    everything = np.flatnonzero(present)
+    if inferred in ("datetime", "datetime64", "date"):
+        return {"datetime": everything}
+    if inferred in ("floating", "integer", "mixed-integer-float"):
+        return {"number": everything}
+    if inferred == "string":
+        return {"string": everything}
+    raw = values.to_numpy(object)[everything]
+    kinds = np.array([_kind_of(value) for value in raw], dtype=object)
+    return {
+        name: everything[kinds == name]
+        for name in ("datetime", "number", "string", "other")
+    }
+
+
+def _kind_of(value: object) -> str:
+    if isinstance(value, (datetime, np.datetime64)):
+        return "datetime"
+    if isinstance(value, (int, float, np.number)) and not isinstance(
+        value, (bool, np.bool_)
+    ):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    return "other"
+
+
+def _from_serials(serials: np.ndarray) -> np.ndarray:
+    """Convert Excel serial days to datetimes, out-of-range ones to NaT."""
+    valid = np.isfinite(serials) & (serials >= 0)
+    valid &= serials < MAX_EXCEL_SERIAL + 1
+    # Same millisecond rounding as xlrd.xldate_as_datetime
+    ms = np.round(np.where(valid, serials, 0.0) * _MS_PER_DAY).astype(
+        np.int64
+    )
+    converted = (EXCEL_EPOCH + ms.astype("timedelta64[ms]")).astype(
+        RESULT_DTYPE
+    )
+    converted[~valid] = np.datetime64("NaT")
+    return converted
+
+
+def _dominant_format(strings: pd.Series) -> str | None:
+    """Return the known format most sampled strings match, if any."""
+    sample = strings.iloc[:SAMPLE_SIZE].astype(object).str.strip()
+    best, best_hits = None, 0
+    for pattern in STRING_FORMATS:
+        hits = int(
+            pd.to_datetime(sample, format=pattern, errors="coerce")
+            .notna()
+            .sum()
+        )
+        if hits > best_hits:
+            best, best_hits = pattern, hits
+            if hits == len(sample):
+                break
+    return best
+
+
+def _parse_one(value: object) -> np.datetime64:
+    if isinstance(value, str):
+        value = _parse_known(value.strip())
+    try:
+        parsed = pd.to_datetime(value, errors="coerce", dayfirst=True)
+    except (TypeError, ValueError, OverflowError):
+        return np.datetime64("NaT")
+    if pd.isna(parsed):
+        return np.datetime64("NaT")
+    return np.datetime64(parsed.tz_localize(None), "us")
+
+
+def _parse_known(text: str) -> datetime | str:
+    """Parse ISO or known layouts exactly, else return ``text`` as is."""
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for pattern in STRING_FORMATS:
+        try:
+            return datetime.strptime(text, pattern)
+        except ValueError:
+            continue
+    return text
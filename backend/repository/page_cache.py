@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+from datetime import date
+
+from backend.domain import FlightRow
+from backend.repository.bounded_lru import BoundedLRU
+from backend.repository.command_sheet import LAYOUT_VERSION
+
+
+class PageCache(BoundedLRU[bytes]):
+    """LRU cache of compressed page content streams.
+
+    A key covers everything drawn on the page: the flight values, the
+    mode, the sheet date, the page number, the renderer and
+    :data:`LAYOUT_VERSION`, so an edited cell only invalidates its own
+    page. Limits apply to the number of pages and to their total size.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 << 20):
+        super().__init__(max_entries, max_bytes, len)
+
+    @staticmethod
+    def key_for(
+        rows: Sequence[FlightRow],
+        mode: str,
+        day: date,
+        page_number: int,
+        renderer: str = "",
+    ) -> str:
+        """Return the hash of a page's flight values and layout."""
+        digest = hashlib.blake2b(
+            f"{LAYOUT_VERSION}|{renderer}|{mode}|{day}|{page_number}".encode(),
+            digest_size=20,
+        )
+        for row in rows:
+            digest.update(repr(tuple(row.__dict__.values())).encode())
+        return digest.hexdigest()
@@ -0,0 +1,194 @@
+"""Minimal PDF 1.4 writer that emits a document one page at a time.
+
+Only byte offsets and page object numbers are kept between pages, so the
+memory used does not grow with the page count. Text uses the standard
+Helvetica fonts in WinAnsi encoding, which every viewer ships, so no font
+is embedded. Drawing shared by every page is written once as a form
+XObject that pages paint with ``/<name> Do``.
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import Iterable, Iterator, Mapping
+from functools import lru_cache
+
+# A4 landscape in points
+PAGE_SIZE = (842, 595)
+
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold"}
+
+_CATALOG = 1
+_PAGES = 2
+_INFO = 3
+_FIRST_FONT = 4
+
+
+class PdfStreamWriter:
+    """Serialize pages as they come and finish with the page tree.
+
+    Call :meth:`start`, then :meth:`add_page` for each page content
+    stream, then :meth:`finish`; each returns the bytes to send next.
+    ``forms`` maps XObject names to the content streams they draw.
+    """
+
+    def __init__(
+        self,
+        title: str = "",
+        page_size: tuple[int, int] = PAGE_SIZE,
+        forms: Mapping[str, bytes] | None = None,
+    ) -> None:
+        self.title = title
+        self.page_size = page_size
+        self.forms = dict(forms or {})
+        self._offsets: dict[int, int] = {}
+        self._position = 0
+        self._next_object = _FIRST_FONT + len(FONTS)
+        self._pages: list[int] = []
+        self._fonts = b" ".join(
+            b"/%s %d 0 R" % (name.encode(), _FIRST_FONT + index)
+            for index, name in enumerate(FONTS)
+        )
+        self._form_ids = {name: self._allocate() for name in self.forms}
+        # Pages share one resource dictionary instead of repeating it
+        self._resources_id = self._allocate()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def start(self) -> bytes:
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(out, _CATALOG, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._object(
+            out,
+            _INFO,
+            b"<< /Title %s /Producer (flight-command-sheet) >>"
+            % pdf_string(self.title),
+        )
+        for index, base_font in enumerate(FONTS.values()):
+            self._object(
+                out,
+                _FIRST_FONT + index,
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /%s "
+                b"/Encoding /WinAnsiEncoding >>" % base_font.encode(),
+            )
+        width, height = self.page_size
+        for name, content in self.forms.items():
+            data = deflate(content)
+            self._object(
+                out,
+                self._form_ids[name],
+                b"<< /Type /XObject /Subtype /Form /BBox [0 0 %d %d] "
+                b"/Resources << /Font << %s >> >> /Length %d "
+                b"/Filter /FlateDecode >>\nstream\n%s\nendstream"
+                % (width, height, self._fonts, len(data), data),
+            )
+        xobjects = b" ".join(
+            b"/%s %d 0 R" % (name.encode(), number)
+            for name, number in self._form_ids.items()
+        )
+        self._object(
+            out,
+            self._resources_id,
+            b"<< /Font << %s >> /XObject << %s >> >>"
+            % (self._fonts, xobjects),
+        )
+        return self._emit(out)
+
+    def add_page(self, content: bytes) -> bytes:
+        """Write one page whose drawing operators are ``content``."""
+        return self.add_deflated_page(zlib.compress(content))
+
+    def add_deflated_page(self, data: bytes) -> bytes:
+        """Write one page from an already compressed content stream."""
+        stream_id = self._allocate()
+        page_id = self._allocate()
+        self._pages.append(page_id)
+        width, height = self.page_size
+        out = bytearray()
+        self._object(
+            out,
+            stream_id,
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream"
+            % (len(data), data),
+        )
+        self._object(
+            out,
+            page_id,
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources %d 0 R /Contents %d 0 R >>"
+            % (width, height, self._resources_id, stream_id),
+        )
+        return self._emit(out)
+
+    def finish(self) -> bytes:
+        """Write the page tree, cross-reference table and trailer."""
+        out = bytearray()
+        kids = b" ".join(b"%d 0 R" % page for page in self._pages)
+        self._object(
+            out,
+            _PAGES,
+            b"<< /Type /Pages /Kids [%s] /Count %d >>"
+            % (kids, len(self._pages)),
+        )
+        xref_offset = self._position + len(out)
+        size = self._next_object
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+        for number in range(1, size):
+            out += b"%010d 00000 n \n" % self._offsets[number]
+        out += (
+            b"trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\n"
+            b"startxref\n%d\n%%%%EOF\n" % (size, xref_offset)
+        )
+        return self._emit(out)
+
+    def _allocate(self) -> int:
+        number = self._next_object
+        self._next_object += 1
+        return number
+
+    def _object(self, out: bytearray, number: int, body: bytes) -> None:
+        self._offsets[number] = self._position + len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    def _emit(self, out: bytearray) -> bytes:
+        self._position += len(out)
+        return bytes(out)
+
+
+@lru_cache(maxsize=16)
+def deflate(content: bytes) -> bytes:
+    """Compress a stream; repeated forms are only compressed once."""
+    return zlib.compress(content)
+
+
+def iter_pdf(
+    pages: Iterable[bytes],
+    title: str = "",
+    forms: Mapping[str, bytes] | None = None,
+    deflated: bool = False,
+) -> Iterator[bytes]:
+    """Yield a whole PDF document, one chunk per page content stream.
+
+    With ``deflated`` the page streams are already zlib-compressed.
+    """
+    writer = PdfStreamWriter(title, forms=forms)
+    add = writer.add_deflated_page if deflated else writer.add_page
+    yield writer.start()
+    for content in pages:
+        yield add(content)
+    yield writer.finish()
+
+
+def pdf_string(text: str) -> bytes:
+    """Encode ``text`` as a PDF literal string in WinAnsi encoding."""
+    data = text.encode("cp1252", errors="replace")
+    escaped = (
+        data.replace(b"\\", b"\\\\")
+        .replace(b"(", b"\\(")
+        .replace(b")", b"\\)")
+        .replace(b"\r", b"\\r")
+        .replace(b"\n", b"\\n")
+    )
+    return b"(" + escaped + b")"
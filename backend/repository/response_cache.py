@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import date
+
+from backend.repository.bounded_lru import BoundedLRU
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A serialized response body and its strong entity tag."""
+
+    body: bytes
+    etag: str
+    expires: float
+
+
+class ResponseCache(BoundedLRU[CachedResponse]):
+    """LRU cache of serialized /process bodies with a time to live.
+
+    A key covers the upload's content hash, the mode and each target date
+    with the day offset that selected it, since the offset decides the
+    JC/YC rules. Limits apply to the number of bodies and to their total
+    size; entries older than ``ttl`` seconds are dropped on access.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 64 << 20,
+        ttl: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(max_entries, max_bytes, _body_bytes)
+        self.ttl = ttl
+        self._clock = clock
+
+    @staticmethod
+    def key_for(
+        content_hash: str,
+        mode: str,
+        targets: Sequence[tuple[date, int]],
+    ) -> str:
+        """Return the key of a response for ``(target date, offset)`` pairs."""
+        days = ",".join(f"{day}+{offset}" for day, offset in targets)
+        return f"{content_hash}|{mode}|{days}"
+
+    @staticmethod
+    def etag_for(body: bytes) -> str:
+        """Return a strong ETag that changes whenever ``body`` does."""
+        return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    def is_stale(self, value: CachedResponse) -> bool:
+        return value.expires <= self._clock()
+
+    def store(self, key: str, body: bytes) -> CachedResponse:
+        """Store ``body`` and return it with its ETag."""
+        entry = CachedResponse(
+            body, self.etag_for(body), self._clock() + self.ttl
+        )
+        super().put(key, entry)
+        return entry
+
+
+def _body_bytes(entry: CachedResponse) -> int:
+    return len(entry.body)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``etag`` with an ``If-None-Match`` header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
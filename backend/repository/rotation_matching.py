@@ -0,0 +1,159 @@
+"""Outbound/return rotation matching.
+
+A return leg flies the outbound's route backwards on the same aircraft,
+departing between ``min_turnaround`` and ``max_turnaround`` after the
+outbound lands. Legs are sorted once by (aircraft, unordered station
+pair, departure); inside such a group a rotation is two consecutive legs
+in opposite directions, so one pass over neighbours finds every
+candidate. Runs of chained candidates are matched greedily from the
+earliest leg, which links A→B, B→A, A→B, B→A as two rotations.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from backend.domain import FlightBatch
+
+MIN_TURNAROUND = timedelta(minutes=20)
+MAX_TURNAROUND = timedelta(hours=12)
+
+
+@dataclass(frozen=True)
+class RotationPairs:
+    """Matched legs as positions in the matched columns.
+
+    ``outbound[i]`` and ``inbound[i]`` form one rotation; pairs are in
+    order of the outbound position.
+    """
+
+    outbound: np.ndarray
+    inbound: np.ndarray
+    turnaround: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.outbound)
+
+    @classmethod
+    def empty(cls) -> RotationPairs:
+        none = np.zeros(0, dtype=np.int64)
+        return cls(none, none.copy(), np.zeros(0, dtype="timedelta64[us]"))
+
+    def pairs(self) -> list[tuple[int, int]]:
+        return list(zip(self.outbound.tolist(), self.inbound.tolist()))
+
+    def to_json(self) -> bytes:
+        """Encode as ``[{"outbound", "inbound", "turnaround_min"}, ...]``."""
+        minutes = self.turnaround // np.timedelta64(1, "m")
+        return (
+            "["
+            + ",".join(
+                f'{{"outbound":{o},"inbound":{i},"turnaround_min":{m}}}'
+                for o, i, m in zip(
+                    self.outbound.tolist(),
+                    self.inbound.tolist(),
+                    minutes.tolist(),
+                )
+            )
+            + "]"
+        ).encode()
+
+
+def batch_rotations(
+    batch: FlightBatch,
+    following: FlightBatch | None = None,
+    min_turnaround: timedelta = MIN_TURNAROUND,
+    max_turnaround: timedelta = MAX_TURNAROUND,
+) -> RotationPairs:
+    """Match the rotations of ``batch``, as positions in the batch.
+
+    Returns may also be taken from ``following``, the next day's legs, so
+    an evening outbound is paired with a return leaving after midnight.
+    Such a return's position is ``len(batch)`` plus its position in
+    ``following``; only rotations whose outbound is in ``batch`` are kept.
+    """
+    if following is None or not len(following):
+        columns = [batch.depart, batch.arrivee, batch.imma]
+        times = [batch.sd_loc, batch.sa_loc]
+    else:
+        columns = [
+            np.concatenate([getattr(batch, name), getattr(following, name)])
+            for name in ("depart", "arrivee", "imma")
+        ]
+        times = [
+            np.concatenate([getattr(batch, name), getattr(following, name)])
+            for name in ("sd_loc", "sa_loc")
+        ]
+    pairs = match_rotations(
+        *columns, *times, min_turnaround, max_turnaround
+    )
+    keep = pairs.outbound < len(batch)
+    if keep.all():
+        return pairs
+    return RotationPairs(
+        pairs.outbound[keep], pairs.inbound[keep], pairs.turnaround[keep]
+    )
+
+
+def match_rotations(
+    depart: np.ndarray | pd.Series,
+    arrivee: np.ndarray | pd.Series,
+    imma: np.ndarray | pd.Series,
+    sd_loc: np.ndarray | pd.Series,
+    sa_loc: np.ndarray | pd.Series,
+    min_turnaround: timedelta = MIN_TURNAROUND,
+    max_turnaround: timedelta = MAX_TURNAROUND,
+) -> RotationPairs:
+    """Link each outbound leg to its return leg in O(n log n)."""
+    rows = len(depart)
+    if rows < 2:
+        return RotationPairs.empty()
+    stations, _ = pd.factorize(
+        np.concatenate([np.asarray(depart), np.asarray(arrivee)])
+    )
+    dep, arr = np.split(stations.astype(np.int64), [rows])
+    aircraft = pd.factorize(np.asarray(imma))[0]
+    departs = np.asarray(sd_loc, dtype="datetime64[us]")
+    arrives = np.asarray(sa_loc, dtype="datetime64[us]")
+
+    lo = np.minimum(dep, arr)
+    hi = np.maximum(dep, arr)
+    order = np.lexsort((departs, hi, lo, aircraft))
+    dep, arr, lo, hi, aircraft = (
+        column[order] for column in (dep, arr, lo, hi, aircraft)
+    )
+    departs = departs[order]
+    arrives = arrives[order]
+
+    # Candidate link between each leg and the next one of its group
+    turnaround = departs[1:] - arrives[:-1]
+    linkable = (
+        (aircraft[1:] == aircraft[:-1])
+        & (aircraft[1:] >= 0)
+        & (lo[1:] == lo[:-1])
+        & (hi[1:] == hi[:-1])
+        & (lo[1:] >= 0)
+        & (dep[1:] == arr[:-1])
+        & (arr[1:] == dep[:-1])
+        & (dep[1:] != arr[1:])
+        & (turnaround >= np.timedelta64(min_turnaround))
+        & (turnaround <= np.timedelta64(max_turnaround))
+    )
+    # Greedy matching keeps the 1st, 3rd, ... link of every run of links
+    position = np.arange(rows - 1)
+    starts = linkable & ~np.concatenate([[False], linkable[:-1]])
+    run_start = np.maximum.accumulate(np.where(starts, position, 0))
+    chosen = linkable & ((position - run_start) % 2 == 0)
+
+    outbound = order[:-1][chosen]
+    inbound = order[1:][chosen]
+    by_outbound = np.argsort(outbound, kind="stable")
+    return RotationPairs(
+        outbound[by_outbound].astype(np.int64),
+        inbound[by_outbound].astype(np.int64),
+        turnaround[chosen][by_outbound],
+    )
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import hashlib
+
+import pandas as pd
+
+from backend.repository.bounded_lru import BoundedLRU, CacheStats
+
+__all__ = ["CacheStats", "ScheduleCache"]
+
+
+class ScheduleCache(BoundedLRU[pd.DataFrame]):
+    """LRU cache of normalized schedules keyed by upload content hash.
+
+    Cached frames are shared between requests and must be treated as
+    read-only. Limits apply to the number of entries and to the total
+    ``DataFrame.memory_usage(deep=True)`` of the cached frames; a frame
+    larger than ``max_bytes`` is never stored.
+    """
+
+    def __init__(self, max_entries: int = 8, max_bytes: int = 256 << 20):
+        super().__init__(max_entries, max_bytes, _frame_bytes)
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        """Return the content hash used as cache key."""
+        return hashlib.sha256(data).hexdigest()
+
+
+def _frame_bytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(index=True, deep=True).sum())
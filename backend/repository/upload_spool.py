@@ -0,0 +1,96 @@
+"""Uploads copied to disk once, hashed on the way and read through mmap.
+
+:func:`spool_upload` streams an upload into a temporary file in fixed
+chunks, computing its SHA-256 and enforcing a size limit in the same
+pass. Parsers then read the file through a read-only memory map, so the
+workbook bytes are paged in by the kernel instead of being copied into
+the Python heap.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import BinaryIO
+
+CHUNK_SIZE = 1 << 20
+
+# Bytes kept from the start of the file to detect its format
+HEAD_SIZE = 8
+
+
+class UploadTooLargeError(ValueError):
+    """The upload is larger than the configured limit."""
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Upload exceeds the {max_bytes} byte limit")
+        self.max_bytes = max_bytes
+
+
+@dataclass(frozen=True)
+class SpooledUpload:
+    """An upload stored in a temporary file.
+
+    Only the path and metadata are held, so the value is cheap to send
+    to a process worker. The owner removes the file with :meth:`discard`.
+    """
+
+    path: str
+    size: int
+    sha256: str
+    head: bytes
+
+    @contextmanager
+    def mapped(self) -> Iterator[mmap.mmap]:
+        """Map the file read-only for the duration of the block."""
+        if not self.size:
+            raise ValueError("Empty upload")
+        with open(self.path, "rb") as file:
+            view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield view
+        finally:
+            view.close()
+
+    def discard(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def spool_upload(
+    source: BinaryIO,
+    max_bytes: int,
+    directory: str | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> SpooledUpload:
+    """Copy ``source`` to a temporary file, hashing it chunk by chunk.
+
+    A ``max_bytes`` of 0 disables the limit. Past the limit the copy stops
+    at once, the partial file is removed and :class:`UploadTooLargeError`
+    is raised.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    fd, path = tempfile.mkstemp(prefix="upload-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := source.read(chunk_size):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                if len(head) < HEAD_SIZE:
+                    head += chunk[: HEAD_SIZE - len(head)]
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return SpooledUpload(path, size, digest.hexdigest(), head)
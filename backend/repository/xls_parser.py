@@ -1,90 +1,282 @@
 from __future__ import annotations
 
+import logging
+from collections.abc import Sequence
 from datetime import date, timedelta
-from typing import BinaryIO, Literal
+from typing import Literal
 
+import numpy as np
 import pandas as pd
 
-from backend.domain import FlightRow
+from backend.domain import FlightBatch
+from backend.domain.modes import MODE_OFFSETS
+from backend.internal.infrastructure import count, stage
+from backend.repository.allocation_rules import AllocationRules, load_rules
+from backend.repository.date_coercion import coerce_datetimes
+from backend.repository.schedule_cache import ScheduleCache
+from backend.repository.xls_reader import (
+    WorkbookSource,
+    read_contents,
+    read_schedule,
+)
+
+logger = logging.getLogger(__name__)
+
+# JC/YC allocations and caps shipped in allocation_rules.json
+_PACKAGED_RULES = load_rules()
 
 # JC/YC maximums per immatriculation as defined in TECH_SPEC
-CAPACITY_LIMITS: dict[str, tuple[int, int]] = {
-    "5RMJF": (8, 62),
-    "5REJC": (8, 56),
-    "5REJH": (8, 64),
-    "5REJK": (8, 64),
-    "5REJB": (10, 62),
-}
+CAPACITY_LIMITS: dict[str, tuple[int, int]] = dict(_PACKAGED_RULES.caps)
 
-REQUIRED_COLUMNS = ["Num Vol", "Départ", "Arrivée", "Imma", "SD LOC", "SA LOC"]
+# Low-cardinality code columns, held as categoricals once read
+STATION_COLUMNS = ("Départ", "Arrivée")
+CODE_COLUMNS = (*STATION_COLUMNS, "Imma")
 
 
 def parse_and_filter_xls(
-    file_stream: BinaryIO,
+    file_stream: WorkbookSource,
     mode: Literal["commandes", "precommandes"],
     today: date,
-) -> list[FlightRow]:
-    """Load XLS stream and return rows matching the target date."""
-    df = pd.read_excel(file_stream)
-
-    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing column: {missing[0]}")
-
-    if mode == "commandes":
-        target = today + timedelta(days=1)
-    elif mode == "precommandes":
-        target = today + timedelta(days=2)
-    else:
+    cache: ScheduleCache | None = None,
+    rules: AllocationRules | None = None,
+    content_hash: str | None = None,
+) -> FlightBatch:
+    """Load XLS stream and return rows matching the target date.
+
+    With a ``cache``, the whole normalized schedule is kept under the
+    upload's content hash so a repeat upload skips reading and coercion.
+    Without one, only rows on the target date are read. JC/YC values
+    follow ``rules``, :func:`default_rules` when omitted. A
+    ``content_hash`` computed while the upload was received saves hashing
+    it again.
+    """
+    if mode not in MODE_OFFSETS:
         raise ValueError("Invalid mode")
+    target = today + timedelta(days=MODE_OFFSETS[mode])
+
+    df = _load_for_targets(file_stream, [target], cache, content_hash)
+    with stage("filter") as timer:
+        filtered = df[df["SD LOC"].dt.normalize() == pd.Timestamp(target)]
+        timer.rows = len(filtered)
+    return _build_batch(filtered, mode, rules or default_rules())
+
+
+def parse_and_filter_xls_horizons(
+    file_stream: WorkbookSource,
+    offsets: Sequence[int],
+    today: date,
+    cache: ScheduleCache | None = None,
+    rules: AllocationRules | None = None,
+    content_hash: str | None = None,
+) -> dict[date, FlightBatch]:
+    """Parse once and return one batch per ``today + offset`` date.
+
+    JC/YC defaults follow the ``commandes`` rules on J+1 and the
+    ``precommandes`` rules on every other horizon.
+    """
+    if not offsets or any(offset < 0 for offset in offsets):
+        raise ValueError("Invalid day offsets")
+    targets = {
+        today + timedelta(days=offset): mode_for_offset(offset)
+        for offset in sorted(set(offsets))
+    }
+
+    rules = rules or default_rules()
+    df = _load_for_targets(file_stream, list(targets), cache, content_hash)
+    with stage("filter") as timer:
+        departure_day = df["SD LOC"].dt.normalize()
+        filtered = {
+            target: df[departure_day == pd.Timestamp(target)]
+            for target in targets
+        }
+        timer.rows = sum(len(frame) for frame in filtered.values())
+    return {
+        target: _build_batch(filtered[target], mode, rules)
+        for target, mode in targets.items()
+    }
 
-    df["SD LOC"] = pd.to_datetime(df["SD LOC"], errors="coerce")
-    df["SA LOC"] = pd.to_datetime(df["SA LOC"], errors="coerce")
 
-    filtered = df[df["SD LOC"].dt.date == target].copy()
+def default_rules() -> AllocationRules:
+    """Return the packaged allocation rules capped by CAPACITY_LIMITS."""
+    return _PACKAGED_RULES.with_caps(CAPACITY_LIMITS)
 
+
+def mode_for_offset(offset: int) -> str:
+    """Return the command mode whose JC/YC rules apply at ``offset``."""
+    if offset == MODE_OFFSETS["commandes"]:
+        return "commandes"
+    return "precommandes"
+
+
+def _load_for_targets(
+    file_stream: WorkbookSource,
+    targets: list[date],
+    cache: ScheduleCache | None,
+    content_hash: str | None = None,
+) -> pd.DataFrame:
+    if cache is None:
+        df = normalize_dates(_read(file_stream, set(targets)))
+    else:
+        df = load_schedule(file_stream, cache, content_hash)
+    for column, invalid in df.attrs.get("invalid_dates", {}).items():
+        count(f"nat_{column.lower().replace(' ', '_')}", invalid)
+    return df
+
+
+def _build_batch(
+    filtered: pd.DataFrame, mode: str, rules: AllocationRules
+) -> FlightBatch:
+    """Order filtered legs, apply JC/YC rules and return the batch."""
     if filtered.empty:
-        return []
+        return FlightBatch.empty()
+    with stage("pairing") as timer:
+        ordered_df = order_by_pairing(filtered)
+        timer.rows = len(ordered_df)
+    with stage("build") as timer:
+        batch = allocate_batch(ordered_df, mode, rules)
+        timer.rows = len(batch)
+    return batch
+
+
+def allocate_batch(
+    ordered_df: pd.DataFrame, mode: str, rules: AllocationRules
+) -> FlightBatch:
+    """Apply JC/YC rules to already ordered legs and return the batch."""
+    jc, yc = rules.compile(mode).apply(
+        ordered_df["Départ"], ordered_df["Arrivée"], ordered_df["Imma"]
+    )
 
-    filtered["pair_key"] = filtered.apply(
-        lambda r: tuple(sorted([r["Départ"], r["Arrivée"]])), axis=1
+    return FlightBatch.from_columns(
+        num_vol=ordered_df["Num Vol"].to_numpy(),
+        depart=ordered_df["Départ"].to_numpy(),
+        arrivee=ordered_df["Arrivée"].to_numpy(),
+        imma=ordered_df["Imma"].to_numpy(),
+        sd_loc=ordered_df["SD LOC"].to_numpy(),
+        sa_loc=ordered_df["SA LOC"].to_numpy(),
+        jc=jc,
+        yc=yc,
     )
 
-    grouped = []
-    for _, group in filtered.groupby("pair_key"):
-        group_sorted = group.sort_values("SD LOC")
-        grouped.append((group_sorted["SD LOC"].iloc[0], group_sorted))
-
-    grouped.sort(key=lambda x: x[0])
-    ordered_df = pd.concat([g[1] for g in grouped], ignore_index=True)
-
-    result: list[FlightRow] = []
-    for _, row in ordered_df.iterrows():
-        jc = 0
-        yc = 0
-        jc_max, yc_max = CAPACITY_LIMITS.get(row["Imma"], (99, 99))
-
-        if mode == "commandes" and row["Arrivée"] == "TNR":
-            if row["Départ"] in {"SVB", "DIE", "NOS"}:
-                jc += 2
-                yc += 4
-            else:
-                jc += 2
-                yc += 2
-
-        jc = min(jc, jc_max)
-        yc = min(yc, yc_max)
-
-        result.append(
-            FlightRow(
-                num_vol=row["Num Vol"],
-                depart=row["Départ"],
-                arrivee=row["Arrivée"],
-                imma=row["Imma"],
-                sd_loc=row["SD LOC"],
-                sa_loc=row["SA LOC"],
-                jc=jc,
-                yc=yc,
-            )
+
+def normalize_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce SD LOC and SA LOC to datetimes, invalid values becoming NaT.
+
+    The number of non-empty values turned into NaT is kept per column in
+    ``df.attrs["invalid_dates"]`` and logged, since such rows silently
+    fall out of the date filter.
+    """
+    invalid: dict[str, int] = {}
+    with stage("coerce") as timer:
+        for column in ("SD LOC", "SA LOC"):
+            df[column], stats = coerce_datetimes(df[column])
+            invalid[column] = stats.nat
+            if stats.nat:
+                logger.warning(
+                    "%s: %d value(s) are not dates, e.g. %s",
+                    column,
+                    stats.nat,
+                    ", ".join(stats.examples),
+                )
+        timer.rows = len(df)
+    df.attrs["invalid_dates"] = invalid
+    return df
+
+
+def load_schedule(
+    file_stream: WorkbookSource,
+    cache: ScheduleCache,
+    content_hash: str | None = None,
+) -> pd.DataFrame:
+    """Return the normalized schedule for an upload, reusing ``cache``."""
+    data = read_contents(file_stream)
+    key = content_hash or cache.key_for(data)
+    df = cache.get(key)
+    if df is None:
+        df = normalize_dates(_read(data))
+        cache.put(key, df)
+    return df
+
+
+def _read(
+    file_stream: WorkbookSource, target_dates: set[date] | None = None
+) -> pd.DataFrame:
+    with stage("read") as timer:
+        df = encode_codes(read_schedule(file_stream, target_dates))
+        timer.rows = len(df)
+    return df
+
+
+def encode_codes(df: pd.DataFrame) -> pd.DataFrame:
+    """Store station and aircraft codes as categoricals, in place.
+
+    Départ and Arrivée share one sorted station dictionary, so their
+    integer codes compare like the strings and pair keys can be built on
+    the codes alone. Strings come back only when rows are output.
+    """
+    both = pd.concat([df[column] for column in STATION_COLUMNS])
+    try:
+        codes, stations = pd.factorize(both, sort=True)
+    except TypeError:  # mixed cell types keep first-seen order
+        codes, stations = pd.factorize(both)
+    station_dtype = pd.CategoricalDtype(stations)
+    for column, column_codes in zip(
+        STATION_COLUMNS, np.split(codes, [len(df)])
+    ):
+        df[column] = pd.Categorical.from_codes(
+            column_codes, dtype=station_dtype
         )
-    return result
+    df["Imma"] = df["Imma"].astype("category")
+    return df
+
+
+def order_by_pairing(df: pd.DataFrame) -> pd.DataFrame:
+    """Return legs grouped by unordered station pair in operational order.
+
+    Groups are ordered by their first departure and legs inside a group by
+    ``SD LOC``. Everything is derived from one stable sort over
+    (group first departure, pair, SD LOC) on integer station codes
+    instead of per-group sorting or string comparisons.
+    """
+    depart, arrivee = station_codes(df)
+    # Codes index the station dictionary, which may cover far more rows
+    # than ``df`` (cached schedules); unknown stations sort last, like NaN
+    missing = int(max(depart.max(initial=-1), arrivee.max(initial=-1))) + 1
+    known = (depart >= 0) & (arrivee >= 0)
+    swap = known & (depart > arrivee)
+    pair_lo = np.where(swap, arrivee, depart)
+    pair_hi = np.where(swap, depart, arrivee)
+    pair_lo[pair_lo < 0] = missing
+    pair_hi[pair_hi < 0] = missing
+
+    sd_loc = df["SD LOC"].to_numpy()
+    pair, _ = pd.factorize(pair_lo * (missing + 1) + pair_hi)
+    keys = pd.DataFrame(
+        {
+            "first": pd.Series(sd_loc).groupby(pair).transform("min"),
+            "lo": pair_lo,
+            "hi": pair_hi,
+            "sd": sd_loc,
+        }
+    )
+    order = keys.sort_values(list(keys.columns), kind="stable").index
+    return df.iloc[order.to_numpy()].reset_index(drop=True)
+
+
+def station_codes(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Return Départ and Arrivée as comparable codes, -1 when missing."""
+    depart = df["Départ"]
+    arrivee = df["Arrivée"]
+    if (
+        isinstance(depart.dtype, pd.CategoricalDtype)
+        and isinstance(arrivee.dtype, pd.CategoricalDtype)
+        and depart.cat.categories.equals(arrivee.cat.categories)
+    ):
+        return (
+            depart.cat.codes.to_numpy(np.int64),
+            arrivee.cat.codes.to_numpy(np.int64),
+        )
+    codes, _ = pd.factorize(pd.concat([depart, arrivee]), sort=True)
+    depart_codes, arrivee_codes = np.split(
+        codes.astype(np.int64), [len(depart)]
+    )
+    return depart_codes, arrivee_codes
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import io
+import math
+import mmap
+from collections.abc import Collection
+from datetime import date, datetime, time
+from typing import Any, BinaryIO, Literal
+
+import numpy as np
+import pandas as pd
+import xlrd
+from xlrd import xldate
+
+REQUIRED_COLUMNS = ["Num Vol", "Départ", "Arrivée", "Imma", "SD LOC", "SA LOC"]
+
+# OLE2 compound document signature shared by every BIFF (.xls) workbook
+XLS_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+# ZIP local file header opening every OOXML (.xlsx) workbook
+XLSX_SIGNATURE = b"PK\x03\x04"
+
+# A workbook as a stream or as bytes already in memory or mapped
+WorkbookSource = BinaryIO | bytes | mmap.mmap
+
+_MS_PER_DAY = 86_400_000
+# Day zero used for serials >= 60 (after Excel's 1900 leap year bug)
+_EPOCHS = {0: date(1899, 12, 30), 1: date(1904, 1, 1)}
+_TIME_ONLY_DAYS = {0: date(1899, 12, 31), 1: date(1904, 1, 1)}
+
+
+def detect_format(data: bytes | mmap.mmap) -> Literal["xls", "xlsx"]:
+    """Return the workbook format from its first bytes, not its name."""
+    if data[: len(XLS_SIGNATURE)] == XLS_SIGNATURE:
+        return "xls"
+    if data[: len(XLSX_SIGNATURE)] == XLSX_SIGNATURE:
+        return "xlsx"
+    raise ValueError("Invalid file type: expected an .xls or .xlsx workbook")
+
+
+def read_contents(source: WorkbookSource) -> bytes | mmap.mmap:
+    """Return the workbook bytes, reading a stream but never copying a map."""
+    if isinstance(source, (bytes, mmap.mmap)):
+        return source
+    return source.read()
+
+
+def read_schedule(
+    file_stream: WorkbookSource,
+    target_dates: Collection[date] | None = None,
+) -> pd.DataFrame:
+    """Read only REQUIRED_COLUMNS from the first sheet of a workbook.
+
+    The engine follows the file signature: xlrd for BIFF ``.xls`` and
+    openpyxl in read-only mode, one row at a time, for ``.xlsx``. The
+    header row is read first and a missing column raises ``ValueError``
+    before any data row is touched. When ``target_dates`` is given, rows
+    whose ``SD LOC`` is a date cell on another day are dropped at the cell
+    level and never reach the DataFrame. Text cells cannot be decided
+    without parsing and are kept for the regular date coercion.
+
+    ``file_stream`` may also be the workbook bytes or a memory map of the
+    file, which are parsed in place.
+    """
+    data = read_contents(file_stream)
+    if detect_format(data) == "xlsx":
+        return _read_xlsx_sheet(data, target_dates)
+
+    book = xlrd.open_workbook(file_contents=data, on_demand=True)
+    try:
+        return _read_biff_sheet(book, book.sheet_by_index(0), target_dates)
+    finally:
+        book.release_resources()
+
+
+def _read_xlsx_sheet(
+    data: bytes | mmap.mmap, target_dates: Collection[date] | None
+) -> pd.DataFrame:
+    """Stream the first worksheet of an OOXML workbook row by row."""
+    from openpyxl import load_workbook
+
+    archive = (
+        _MappedFile(data) if isinstance(data, mmap.mmap) else io.BytesIO(data)
+    )
+    book = load_workbook(archive, read_only=True, data_only=True)
+    try:
+        sheet = book.worksheets[0]
+        # Exporters often store a wrong used range; read what is there
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        _check_columns(header)
+        positions = [header.index(name) for name in REQUIRED_COLUMNS]
+        sd_loc = header.index("SD LOC")
+        targets = set(target_dates) if target_dates is not None else None
+        columns: list[list[Any]] = [[] for _ in REQUIRED_COLUMNS]
+        for row in rows:
+            departure = row[sd_loc] if sd_loc < len(row) else None
+            if (
+                targets is not None
+                and isinstance(departure, datetime)
+                and departure.date() not in targets
+            ):
+                continue
+            values = [
+                _xlsx_value(row[p] if p < len(row) else None)
+                for p in positions
+            ]
+            if all(value is np.nan for value in values):
+                continue
+            for column, value in zip(columns, values):
+                column.append(value)
+    finally:
+        book.close()
+    return pd.DataFrame(dict(zip(REQUIRED_COLUMNS, columns)))
+
+
+def _xlsx_value(value: Any) -> Any:
+    """Convert an openpyxl value the same way ``pd.read_excel`` does."""
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, float) and math.isfinite(value):
+        if int(value) == value:
+            return int(value)
+    return value
+
+
+def _read_biff_sheet(
+    book: xlrd.book.Book,
+    sheet: xlrd.sheet.Sheet,
+    target_dates: Collection[date] | None,
+) -> pd.DataFrame:
+    header = sheet.row_values(0) if sheet.nrows else []
+    _check_columns(header)
+    positions = {name: header.index(name) for name in REQUIRED_COLUMNS}
+
+    rows = _matching_rows(
+        sheet, positions["SD LOC"], book.datemode, target_dates
+    )
+    columns: dict[str, list[Any]] = {
+        name: [
+            _cell_value(
+                sheet.cell_value(r, position),
+                sheet.cell_type(r, position),
+                book.datemode,
+            )
+            for r in rows.tolist()
+        ]
+        for name, position in positions.items()
+    }
+    frame = pd.DataFrame(columns, columns=REQUIRED_COLUMNS)
+    # Rows without any required value are dropped, as on the .xlsx path
+    blank = frame.isna().all(axis=1)
+    if blank.any():
+        frame = frame[~blank].reset_index(drop=True)
+    return frame
+
+
+def _matching_rows(
+    sheet: xlrd.sheet.Sheet,
+    position: int,
+    datemode: int,
+    target_dates: Collection[date] | None,
+) -> np.ndarray:
+    """Return sheet row indexes whose departure may fall on a target date."""
+    row_index = np.arange(1, sheet.nrows)
+    if target_dates is None:
+        return row_index
+
+    types = np.asarray(sheet.col_types(position, start_rowx=1), dtype=np.int8)
+    serials = np.asarray(
+        [
+            value if isinstance(value, float) else math.nan
+            for value in sheet.col_values(position, start_rowx=1)
+        ],
+        dtype=np.float64,
+    )
+    # Date cells follow the workbook's date system; plain numbers are read
+    # as 1900-system serials by date coercion, so they are matched the same
+    date_targets = [(t - _EPOCHS[datemode]).days for t in target_dates]
+    serial_targets = [(t - _EPOCHS[0]).days for t in target_dates]
+
+    is_date = types == xlrd.XL_CELL_DATE
+    is_number = types == xlrd.XL_CELL_NUMBER
+    dated = np.where(is_date | is_number, serials, 0.0)
+    days = np.floor(dated)
+    # Same millisecond rounding as xlrd.xldate_as_datetime
+    ms = days * _MS_PER_DAY + np.round((dated - days) * _MS_PER_DAY)
+    day_numbers = np.floor(ms / _MS_PER_DAY)
+    on_target = (is_date & np.isin(day_numbers, date_targets)) | (
+        is_number & np.isin(day_numbers, serial_targets)
+    )
+    undecided = types == xlrd.XL_CELL_TEXT
+    return row_index[on_target | undecided]
+
+
+def _cell_value(value: Any, ctype: int, datemode: int) -> Any:
+    """Convert an xlrd cell the same way ``pd.read_excel`` does."""
+    if ctype == xlrd.XL_CELL_DATE:
+        try:
+            converted = xldate.xldate_as_datetime(value, datemode)
+        except OverflowError:
+            return value
+        # Excel has no time type: cells on the epoch day are times of day
+        if converted.date() == _TIME_ONLY_DAYS[datemode]:
+            return time(
+                converted.hour,
+                converted.minute,
+                converted.second,
+                converted.microsecond,
+            )
+        return converted
+    if ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+        return np.nan
+    if ctype == xlrd.XL_CELL_TEXT and value == "":
+        return np.nan
+    if ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(value)
+    if ctype == xlrd.XL_CELL_NUMBER and math.isfinite(value):
+        if int(value) == value:
+            return int(value)
+    return value
+
+
+def _check_columns(header: list[Any]) -> None:
+    missing = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing:
+        raise ValueError(f"Missing column: {missing[0]}")
+
+
+class _MappedFile(io.RawIOBase):
+    """Seekable file over a memory map, which zipfile needs before 3.13."""
+
+    def __init__(self, mapped: mmap.mmap) -> None:
+        super().__init__()
+        self._mapped = mapped
+        mapped.seek(0)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._mapped.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._mapped.seek(offset, whence)
+        return self._mapped.tell()
+
+    def tell(self) -> int:
+        return self._mapped.tell()
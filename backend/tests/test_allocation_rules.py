@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from backend.repository.allocation_rules import (
+    AllocationRule,
+    AllocationRules,
+    load_rules,
+    parse_rules,
+)
+from backend.repository.xls_parser import default_rules
+
+
+def _apply(
+    rules: AllocationRules, mode: str, legs: list[tuple[str, str, str]]
+) -> list[tuple[int, int]]:
+    depart, arrivee, imma = (pd.Series(column) for column in zip(*legs))
+    jc, yc = rules.compile(mode).apply(depart, arrivee, imma)
+    return list(zip(jc.tolist(), yc.tolist()))
+
+
+def test_packaged_rules_match_tech_spec() -> None:
+    legs = [
+        ("SVB", "TNR", "5REJK"),
+        ("TLE", "TNR", "5REJK"),
+        ("TNR", "TLE", "5REJK"),
+        ("NOS", "TNR", "UNKNOWN"),
+    ]
+    rules = default_rules()
+    assert _apply(rules, "commandes", legs) == [(2, 4), (2, 2), (0, 0), (2, 4)]
+    assert _apply(rules, "precommandes", legs) == [(0, 0)] * 4
+
+
+def test_first_matching_rule_wins_and_caps_clamp() -> None:
+    rules = AllocationRules(
+        allocations=(
+            AllocationRule(jc=5, yc=9, imma=frozenset({"5RMJF"})),
+            AllocationRule(jc=3, yc=3, depart=frozenset({"TLE"})),
+        ),
+        caps=(("5RMJF", (4, 8)),),
+        default_cap=(2, 99),
+    )
+    legs = [("TLE", "TNR", "5RMJF"), ("TLE", "TNR", "OTHER"), ("X", "Y", "Z")]
+    assert _apply(rules, "commandes", legs) == [(4, 8), (2, 3), (0, 0)]
+
+
+def test_load_rules_from_file(tmp_path: Path) -> None:
+    path = tmp_path / "rules.json"
+    path.write_text(
+        json.dumps(
+            {
+                "caps": {"5REJB": {"jc": 1, "yc": 1}},
+                "allocations": [{"arrivee": "DIE", "jc": 6, "yc": 6}],
+            }
+        )
+    )
+    rules = load_rules(path)
+    assert rules.default_cap == (99, 99)
+    legs = [("TNR", "DIE", "5REJB"), ("TNR", "DIE", "5REJK")]
+    assert _apply(rules, "precommandes", legs) == [(1, 1), (6, 6)]
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"allocations": [{"jc": 2}]},
+        {"allocations": [{"jc": -1, "yc": 0}]},
+        {"caps": {"5REJB": {"jc": "8", "yc": 62}}},
+        {"caps": []},
+    ],
+)
+def test_rejects_invalid_rules(config: dict) -> None:
+    with pytest.raises(ValueError, match="Invalid allocation rules"):
+        parse_rules(config)
+
+
+def test_load_rules_rejects_unreadable_file(tmp_path: Path) -> None:
+    path = tmp_path / "rules.json"
+    path.write_text("{not json")
+    with pytest.raises(ValueError, match="Invalid allocation rules"):
+        load_rules(path)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import date
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from backend.benchmarks.bench_pipeline import STAGES, compare, time_stages
+from backend.benchmarks.schedule_generator import (
+    XLS_MAX_ROWS,
+    generate_schedule,
+    parse_mix,
+    write_schedule,
+)
+from backend.repository.xls_reader import read_schedule
+
+
+def test_generator_is_seeded() -> None:
+    first = generate_schedule(200, seed=7)
+    pd.testing.assert_frame_equal(first, generate_schedule(200, seed=7))
+    assert not first.equals(generate_schedule(200, seed=8))
+    assert len(first) == 200
+    assert (first["Départ"] != first["Arrivée"]).all()
+    assert first["SD LOC"].is_monotonic_increasing
+
+
+def test_generator_honours_mixes() -> None:
+    frame = generate_schedule(
+        100, stations={"TNR": 1, "SVB": 1}, immas=parse_mix("5REJK")
+    )
+    assert set(frame["Départ"]) | set(frame["Arrivée"]) == {"TNR", "SVB"}
+    assert set(frame["Imma"]) == {"5REJK"}
+
+
+@pytest.mark.parametrize("fmt", ["xls", "xlsx"])
+def test_written_schedule_reads_back(fmt: str) -> None:
+    frame = generate_schedule(50, seed=1)
+    buffer = BytesIO()
+    write_schedule(frame, buffer, fmt)
+    buffer.seek(0)
+    df = read_schedule(buffer)
+    assert df["Num Vol"].tolist() == frame["Num Vol"].tolist()
+    assert (df["SD LOC"].to_numpy() == frame["SD LOC"].to_numpy()).all()
+
+
+def test_xls_row_limit() -> None:
+    frame = generate_schedule(XLS_MAX_ROWS + 1)
+    with pytest.raises(ValueError, match="at most"):
+        write_schedule(frame, BytesIO(), "xls")
+
+
+def test_time_stages_covers_every_stage() -> None:
+    today = date.today()
+    buffer = BytesIO()
+    write_schedule(generate_schedule(40, start=today), buffer, "xls")
+    timings = time_stages(buffer.getvalue(), "commandes", today, repeat=1)
+    assert tuple(timings) == STAGES
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+def test_compare_flags_stages_beyond_tolerance() -> None:
+    baseline = {
+        "results": [
+            {"format": "xls", "rows": 10, "stages": {"read": 1.0, "http": 1.0}}
+        ]
+    }
+    current = {
+        "results": [
+            {
+                "format": "xls",
+                "rows": 10,
+                "stages": {"read": 1.1, "http": 1.5},
+            },
+            {"format": "xlsx", "rows": 10, "stages": {"read": 9.0}},
+        ]
+    }
+    regressions = compare(current, baseline, tolerance=0.2)
+    assert [(r.stage, r.ratio) for r in regressions] == [("http", 1.5)]
+    assert compare(current, baseline, tolerance=0.6) == []
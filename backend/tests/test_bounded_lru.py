@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from backend.repository.bounded_lru import BoundedLRU
+
+
+class _Expiring(BoundedLRU[str]):
+    def is_stale(self, value: str) -> bool:
+        return value.startswith("old")
+
+
+def test_bounds_by_entries_and_size() -> None:
+    cache: BoundedLRU[str] = BoundedLRU(2, 8, len)
+    cache.put("a", "1234")
+    cache.put("b", "1234")
+    assert cache.get("a") == "1234"
+    cache.put("c", "1")
+    assert cache.get("b") is None
+    cache.put("d", "1234567")
+    assert cache.get("a") is None
+    assert cache.put("big", "123456789") is None
+    assert cache.get("big") is None
+    stats = cache.stats()
+    assert (stats.entries, stats.bytes) == (2, 8)
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 3, 2)
+
+
+def test_replacing_a_key_recharges_its_size() -> None:
+    cache: BoundedLRU[str] = BoundedLRU(4, 100, len)
+    cache.put("a", "12345")
+    cache.put("a", "12")
+    assert cache.stats().bytes == 2
+
+
+def test_stale_values_are_dropped_on_access() -> None:
+    cache = _Expiring(4, 100, len)
+    cache.put("a", "old value")
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats.entries, stats.bytes, stats.evictions) == (0, 0, 1)
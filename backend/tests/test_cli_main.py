@@ -1,36 +1,15 @@
 from __future__ import annotations
 
 import json
+import os
 import subprocess
 from datetime import date, datetime, timedelta
-from io import BytesIO
 from pathlib import Path
+from typing import Any
 
-import xlwt
-
-from .xls_helper import assert_true_xls
-
-
-def _make_xls(rows: list[dict]) -> BytesIO:
-    workbook = xlwt.Workbook()
-    sheet = workbook.add_sheet("Sheet1")
-    if rows:
-        headers = list(rows[0].keys())
-        for col, header in enumerate(headers):
-            sheet.write(0, col, header)
-        date_style = xlwt.easyxf(num_format_str="YYYY-MM-DD HH:MM:SS")
-        for row_index, row in enumerate(rows, 1):
-            for col_index, header in enumerate(headers):
-                value = row.get(header)
-                if isinstance(value, datetime):
-                    sheet.write(row_index, col_index, value, date_style)
-                else:
-                    sheet.write(row_index, col_index, value)
-    buffer = BytesIO()
-    workbook.save(buffer)
-    buffer.seek(0)
-    assert_true_xls(buffer)
-    return buffer
+import pytest
+
+from .xls_helper import make_xls
 
 
 def test_cli_main_writes_json(tmp_path: Path) -> None:
@@ -51,7 +30,7 @@ def test_cli_main_writes_json(tmp_path: Path) -> None:
             ),
         }
     ]
-    buf = _make_xls(rows)
+    buf = make_xls(rows)
     input_path = tmp_path / "in.xls"
     input_path.write_bytes(buf.getvalue())
     output_path = tmp_path / "out.json"
@@ -76,3 +55,327 @@ def test_cli_main_writes_json(tmp_path: Path) -> None:
     assert result.returncode == 0, result.stderr
     data = json.loads(output_path.read_text())
     assert data[0]["num_vol"] == "AF1"
+
+
+def test_cli_main_days_writes_per_date_json(tmp_path: Path) -> None:
+    today = date.today()
+    rows = [
+        {
+            "Num Vol": f"AF{offset}",
+            "Départ": "CDG",
+            "Arrivée": "JFK",
+            "Imma": "F-1",
+            "SD LOC": datetime.combine(
+                today + timedelta(days=offset),
+                datetime.min.time(),
+            ),
+            "SA LOC": datetime.combine(
+                today + timedelta(days=offset),
+                datetime.min.time(),
+            ),
+        }
+        for offset in (1, 3)
+    ]
+    input_path = tmp_path / "in.xls"
+    input_path.write_bytes(make_xls(rows).getvalue())
+    output_path = tmp_path / "out.json"
+
+    result = subprocess.run(
+        [
+            "python",
+            "cli/main.py",
+            "--input",
+            str(input_path),
+            "--output",
+            str(output_path),
+            "--days",
+            "1,2,3",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    data = json.loads(output_path.read_text())
+    days = [(today + timedelta(days=d)).isoformat() for d in (1, 2, 3)]
+    assert list(data) == days
+    assert [r["num_vol"] for r in data[days[0]]] == ["AF1"]
+    assert data[days[1]] == []
+    assert [r["num_vol"] for r in data[days[2]]] == ["AF3"]
+
+
+def test_cli_main_writes_ndjson(tmp_path: Path) -> None:
+    today = date.today()
+    departure = datetime.combine(
+        today + timedelta(days=2), datetime.min.time()
+    )
+    rows = [
+        {
+            "Num Vol": "AF2",
+            "Départ": "CDG",
+            "Arrivée": "JFK",
+            "Imma": "F-1",
+            "SD LOC": departure,
+            "SA LOC": departure,
+        }
+    ]
+    input_path = tmp_path / "in.xls"
+    input_path.write_bytes(make_xls(rows).getvalue())
+    output_path = tmp_path / "out.ndjson"
+
+    result = subprocess.run(
+        [
+            "python",
+            "cli/main.py",
+            "--input",
+            str(input_path),
+            "--output",
+            str(output_path),
+            "--mode",
+            "precommandes",
+            "--format",
+            "ndjson",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    lines = output_path.read_text().splitlines()
+    assert [json.loads(line)["num_vol"] for line in lines] == ["AF2"]
+
+
+def test_cli_main_profile_reports_stages(tmp_path: Path) -> None:
+    departure = datetime.combine(
+        date.today() + timedelta(days=1), datetime.min.time()
+    )
+    rows = [
+        {
+            "Num Vol": "AF3",
+            "Départ": "CDG",
+            "Arrivée": "JFK",
+            "Imma": "F-1",
+            "SD LOC": departure,
+            "SA LOC": departure,
+        }
+    ]
+    input_path = tmp_path / "in.xls"
+    input_path.write_bytes(make_xls(rows).getvalue())
+
+    result = subprocess.run(
+        [
+            "python",
+            "cli/main.py",
+            "--input",
+            str(input_path),
+            "--output",
+            str(tmp_path / "out.json"),
+            "--mode",
+            "commandes",
+            "--profile",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    stages = [line.split()[0] for line in result.stderr.splitlines()]
+    assert stages[1:8] == [
+        "read",
+        "coerce",
+        "filter",
+        "pairing",
+        "build",
+        "write",
+        "total",
+    ]
+    assert "peak RSS" in result.stderr
+
+
+def test_cli_batch_converts_directory_and_reports_failures(
+    tmp_path: Path,
+) -> None:
+    today = date.today()
+    departure = datetime.combine(
+        today + timedelta(days=1), datetime.min.time()
+    )
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    for name in ("a", "b"):
+        rows = [
+            {
+                "Num Vol": f"AF-{name}",
+                "Départ": "CDG",
+                "Arrivée": "JFK",
+                "Imma": "F-1",
+                "SD LOC": departure,
+                "SA LOC": departure,
+            }
+        ]
+        (inputs / f"{name}.xls").write_bytes(make_xls(rows).getvalue())
+    (inputs / "broken.xls").write_bytes(b"not a workbook")
+    output_dir = tmp_path / "out"
+
+    result = subprocess.run(
+        [
+            "python",
+            "cli/main.py",
+            "batch",
+            str(inputs),
+            "--output-dir",
+            str(output_dir),
+            "--mode",
+            "commandes",
+            "--workers",
+            "2",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 1, result.stderr
+    assert "files: 3 ok: 2 failed: 1" in result.stdout
+    assert "rows/sec" in result.stdout
+    assert f"FAILED {inputs / 'broken.xls'}" in result.stdout
+    assert sorted(p.name for p in output_dir.iterdir()) == ["a.json", "b.json"]
+    data = json.loads((output_dir / "a.json").read_text())
+    assert data[0]["num_vol"] == "AF-a"
+
+
+def _crash_on_oom(input_path: Path, output_path: Path, *args: object) -> Any:
+    from cli.batch import convert_file
+
+    if input_path.stem == "oom":
+        os._exit(1)  # a worker killed outright, as by the OOM killer
+    return convert_file(input_path, output_path, *args)
+
+
+def test_cli_batch_output_names_never_collide(tmp_path: Path) -> None:
+    from cli.batch import output_paths
+
+    inputs = [
+        Path("x/a.xls"),
+        Path("x/a-1.xls"),
+        Path("y/a.xls"),
+        Path("y/A.xlsx"),
+    ]
+    names = [p.name for p in output_paths(inputs, tmp_path, ".json")]
+    assert names == ["a.json", "a-1.json", "a-2.json", "A-3.json"]
+
+
+def test_cli_batch_survives_a_dead_worker(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from cli import batch
+    from cli.batch import convert_all
+
+    alone: list[str] = []
+    run_jobs = batch.run_jobs
+
+    def record(jobs: list[Any], workers: int, *args: Any) -> Any:
+        if workers == 1:
+            alone.extend(source.stem for source, _ in jobs)
+        return run_jobs(jobs, workers, *args)
+
+    monkeypatch.setattr(batch, "run_jobs", record)
+
+    departure = datetime(2025, 7, 11, 8, 0)
+    row = {
+        "Num Vol": "AF1",
+        "Départ": "CDG",
+        "Arrivée": "JFK",
+        "Imma": "F-1",
+        "SD LOC": departure,
+        "SA LOC": departure,
+    }
+    jobs = []
+    names = ("a", "oom", "b", "c", "d", "e")
+    for name in names:
+        source = tmp_path / f"{name}.xls"
+        source.write_bytes(make_xls([row]).getvalue())
+        jobs.append((source, tmp_path / f"{name}.json"))
+    args = ("commandes", None, "json", date(2025, 7, 10))
+
+    results = convert_all(jobs, 2, args, _crash_on_oom)
+    by_name = {Path(r.input_path).stem: r for r in results}
+    assert sorted(by_name) == sorted(names)
+    assert by_name["oom"].error == "BrokenProcessPool: worker process died"
+    assert all(by_name[name].rows == 1 for name in names if name != "oom")
+    # Only the crashing file and the one running beside it are isolated
+    assert "oom" in alone and set(alone) <= {"a", "oom"}
+
+
+def test_cli_serve_answers_json_rpc_until_shutdown(tmp_path: Path) -> None:
+    departure = datetime.combine(
+        date.today() + timedelta(days=1), datetime.min.time()
+    )
+    rows = [
+        {
+            "Num Vol": "AF4",
+            "Départ": "CDG",
+            "Arrivée": "JFK",
+            "Imma": "F-1",
+            "SD LOC": departure,
+            "SA LOC": departure,
+        }
+    ]
+    input_path = tmp_path / "in.xls"
+    input_path.write_bytes(make_xls(rows).getvalue())
+    output_path = tmp_path / "out.json"
+    requests = [
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "process",
+            "params": {"path": str(input_path), "mode": "commandes"},
+        },
+        {
+            "jsonrpc": "2.0",
+            "id": 2,
+            "method": "process",
+            "params": {
+                "path": str(input_path),
+                "mode": "all",
+                "output": str(output_path),
+            },
+        },
+        {"jsonrpc": "2.0", "id": 3, "method": "process", "params": {}},
+        {"jsonrpc": "2.0", "method": "ping"},
+        {"jsonrpc": "2.0", "id": 4, "method": "shutdown"},
+        {"jsonrpc": "2.0", "id": 5, "method": "ping"},
+    ]
+
+    result = subprocess.run(
+        ["python", "cli/main.py", "serve", "--idle-timeout", "30"],
+        input="".join(json.dumps(r) + "\n" for r in requests),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    ready, *responses = [json.loads(line) for line in lines]
+    assert ready["method"] == "ready"
+    assert [r["id"] for r in responses] == [1, 2, 3, 4]
+    assert [row["num_vol"] for row in responses[0]["result"]] == ["AF4"]
+    assert responses[1]["result"] == {"output": str(output_path), "rows": 1}
+    assert responses[2]["error"]["code"] == -32602
+    assert responses[3]["result"] is None
+    assert json.loads(output_path.read_text())
+
+
+def test_cli_serve_stdin_channel_times_out_when_idle() -> None:
+    from cli.serve import QueuedLineChannel
+
+    read_fd, write_fd = os.pipe()
+    channel = QueuedLineChannel(lambda size: os.read(read_fd, size))
+    os.write(write_fd, b'{"a": 1}\n{"b"')
+    assert channel.read_line(5) == b'{"a": 1}\n'
+    assert channel.read_line(0.05) is None
+    os.write(write_fd, b": 2}\n{")
+    assert channel.read_line(5) == b'{"b": 2}\n'
+    os.close(write_fd)
+    assert channel.read_line(5) == b"{"
+    assert channel.read_line(5) == b""
+    os.close(read_fd)
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.internal.infrastructure import Settings, load_env
+
+
+def test_defaults_when_unset() -> None:
+    assert load_env({}) == Settings()
+
+
+def test_reads_cache_limits() -> None:
+    settings = load_env(
+        {
+            "SCHEDULE_CACHE_MAX_ENTRIES": "3",
+            "SCHEDULE_CACHE_MAX_BYTES": "1024",
+        }
+    )
+    assert settings.schedule_cache_max_entries == 3
+    assert settings.schedule_cache_max_bytes == 1024
+
+
+def test_rejects_invalid_integer() -> None:
+    with pytest.raises(ValueError, match="SCHEDULE_CACHE_MAX_ENTRIES"):
+        load_env({"SCHEDULE_CACHE_MAX_ENTRIES": "many"})
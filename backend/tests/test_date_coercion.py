@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+from backend.repository.date_coercion import coerce_datetimes
+from backend.repository.xls_parser import normalize_dates
+
+
+def _coerce(values: list[object], dtype: object = object):
+    return coerce_datetimes(pd.Series(values, dtype=dtype, name="SD LOC"))
+
+
+def test_native_datetimes_are_kept() -> None:
+    values = pd.Series(
+        pd.to_datetime(["2025-07-11 08:00", None]), name="SD LOC"
+    )
+    converted, stats = coerce_datetimes(values)
+    assert converted.dtype == "datetime64[us]"
+    assert (stats.kind, stats.fast, stats.slow, stats.nat) == (
+        "datetime",
+        1,
+        0,
+        0,
+    )
+
+
+def test_excel_serials() -> None:
+    converted, stats = _coerce([45849.3333333333, 45849, np.nan], None)
+    assert converted.tolist()[:2] == [
+        pd.Timestamp("2025-07-11 08:00"),
+        pd.Timestamp("2025-07-11"),
+    ]
+    assert pd.isna(converted.iloc[2])
+    assert (stats.kind, stats.fast, stats.nat) == ("serial", 2, 0)
+
+
+def test_dominant_string_format_is_day_first() -> None:
+    converted, stats = _coerce(
+        ["11/07/2025 08:00", "12/07/2025 09:30", "2025-07-13 10:00:00"], "str"
+    )
+    assert converted.tolist() == [
+        pd.Timestamp("2025-07-11 08:00"),
+        pd.Timestamp("2025-07-12 09:30"),
+        pd.Timestamp("2025-07-13 10:00"),
+    ]
+    assert (stats.kind, stats.fast, stats.slow) == ("%d/%m/%Y %H:%M", 2, 1)
+
+
+def test_ambiguous_slashed_dates_are_day_first() -> None:
+    # pd.to_datetime alone reads these month first (July 11th)
+    bulk, _ = _coerce(["07/11/2025 08:00", "08/11/2025 09:00"], "str")
+    one_by_one, stats = _coerce(["07/11/2025 08:00", "junk"], object)
+    assert bulk.iloc[0] == pd.Timestamp("2025-11-07 08:00")
+    assert one_by_one.iloc[0] == pd.Timestamp("2025-11-07 08:00")
+    assert stats.nat == 1
+
+
+def test_mixed_column_reports_invalid_values() -> None:
+    converted, stats = _coerce(
+        [
+            datetime(2025, 7, 11, 8, 0),
+            "2025-07-11 09:00:00",
+            45849.5,
+            "N/A",
+            time(8, 0),
+            "  ",
+            None,
+        ]
+    )
+    assert converted.tolist()[:3] == [
+        pd.Timestamp("2025-07-11 08:00"),
+        pd.Timestamp("2025-07-11 09:00"),
+        pd.Timestamp("2025-07-11 12:00"),
+    ]
+    assert converted.iloc[3:].isna().all()
+    assert (stats.fast, stats.slow, stats.nat) == (3, 2, 2)
+    assert stats.examples == ("N/A", "08:00:00")
+
+
+def test_normalize_dates_records_invalid_counts() -> None:
+    df = pd.DataFrame(
+        {
+            "SD LOC": ["2025-07-11 08:00:00", "bad"],
+            "SA LOC": ["2025-07-11 09:00:00", "2025-07-11 10:00:00"],
+        }
+    )
+    normalize_dates(df)
+    assert df.attrs["invalid_dates"] == {"SD LOC": 1, "SA LOC": 0}
+    assert df["SD LOC"].dtype == "datetime64[us]"
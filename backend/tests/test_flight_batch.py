@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from backend.domain import (
+    FlightBatch,
+    FlightRow,
+    batches_to_json,
+    iter_batches_json,
+)
+
+
+def _batch(**overrides: object) -> FlightBatch:
+    columns: dict[str, object] = {
+        "num_vol": ["MD100", "MD101"],
+        "depart": ["TNR", "TLE"],
+        "arrivee": ["TLE", "TNR"],
+        "imma": ["5REJK", "5REJK"],
+        "sd_loc": [
+            datetime(2025, 7, 11, 8, 0),
+            datetime(2025, 7, 11, 16, 0, 0, 500000),
+        ],
+        "sa_loc": [
+            datetime(2025, 7, 11, 9, 30),
+            datetime(2025, 7, 11, 18, 0),
+        ],
+        "jc": [0, 2],
+        "yc": [0, 2],
+    }
+    columns.update(overrides)
+    return FlightBatch.from_columns(**columns)
+
+
+def test_rows_are_built_on_access() -> None:
+    batch = _batch()
+    assert len(batch) == 2
+    row = batch[1]
+    assert isinstance(row, FlightRow)
+    assert row.num_vol == "MD101"
+    assert row.sd_loc == datetime(2025, 7, 11, 16, 0, 0, 500000)
+    assert [r.num_vol for r in batch] == ["MD100", "MD101"]
+
+
+def test_json_matches_flight_row_dump() -> None:
+    batch = _batch()
+    expected = [row.model_dump(mode="json") for row in batch.to_rows()]
+    assert batch.to_records() == expected
+    assert json.loads(batch.to_json()) == expected
+
+
+def test_slice_returns_batch() -> None:
+    part = _batch()[1:]
+    assert isinstance(part, FlightBatch)
+    assert [r.num_vol for r in part] == ["MD101"]
+
+
+def test_empty_batch() -> None:
+    batch = FlightBatch.empty()
+    assert len(batch) == 0
+    assert batch.to_json() == b"[]"
+
+
+def test_rejects_non_string_codes() -> None:
+    with pytest.raises(ValueError, match="num_vol"):
+        _batch(num_vol=["MD100", 101])
+
+
+def test_rejects_missing_dates() -> None:
+    with pytest.raises(ValueError, match="sa_loc"):
+        _batch(sa_loc=np.array(["2025-07-11T09:30", "NaT"], "datetime64[s]"))
+
+
+def test_chunked_json_matches_to_json() -> None:
+    batch = _batch()
+    chunks = list(batch.iter_json(chunk_rows=1))
+    assert len(chunks) == 4
+    assert b"".join(chunks) == batch.to_json()
+
+
+def test_ndjson_lines_tagged_with_date() -> None:
+    batch = _batch()
+    day = date(2025, 7, 11)
+    lines = b"".join(batch.iter_ndjson(chunk_rows=1, day=day)).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["num_vol"] for r in records] == ["MD100", "MD101"]
+    assert {r.pop("date") for r in records} == {"2025-07-11"}
+    assert records == batch.to_records()
+
+
+def test_chunked_batches_match_batches_to_json() -> None:
+    batches = {date(2025, 7, 11): _batch(), date(2025, 7, 12): _batch()[:0]}
+    streamed = b"".join(iter_batches_json(batches, chunk_rows=1))
+    assert streamed == batches_to_json(batches)
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import os
+import re
+import tracemalloc
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import unquote
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.delivery.pdf_routes import pdf_page_renderer, router
+from backend.domain import FlightRow
+from backend.repository.command_sheet import (
+    ROWS_PER_PAGE,
+    render_page,
+    sheet_form,
+)
+from backend.repository.page_cache import PageCache
+from backend.repository.pdf_writer import pdf_string
+from backend.usecase.generate_pdf_service import (
+    SHARD_PAGES,
+    ParallelRendering,
+    format_filename,
+    generate_pdf,
+    shared_parallel_rendering,
+    validate_rows,
+)
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+
+def _flights(count: int, jc: int = 4) -> list[FlightRow]:
+    start = datetime(2025, 7, 11, 6, 0)
+    return [
+        FlightRow(
+            num_vol=f"MD{700 + index}",
+            depart="TNR" if index % 2 == 0 else "NOS",
+            arrivee="NOS" if index % 2 == 0 else "TNR",
+            imma="5RMKA",
+            sd_loc=start + timedelta(minutes=15 * index),
+            sa_loc=start + timedelta(minutes=15 * index + 60),
+            jc=jc,
+            yc=index % 90,
+        )
+        for index in range(count)
+    ]
+
+
+def _check_structure(pdf: bytes) -> list[bytes]:
+    """Check the xref table and return the decoded page contents."""
+    assert pdf.startswith(b"%PDF-1.4")
+    assert pdf.endswith(b"%%EOF\n")
+    xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    assert pdf[xref:].startswith(b"xref\n")
+    offsets = re.findall(rb"(\d{10}) 00000 n ", pdf[xref:])
+    for number, offset in enumerate(offsets, 1):
+        assert pdf[int(offset):].startswith(b"%d 0 obj" % number)
+    streams = re.findall(rb"(<<[^\n]*>>)\nstream\n(.*?)\nendstream", pdf, re.S)
+    return [
+        zlib.decompress(stream)
+        for header, stream in streams
+        if b"/Subtype /Form" not in header
+    ]
+
+
+def test_pages_keep_flight_order() -> None:
+    flights = _flights(ROWS_PER_PAGE + 3)
+    pages = _check_structure(b"".join(generate_pdf(flights, "commandes")))
+    assert len(pages) == 2
+    assert b"/Count 2" in b"".join(generate_pdf(flights, "commandes"))
+    text = b"".join(pages)
+    positions = [text.index(b"(%s)" % f.num_vol.encode()) for f in flights]
+    assert positions == sorted(positions)
+    assert pdf_string("11/07/2025") in pages[0]
+
+
+def test_static_frame_is_a_shared_form() -> None:
+    pdf = b"".join(generate_pdf(_flights(ROWS_PER_PAGE * 3), "commandes"))
+    assert pdf.count(b"/Subtype /Form") == 1
+    pages = _check_structure(pdf)
+    assert all(page.startswith(b"/Sheet Do\n") for page in pages)
+    # grid lines and captions only live in the form
+    assert not any(b" l S" in page for page in pages)
+    assert not any(pdf_string("N° Vol") in page for page in pages)
+    assert sheet_form("commandes") is sheet_form("commandes")
+    assert pdf_string("Commandes définitives") in sheet_form("commandes")
+    assert pdf_string("Pré-commandes") in sheet_form("precommandes")
+
+
+def test_one_chunk_per_page() -> None:
+    chunks = list(generate_pdf(_flights(ROWS_PER_PAGE * 5), "precommandes"))
+    # header, five pages, page tree and trailer
+    assert len(chunks) == 7
+    assert all(b"/Type /Page " in chunk for chunk in chunks[1:-1])
+
+
+def test_memory_does_not_grow_with_sheet_length() -> None:
+    def peak(flights: list[FlightRow]) -> int:
+        tracemalloc.start()
+        for _ in generate_pdf(flights, "commandes"):
+            pass
+        _, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return top
+
+    small = _flights(ROWS_PER_PAGE * 2)
+    large = _flights(ROWS_PER_PAGE * 200)
+    assert peak(large) < peak(small) + 64_000
+
+
+def test_empty_sheet_is_valid() -> None:
+    pdf = b"".join(generate_pdf([], "commandes", date(2025, 7, 11)))
+    assert _check_structure(pdf) == []
+    assert b"/Count 0" in pdf
+
+
+def test_parallel_output_matches_serial() -> None:
+    flights = _flights(ROWS_PER_PAGE * SHARD_PAGES * 2 + 7)
+    serial = b"".join(generate_pdf(flights, "commandes"))
+    with ProcessPoolExecutor(2) as executor:
+        parallel = ParallelRendering(executor, workers=2, threshold=100)
+        sharded = b"".join(
+            generate_pdf(flights, "commandes", parallel=parallel)
+        )
+    assert sharded == serial
+    assert len(_check_structure(sharded)) == SHARD_PAGES * 2 + 1
+
+
+def test_parallel_mode_needs_threshold() -> None:
+    class Refusing(Executor):
+        def submit(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+            raise AssertionError("small sheets render serially")
+
+    parallel = ParallelRendering(Refusing(), workers=2, threshold=1000)
+    chunks = list(generate_pdf(_flights(999), "commandes", parallel=parallel))
+    assert len(chunks) == 2 + -(-999 // ROWS_PER_PAGE)
+
+
+def test_page_cache_renders_only_changed_pages() -> None:
+    flights = _flights(ROWS_PER_PAGE * 4)
+    cache = PageCache()
+    drawn: list[int] = []
+
+    def render(rows, mode, day, number):  # type: ignore[no-untyped-def]
+        drawn.append(number)
+        return render_page(rows, mode, day, number)
+
+    first = b"".join(
+        generate_pdf(flights, "commandes", render=render, page_cache=cache)
+    )
+    again = b"".join(
+        generate_pdf(flights, "commandes", render=render, page_cache=cache)
+    )
+    assert again == first
+    assert drawn == [1, 2, 3, 4]
+    flights[ROWS_PER_PAGE * 2] = flights[ROWS_PER_PAGE * 2].model_copy(
+        update={"yc": 77}
+    )
+    edited = b"".join(
+        generate_pdf(flights, "commandes", render=render, page_cache=cache)
+    )
+    assert drawn == [1, 2, 3, 4, 3]
+    assert edited == b"".join(generate_pdf(flights, "commandes"))
+
+
+def test_parallel_mode_sends_only_uncached_pages() -> None:
+    flights = _flights(ROWS_PER_PAGE * SHARD_PAGES * 2)
+    cache = PageCache()
+    with ProcessPoolExecutor(2) as executor:
+        parallel = ParallelRendering(executor, workers=2, threshold=1)
+        first = b"".join(
+            generate_pdf(
+                flights, "commandes", parallel=parallel, page_cache=cache
+            )
+        )
+        flights[5] = flights[5].model_copy(update={"jc": 9})
+        edited = b"".join(
+            generate_pdf(
+                flights, "commandes", parallel=parallel, page_cache=cache
+            )
+        )
+    assert cache.stats().misses == SHARD_PAGES * 2 + 1
+    assert edited != first
+    assert edited == b"".join(generate_pdf(flights, "commandes"))
+
+
+_TEST_PID = os.getpid()
+
+
+def _render_dies_in_worker(
+    rows: list[FlightRow], mode: str, day: date, number: int
+) -> bytes:
+    if os.getpid() != _TEST_PID:
+        os._exit(1)  # a renderer killed outright, as by the OOM killer
+    return render_page(rows, mode, day, number)
+
+
+def test_dead_renderer_finishes_serially_and_drops_the_pool(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("PDF_RENDER_WORKERS", "2")
+    monkeypatch.setenv("PDF_PARALLEL_THRESHOLD", "1")
+    flights = _flights(ROWS_PER_PAGE * SHARD_PAGES * 2 + 7)
+    shared_parallel_rendering.cache_clear()
+    try:
+        parallel = shared_parallel_rendering()
+        assert parallel is not None
+        pdf = b"".join(
+            generate_pdf(
+                flights,
+                "commandes",
+                render=_render_dies_in_worker,
+                parallel=parallel,
+            )
+        )
+        fresh = shared_parallel_rendering()
+        assert fresh is not None and fresh is not parallel
+        fresh.executor.shutdown()
+    finally:
+        shared_parallel_rendering.cache_clear()
+    assert pdf == b"".join(generate_pdf(flights, "commandes"))
+
+
+@pytest.mark.parametrize(
+    ("env", "enabled"),
+    [
+        ({"PDF_RENDER_WORKERS": "1"}, False),
+        ({"PDF_RENDER_WORKERS": "2", "PDF_PARALLEL_THRESHOLD": "0"}, False),
+        ({"PDF_RENDER_WORKERS": "2", "PDF_PARALLEL_THRESHOLD": "10"}, True),
+    ],
+)
+def test_shared_parallel_rendering_from_env(
+    monkeypatch: pytest.MonkeyPatch, env: dict[str, str], enabled: bool
+) -> None:
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    shared_parallel_rendering.cache_clear()
+    try:
+        parallel = shared_parallel_rendering()
+        assert (parallel is not None) == enabled
+        if parallel is not None:
+            assert parallel.threshold == 10
+            parallel.executor.shutdown()
+    finally:
+        shared_parallel_rendering.cache_clear()
+
+
+@pytest.mark.parametrize("field", ["jc", "yc"])
+def test_validate_rows_rejects_out_of_range(field: str) -> None:
+    flights = _flights(3)
+    flights[1] = flights[1].model_copy(update={field: 100})
+    with pytest.raises(ValueError, match=f"{field.upper()}=100"):
+        validate_rows(flights)
+    validate_rows(_flights(3))
+
+
+def test_format_filename() -> None:
+    day = date(2025, 7, 12)
+    assert (
+        format_filename("commandes", day)
+        == "Commandes_définitives_2025-07-12.pdf"
+    )
+    assert (
+        format_filename("precommandes", day) == "Pré-commandes_2025-07-12.pdf"
+    )
+
+
+@pytest.mark.parametrize(
+    ("mode", "filename"),
+    [
+        ("commandes", "Commandes_définitives_2025-07-11.pdf"),
+        ("precommandes", "Pré-commandes_2025-07-11.pdf"),
+    ],
+)
+def test_endpoint_streams_pdf(mode: str, filename: str) -> None:
+    flights = _flights(30)
+    response = client.post(
+        "/generatePDF",
+        json={
+            "flights": [f.model_dump(mode="json") for f in flights],
+            "mode": mode,
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    disposition = response.headers["content-disposition"]
+    assert disposition.startswith("attachment;")
+    assert unquote(disposition.split("UTF-8''")[1]) == filename
+    assert len(_check_structure(response.content)) == 2
+
+
+def test_endpoint_rejects_invalid_allocation() -> None:
+    payload = [f.model_dump(mode="json") for f in _flights(2, jc=120)]
+    response = client.post(
+        "/generatePDF", json={"flights": payload, "mode": "commandes"}
+    )
+    assert response.status_code == 400
+    assert "Invalid JC/YC" in response.json()["detail"]
+
+
+def test_endpoint_uses_injected_renderer() -> None:
+    calls = []
+
+    def render(rows, mode, day, number):  # type: ignore[no-untyped-def]
+        calls.append((len(rows), mode, day, number))
+        return b""
+
+    app.dependency_overrides[pdf_page_renderer] = lambda: render
+    try:
+        payload = [f.model_dump(mode="json") for f in _flights(30)]
+        response = client.post(
+            "/generatePDF", json={"flights": payload, "mode": "commandes"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert calls == [
+        (ROWS_PER_PAGE, "commandes", date(2025, 7, 11), 1),
+        (30 - ROWS_PER_PAGE, "commandes", date(2025, 7, 11), 2),
+    ]
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.benchmarks.import_report import (
+    COLD_START_BUDGET_MS,
+    measure,
+    parse_importtime,
+)
+
+
+def test_parse_importtime_reads_depth() -> None:
+    records = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   numpy._core\n"
+        "import time:       300 |        420 | numpy\n"
+    )
+    assert [(r.module, r.depth, r.cumulative_us) for r in records] == [
+        ("numpy._core", 1, 120),
+        ("numpy", 0, 420),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("command", "returncode"),
+    [
+        (["cli/main.py", "--help"], 0),
+        (["cli/main.py", "batch", "--help"], 0),
+        (
+            ["cli/main.py", "--input", "a.xls", "--output", "b"]
+            + ["--days", "x"],
+            2,
+        ),
+    ],
+)
+def test_cli_arguments_skip_heavy_imports(
+    command: list[str], returncode: int
+) -> None:
+    report = measure(command)
+    assert report.returncode == returncode
+    assert report.heavy() == []
+
+
+def test_cli_help_within_cold_start_budget() -> None:
+    report = measure(["cli/main.py", "--help"])
+    assert report.returncode == 0
+    assert report.total_ms <= COLD_START_BUDGET_MS, report.total_ms
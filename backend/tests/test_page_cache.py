@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import pytest
+
+from backend.domain import FlightRow
+from backend.repository import page_cache as page_cache_module
+from backend.repository.page_cache import PageCache
+
+DAY = date(2025, 7, 11)
+
+
+def _row(jc: int = 4) -> FlightRow:
+    return FlightRow(
+        num_vol="MD700",
+        depart="TNR",
+        arrivee="NOS",
+        imma="5RMKA",
+        sd_loc=datetime(2025, 7, 11, 6, 0),
+        sa_loc=datetime(2025, 7, 11, 7, 0),
+        jc=jc,
+        yc=12,
+    )
+
+
+def test_key_covers_values_and_layout(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    key = PageCache.key_for([_row()], "commandes", DAY, 1)
+    assert key == PageCache.key_for([_row()], "commandes", DAY, 1)
+    assert key != PageCache.key_for([_row(jc=5)], "commandes", DAY, 1)
+    assert key != PageCache.key_for([_row()], "precommandes", DAY, 1)
+    assert key != PageCache.key_for([_row()], "commandes", DAY, 2)
+    assert key != PageCache.key_for([_row()], "commandes", DAY, 1, "other")
+    monkeypatch.setattr(page_cache_module, "LAYOUT_VERSION", 99)
+    assert key != PageCache.key_for([_row()], "commandes", DAY, 1)
+
+
+def test_lru_eviction_by_entries() -> None:
+    cache = PageCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    stats = cache.stats()
+    assert (stats.entries, stats.evictions, stats.hits, stats.misses) == (
+        2,
+        1,
+        2,
+        1,
+    )
+
+
+def test_eviction_by_bytes() -> None:
+    cache = PageCache(max_bytes=10)
+    cache.put("a", b"x" * 6)
+    cache.put("b", b"y" * 6)
+    assert cache.get("a") is None
+    assert cache.stats().bytes == 6
+    cache.put("huge", b"z" * 11)
+    assert cache.get("huge") is None
+    assert cache.get("b") == b"y" * 6
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import sys
 from datetime import date, datetime
 from importlib import util
@@ -8,11 +9,10 @@ from pathlib import Path
 from typing import Any
 
 import pytest
-import xlwt
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 
-from .xls_helper import assert_true_xls
+from .xls_helper import make_xls, make_xlsx
 
 MODULE_PATH = Path(__file__).parents[1] / "delivery" / "api_routes.py"
 ROOT = Path(__file__).parents[2]
@@ -27,28 +27,6 @@ app = FastAPI()
 app.include_router(router)
 
 
-def _make_xls(rows: list[dict]) -> BytesIO:
-    workbook = xlwt.Workbook()
-    sheet = workbook.add_sheet("Sheet1")
-    if rows:
-        headers = list(rows[0].keys())
-        for col, header in enumerate(headers):
-            sheet.write(0, col, header)
-        date_style = xlwt.easyxf(num_format_str="YYYY-MM-DD HH:MM:SS")
-        for row_index, row in enumerate(rows, 1):
-            for col_index, header in enumerate(headers):
-                value = row.get(header)
-                if isinstance(value, datetime):
-                    sheet.write(row_index, col_index, value, date_style)
-                else:
-                    sheet.write(row_index, col_index, value)
-    buffer = BytesIO()
-    workbook.save(buffer)
-    buffer.seek(0)
-    assert_true_xls(buffer)
-    return buffer
-
-
 @pytest.mark.asyncio
 async def test_process_valid_commandes(
     monkeypatch: pytest.MonkeyPatch,
@@ -69,7 +47,7 @@ async def test_process_valid_commandes(
             "SA LOC": datetime(2025, 7, 11, 12, 0),
         }
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.post(
@@ -90,6 +68,8 @@ async def test_process_valid_commandes(
             "yc": 0,
         }
     ]
+    timing = response.headers["server-timing"]
+    assert "filter;dur=" in timing and "serialize;dur=" in timing
 
 
 @pytest.mark.asyncio
@@ -111,6 +91,39 @@ async def test_invalid_file_type(monkeypatch: pytest.MonkeyPatch) -> None:
     assert "Invalid file type" in response.text
 
 
+@pytest.mark.asyncio
+async def test_xlsx_detected_from_content(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        api_routes,
+        "date",
+        type("D", (), {"today": staticmethod(lambda: date(2025, 7, 10))}),
+    )
+    file_obj = make_xlsx(
+        [
+            {
+                "Num Vol": "AF1",
+                "Départ": "CDG",
+                "Arrivée": "JFK",
+                "Imma": "F-1",
+                "SD LOC": datetime(2025, 7, 11, 8, 0),
+                "SA LOC": datetime(2025, 7, 11, 12, 0),
+            }
+        ]
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        # The name is not trusted: the content decides the engine
+        response = await ac.post(
+            "/process",
+            files={"file": ("export.xls", file_obj, "application/zip")},
+            data={"mode": "commandes"},
+        )
+    assert response.status_code == 200
+    assert [row["num_vol"] for row in response.json()] == ["AF1"]
+
+
 @pytest.mark.asyncio
 async def test_missing_column_error(monkeypatch: pytest.MonkeyPatch) -> None:
     today = date(2025, 7, 10)
@@ -129,7 +142,7 @@ async def test_missing_column_error(monkeypatch: pytest.MonkeyPatch) -> None:
             "SA LOC": datetime(2025, 7, 11, 12, 0),
         }
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.post(
@@ -169,7 +182,7 @@ async def test_precommandes_filters_j_plus_2(
             "SA LOC": datetime(2025, 7, 12, 12, 0),
         },
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.post(
@@ -183,3 +196,283 @@ async def test_precommandes_filters_j_plus_2(
     assert body[0]["num_vol"] == "AF2"
     assert body[0]["jc"] == 0
     assert body[0]["yc"] == 0
+
+
+@pytest.mark.asyncio
+async def test_process_all_modes_per_date(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    today = date(2025, 7, 10)
+    monkeypatch.setattr(
+        api_routes,
+        "date",
+        type("D", (), {"today": staticmethod(lambda: today)}),
+    )
+    rows = [
+        {
+            "Num Vol": "AF1",
+            "Départ": "CDG",
+            "Arrivée": "JFK",
+            "Imma": "F-1",
+            "SD LOC": datetime(2025, 7, 11, 8, 0),
+            "SA LOC": datetime(2025, 7, 11, 12, 0),
+        },
+        {
+            "Num Vol": "AF2",
+            "Départ": "CDG",
+            "Arrivée": "NRT",
+            "Imma": "F-2",
+            "SD LOC": datetime(2025, 7, 12, 8, 0),
+            "SA LOC": datetime(2025, 7, 12, 12, 0),
+        },
+    ]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post(
+            "/process",
+            files={
+                "file": (
+                    "test.xls",
+                    make_xls(rows),
+                    "application/vnd.ms-excel",
+                )
+            },
+            data={"mode": "all"},
+        )
+        bad_days = await ac.post(
+            "/process",
+            files={
+                "file": (
+                    "test.xls",
+                    make_xls(rows),
+                    "application/vnd.ms-excel",
+                )
+            },
+            data={"mode": "commandes", "days": "1,2"},
+        )
+    assert response.status_code == 200
+    body = response.json()
+    assert list(body) == ["2025-07-11", "2025-07-12"]
+    assert [r["num_vol"] for r in body["2025-07-11"]] == ["AF1"]
+    assert [r["num_vol"] for r in body["2025-07-12"]] == ["AF2"]
+    assert bad_days.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_process_returns_503_when_pool_saturated() -> None:
+    saturated = api_routes.WorkerPool(workers=0, max_queue=0)
+    app.dependency_overrides[api_routes.shared_worker_pool] = lambda: saturated
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as ac:
+            response = await ac.post(
+                "/process",
+                files={
+                    "file": (
+                        "test.xls",
+                        make_xls([]),
+                        "application/vnd.ms-excel",
+                    )
+                },
+                data={"mode": "commandes"},
+            )
+            stats = await ac.get("/process/stats")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert stats.json()["rejected"] == 1
+
+
+class _DeadWorkerPool:
+    async def run(self, *args: Any) -> Any:
+        raise api_routes.WorkerLostError()
+
+
+@pytest.mark.asyncio
+async def test_process_returns_503_when_worker_dies() -> None:
+    app.dependency_overrides[api_routes.shared_worker_pool] = _DeadWorkerPool
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as ac:
+            response = await ac.post(
+                "/process",
+                files={
+                    "file": (
+                        "test.xls",
+                        make_xls([]),
+                        "application/vnd.ms-excel",
+                    )
+                },
+                data={"mode": "commandes"},
+            )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert "Worker process died" in response.text
+
+
+@pytest.mark.asyncio
+async def test_process_streams_ndjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    today = date(2025, 7, 10)
+    monkeypatch.setattr(
+        api_routes,
+        "date",
+        type("D", (), {"today": staticmethod(lambda: today)}),
+    )
+    rows = [
+        {
+            "Num Vol": f"AF{hour}",
+            "Départ": "CDG",
+            "Arrivée": "JFK",
+            "Imma": "F-1",
+            "SD LOC": datetime(2025, 7, 11, hour, 0),
+            "SA LOC": datetime(2025, 7, 11, hour + 1, 0),
+        }
+        for hour in (8, 9)
+    ]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post(
+            "/process",
+            files={
+                "file": (
+                    "test.xls",
+                    make_xls(rows),
+                    "application/vnd.ms-excel",
+                )
+            },
+            data={"mode": "commandes", "stream": "ndjson"},
+        )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["num_vol"] for line in lines] == ["AF8", "AF9"]
+
+
+@pytest.fixture
+def upload_limit(monkeypatch: pytest.MonkeyPatch) -> Any:
+    """Set UPLOAD_MAX_BYTES for one test."""
+
+    def set_limit(limit: int) -> None:
+        monkeypatch.setenv("UPLOAD_MAX_BYTES", str(limit))
+        api_routes.upload_max_bytes.cache_clear()
+
+    yield set_limit
+    monkeypatch.undo()
+    api_routes.upload_max_bytes.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_upload_over_limit_is_refused(upload_limit: Any) -> None:
+    file_obj = make_xls([{"Num Vol": "AF1"}] * 200)
+    limit = len(file_obj.getvalue()) - 1
+    upload_limit(limit)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post(
+            "/process",
+            files={"file": ("test.xls", file_obj, "application/zip")},
+            data={"mode": "commandes"},
+        )
+    assert response.status_code == 413
+    assert f"{limit} byte limit" in response.text
+
+
+async def _file_part(size: int) -> Any:
+    yield (
+        b"--b\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="a.xls"'
+        b"\r\n\r\n"
+    )
+    for _ in range(size // 4096):
+        yield b"x" * 4096
+
+
+@pytest.mark.parametrize("declared", [True, False])
+@pytest.mark.asyncio
+async def test_body_over_limit_is_refused_before_parsing(
+    upload_limit: Any, declared: bool
+) -> None:
+    upload_limit(1024)
+    size = 1024 + api_routes.FORM_OVERHEAD_BYTES + 4096
+    headers = {"content-type": "multipart/form-data; boundary=b"}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        if declared:
+            # Not a valid form: parsing it would answer 400
+            response = await ac.post(
+                "/process", content=b"x" * size, headers=headers
+            )
+        else:
+            # Sent chunked, without a Content-Length
+            response = await ac.post(
+                "/process", content=_file_part(size), headers=headers
+            )
+            assert "content-length" not in response.request.headers
+    assert "1024 byte limit" in response.text
+
+
+@pytest.mark.asyncio
+async def test_repeat_upload_answers_from_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        api_routes,
+        "date",
+        type("D", (), {"today": staticmethod(lambda: date(2025, 7, 10))}),
+    )
+    row = {
+        "Num Vol": "AF1",
+        "Départ": "CDG",
+        "Arrivée": "JFK",
+        "Imma": "F-1",
+        "SD LOC": datetime(2025, 7, 11, 8, 0),
+        "SA LOC": datetime(2025, 7, 11, 12, 0),
+    }
+    data = make_xls([row]).getvalue()
+    responses = api_routes.ResponseCache()
+    app.dependency_overrides[api_routes.shared_response_cache] = (
+        lambda: responses
+    )
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as ac:
+
+            async def post(**headers: str) -> Any:
+                return await ac.post(
+                    "/process",
+                    files={"file": ("test.xls", BytesIO(data))},
+                    data={"mode": "commandes"},
+                    headers=headers,
+                )
+
+            first = await post()
+            # A pool that refuses work proves repeats are not parsed
+            saturated = api_routes.WorkerPool(workers=0, max_queue=0)
+            app.dependency_overrides[api_routes.shared_worker_pool] = (
+                lambda: saturated
+            )
+            repeat = await post()
+            etag = first.headers["ETag"]
+            revalidated = await post(**{"If-None-Match": etag})
+            changed = await post(**{"If-None-Match": '"stale"'})
+    finally:
+        app.dependency_overrides.clear()
+    assert first.status_code == 200
+    assert repeat.status_code == 200
+    assert repeat.content == first.content
+    assert repeat.headers["ETag"] == first.headers["ETag"]
+    assert repeat.headers["Server-Timing"] == 'cache;desc="hit"'
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == first.headers["ETag"]
+    assert changed.status_code == 200
+    assert responses.stats().hits == 3
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from backend.internal.infrastructure import (
+    count,
+    profile,
+    profiled_call,
+    server_timing,
+    stage,
+)
+
+
+def test_stage_is_a_no_op_without_profile() -> None:
+    with stage("read") as timer:
+        timer.rows = 3
+    with profile() as collected:
+        pass
+    assert collected.stages == []
+
+
+def test_repeated_stages_are_summed() -> None:
+    with profile() as collected:
+        for rows in (2, 3):
+            with stage("pairing") as timer:
+                timer.rows = rows
+        with stage("serialize"):
+            pass
+    pairing, serialize = collected.stages
+    assert (pairing.name, pairing.rows, pairing.calls) == ("pairing", 5, 2)
+    assert serialize.rows is None
+    assert pairing.wall_s >= 0 and pairing.cpu_s >= 0
+
+
+def _work(value: int) -> int:
+    with stage("work") as timer:
+        timer.rows = value
+    return value * 2
+
+
+def test_profiled_call_returns_result_and_stages() -> None:
+    result, collected = profiled_call(_work, 4)
+    assert result == 8
+    assert [(s.name, s.rows) for s in collected.stages] == [("work", 4)]
+    assert server_timing(collected).startswith("work;dur=")
+
+
+def test_counters_are_summed_and_reported() -> None:
+    count("ignored", 1)
+    with profile() as collected:
+        count("nat_sd_loc", 2)
+        count("nat_sd_loc", 1)
+    assert collected.counters == {"nat_sd_loc": 3}
+    assert server_timing(collected) == 'nat_sd_loc;desc="3"'
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import date
+
+from backend.repository.response_cache import ResponseCache, etag_matches
+
+DAY = date(2025, 7, 11)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_key_covers_hash_mode_and_targets() -> None:
+    key = ResponseCache.key_for("abc", "commandes", [(DAY, 1)])
+    assert key == ResponseCache.key_for("abc", "commandes", [(DAY, 1)])
+    assert key != ResponseCache.key_for("abd", "commandes", [(DAY, 1)])
+    assert key != ResponseCache.key_for("abc", "all", [(DAY, 1)])
+    assert key != ResponseCache.key_for("abc", "commandes", [(DAY, 2)])
+    other_day = date(2025, 7, 12)
+    assert key != ResponseCache.key_for("abc", "commandes", [(other_day, 1)])
+
+
+def test_etag_is_strong_and_follows_body() -> None:
+    cache = ResponseCache()
+    entry = cache.store("k", b"[]")
+    assert entry.etag.startswith('"') and entry.etag.endswith('"')
+    assert entry.etag == ResponseCache.etag_for(b"[]")
+    assert entry.etag != ResponseCache.etag_for(b"[{}]")
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = _Clock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    cache.store("k", b"body")
+    clock.now = 9.9
+    assert cache.get("k") is not None
+    clock.now = 10.0
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 1, 1)
+    assert (stats.entries, stats.bytes) == (0, 0)
+
+
+def test_lru_eviction_by_bytes() -> None:
+    cache = ResponseCache(max_bytes=10)
+    cache.store("a", b"12345")
+    cache.store("b", b"12345")
+    cache.get("a")
+    cache.store("c", b"123")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.store("big", b"x" * 11).body == b"x" * 11
+    assert cache.get("big") is None
+    assert cache.stats().bytes == 8
+
+
+def test_etag_matches() -> None:
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abcd"', etag)
+    assert not etag_matches(None, etag)
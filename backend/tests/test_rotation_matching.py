@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+import numpy as np
+
+from backend.benchmarks.schedule_generator import (
+    generate_schedule,
+    write_schedule,
+)
+from backend.domain import FlightBatch
+from backend.repository.rotation_matching import (
+    MAX_TURNAROUND,
+    MIN_TURNAROUND,
+    match_rotations,
+)
+from backend.repository.schedule_cache import ScheduleCache
+from backend.usecase.process_flight_data import process_flight_rotations
+
+from .xls_helper import make_xls
+
+START = datetime(2025, 7, 11, 6, 0)
+
+
+def _legs(*legs: tuple[str, str, str, int, int]) -> FlightBatch:
+    """Build legs from (depart, arrivee, imma, departure min, block min)."""
+    return FlightBatch.from_columns(
+        num_vol=[f"MD{index}" for index in range(len(legs))],
+        depart=[leg[0] for leg in legs],
+        arrivee=[leg[1] for leg in legs],
+        imma=[leg[2] for leg in legs],
+        sd_loc=[START + timedelta(minutes=leg[3]) for leg in legs],
+        sa_loc=[START + timedelta(minutes=leg[3] + leg[4]) for leg in legs],
+        jc=[0] * len(legs),
+        yc=[0] * len(legs),
+    )
+
+
+def _match(batch: FlightBatch) -> list[tuple[int, int]]:
+    return match_rotations(
+        batch.depart, batch.arrivee, batch.imma, batch.sd_loc, batch.sa_loc
+    ).pairs()
+
+
+def test_chained_legs_form_consecutive_rotations() -> None:
+    batch = _legs(
+        ("TNR", "NOS", "5RMKA", 0, 60),
+        ("NOS", "TNR", "5RMKA", 120, 60),
+        ("TNR", "NOS", "5RMKA", 240, 60),
+        ("NOS", "TNR", "5RMKA", 360, 60),
+    )
+    assert _match(batch) == [(0, 1), (2, 3)]
+
+
+def test_interleaved_aircraft_and_routes() -> None:
+    batch = _legs(
+        ("TNR", "DIE", "5REJB", 0, 90),
+        ("TNR", "NOS", "5RMKA", 10, 60),
+        ("DIE", "TNR", "5REJB", 150, 90),
+        ("NOS", "TNR", "5REJC", 100, 60),
+        ("NOS", "TNR", "5RMKA", 110, 60),
+    )
+    assert _match(batch) == [(0, 2), (1, 4)]
+
+
+def test_turnaround_and_direction_constraints() -> None:
+    short = int(MIN_TURNAROUND.total_seconds() // 60) - 1
+    long = int(MAX_TURNAROUND.total_seconds() // 60) + 1
+    batch = _legs(
+        ("TNR", "NOS", "5RMKA", 0, 60),
+        ("NOS", "TNR", "5RMKA", 60 + short, 60),
+        ("TNR", "SVB", "5REJB", 0, 60),
+        ("SVB", "TNR", "5REJB", 60 + long, 60),
+        ("TNR", "DIE", "5REJH", 0, 60),
+        ("TNR", "DIE", "5REJH", 120, 60),
+    )
+    assert _match(batch) == []
+
+
+def test_unmatched_leg_does_not_shift_the_chain() -> None:
+    batch = _legs(
+        ("TNR", "NOS", "5RMKA", 0, 60),
+        ("TNR", "NOS", "5RMKA", 100, 60),
+        ("NOS", "TNR", "5RMKA", 200, 60),
+    )
+    assert _match(batch) == [(1, 2)]
+
+
+def test_generated_network_respects_constraints() -> None:
+    frame = generate_schedule(20_000, seed=5, days=1)
+    rotations = match_rotations(
+        frame["Départ"],
+        frame["Arrivée"],
+        frame["Imma"],
+        frame["SD LOC"],
+        frame["SA LOC"],
+    )
+    assert len(rotations) > 0
+    used = np.concatenate([rotations.outbound, rotations.inbound])
+    assert len(np.unique(used)) == len(used)
+    out = frame.iloc[rotations.outbound].reset_index(drop=True)
+    back = frame.iloc[rotations.inbound].reset_index(drop=True)
+    assert (out["Départ"] == back["Arrivée"]).all()
+    assert (out["Arrivée"] == back["Départ"]).all()
+    assert (out["Imma"] == back["Imma"]).all()
+    turnaround = back["SD LOC"] - out["SA LOC"]
+    assert turnaround.between(MIN_TURNAROUND, MAX_TURNAROUND).all()
+
+
+def test_process_flight_rotations() -> None:
+    frame = generate_schedule(400, seed=7, start=date(2025, 7, 11), days=1)
+    buffer = BytesIO()
+    write_schedule(frame, buffer, "xls")
+    buffer.seek(0)
+    result = process_flight_rotations(buffer, "commandes", date(2025, 7, 10))
+    body = json.loads(result.to_json())
+    assert len(body["flights"]) == len(result.flights) > 0
+    assert len(body["rotations"]) == len(result.rotations) > 0
+    legs = body["flights"] + body["returns"]
+    for rotation in body["rotations"]:
+        out = body["flights"][rotation["outbound"]]
+        back = legs[rotation["inbound"]]
+        assert (out["depart"], out["imma"]) == (back["arrivee"], back["imma"])
+        assert rotation["turnaround_min"] >= 20
+
+
+def test_rotation_returning_after_midnight_is_paired() -> None:
+    def leg(num: str, route: str, departs: datetime) -> dict:
+        depart, arrivee = route.split("-")
+        return {
+            "Num Vol": num,
+            "Départ": depart,
+            "Arrivée": arrivee,
+            "Imma": "5RMKA",
+            "SD LOC": departs,
+            "SA LOC": departs + timedelta(hours=1),
+        }
+
+    upload = make_xls(
+        [
+            leg("MD1", "TNR-NOS", datetime(2025, 7, 11, 8, 0)),
+            leg("MD2", "NOS-TNR", datetime(2025, 7, 11, 10, 0)),
+            leg("MD3", "TNR-RUN", datetime(2025, 7, 11, 22, 0)),
+            leg("MD4", "RUN-TNR", datetime(2025, 7, 12, 1, 0)),
+            leg("MD5", "TNR-NOS", datetime(2025, 7, 12, 8, 0)),
+        ]
+    ).getvalue()
+    cache = ScheduleCache()
+    for _ in range(2):
+        result = process_flight_rotations(
+            upload, "commandes", date(2025, 7, 10), cache, None, "hash"
+        )
+        assert [f.num_vol for f in result.flights] == ["MD1", "MD2", "MD3"]
+        assert [f.num_vol for f in result.returns] == ["MD4"]
+        assert result.rotations.pairs() == [(0, 1), (2, 3)]
+    assert cache.stats().hits == 1
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from io import BytesIO
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from backend.repository import xls_parser
+from backend.repository.schedule_cache import ScheduleCache
+
+from .xls_helper import make_xls
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"Num Vol": [f"MD{i}" for i in range(rows)]})
+
+
+def test_lru_eviction_by_entry_count() -> None:
+    cache = ScheduleCache(max_entries=2)
+    cache.put("a", _frame(1))
+    cache.put("b", _frame(1))
+    assert cache.get("a") is not None
+    cache.put("c", _frame(1))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (3, 1, 1)
+    assert stats.entries == 2
+
+
+def test_eviction_by_memory() -> None:
+    size = int(_frame(100).memory_usage(index=True, deep=True).sum())
+    cache = ScheduleCache(max_entries=10, max_bytes=size * 2)
+    for key in "abc":
+        cache.put(key, _frame(100))
+    assert cache.get("a") is None
+    assert cache.stats().bytes <= size * 2
+
+
+def test_oversized_frame_is_not_stored() -> None:
+    cache = ScheduleCache(max_bytes=10)
+    cache.put("a", _frame(100))
+    assert cache.stats().entries == 0
+
+
+def test_repeat_upload_skips_reading(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[Any] = []
+    read_schedule = xls_parser.read_schedule
+
+    def counting_read(*args: Any, **kwargs: Any) -> pd.DataFrame:
+        calls.append(args)
+        return read_schedule(*args, **kwargs)
+
+    monkeypatch.setattr(xls_parser, "read_schedule", counting_read)
+    rows = [
+        {
+            "Num Vol": "MD1",
+            "Départ": "TNR",
+            "Arrivée": "TLE",
+            "Imma": "5REJK",
+            "SD LOC": datetime(2025, 7, 11, 8, 0),
+            "SA LOC": datetime(2025, 7, 11, 9, 0),
+        },
+        {
+            "Num Vol": "MD2",
+            "Départ": "TLE",
+            "Arrivée": "TNR",
+            "Imma": "5REJK",
+            "SD LOC": datetime(2025, 7, 12, 8, 0),
+            "SA LOC": datetime(2025, 7, 12, 9, 0),
+        },
+    ]
+    data = make_xls(rows).getvalue()
+    cache = ScheduleCache()
+    today = date(2025, 7, 10)
+
+    first = xls_parser.parse_and_filter_xls(
+        BytesIO(data), "commandes", today, cache
+    )
+    second = xls_parser.parse_and_filter_xls(
+        BytesIO(data), "precommandes", today, cache
+    )
+
+    assert [r.num_vol for r in first] == ["MD1"]
+    assert [r.num_vol for r in second] == ["MD2"]
+    assert len(calls) == 1
+    assert cache.stats().hits == 1
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import date
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from backend.benchmarks.schedule_generator import generate_schedule
+from backend.repository.upload_spool import (
+    UploadTooLargeError,
+    spool_upload,
+)
+from backend.repository.xls_reader import read_schedule
+from backend.usecase.process_flight_data import (
+    process_upload,
+    receive_upload,
+)
+
+from .xls_helper import make_xls, make_xlsx
+
+
+def _workbook(fmt: str) -> bytes:
+    frame = generate_schedule(300, seed=3, start=date(2025, 7, 11), days=2)
+    make = make_xls if fmt == "xls" else make_xlsx
+    return make(frame.to_dict("records")).getvalue()
+
+
+def test_spool_hashes_and_maps_in_one_copy(tmp_path: Path) -> None:
+    data = os.urandom(3000)
+    upload = spool_upload(BytesIO(data), 0, str(tmp_path), chunk_size=1024)
+    assert upload.size == len(data)
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert upload.head == data[:8]
+    with upload.mapped() as view:
+        assert view[:] == data
+    upload.discard()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spool_stops_at_limit(tmp_path: Path) -> None:
+    source = BytesIO(b"x" * 10_000)
+    with pytest.raises(UploadTooLargeError, match="4096 byte limit"):
+        spool_upload(source, 4096, str(tmp_path), chunk_size=1024)
+    # The copy stopped at the first chunk past the limit
+    assert source.tell() == 5 * 1024
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("fmt", ["xls", "xlsx"])
+def test_mapped_read_matches_bytes(fmt: str, tmp_path: Path) -> None:
+    data = _workbook(fmt)
+    upload = spool_upload(BytesIO(data), 0, str(tmp_path))
+    with upload.mapped() as view:
+        mapped = read_schedule(view, {date(2025, 7, 12)})
+    assert mapped.equals(read_schedule(BytesIO(data), {date(2025, 7, 12)}))
+    upload.discard()
+
+
+def test_spooled_upload_matches_bytes_upload() -> None:
+    data = _workbook("xls")
+    upload = receive_upload(BytesIO(data), 0)
+    try:
+        spooled = process_upload(
+            upload, "commandes", None, date(2025, 7, 10)
+        )
+    finally:
+        upload.discard()
+    today = date(2025, 7, 10)
+    assert spooled == process_upload(data, "commandes", None, today)
+
+
+def test_receive_upload_refuses_other_content() -> None:
+    with pytest.raises(ValueError, match="Invalid file type"):
+        receive_upload(BytesIO(b"Num Vol,SD LOC\n"), 0)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from backend.internal.infrastructure import (
+    PoolSaturatedError,
+    WorkerLostError,
+    WorkerPool,
+)
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_and_records_stats() -> None:
+    pool = WorkerPool(workers=2, max_queue=2)
+    try:
+        assert await pool.run(pow, 2, 10) == 1024
+    finally:
+        pool.shutdown()
+    stats = pool.stats()
+    assert stats.completed == 1
+    assert stats.in_flight == 0 and stats.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full() -> None:
+    release = threading.Event()
+    pool = WorkerPool(workers=1, max_queue=1)
+    try:
+        running = asyncio.ensure_future(pool.run(release.wait, 5))
+        queued = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        assert pool.stats().queue_depth == 1
+
+        with pytest.raises(PoolSaturatedError) as exc_info:
+            await pool.run(pow, 2, 2)
+        assert exc_info.value.retry_after >= 1
+
+        release.set()
+        assert await running and await queued
+    finally:
+        pool.shutdown()
+    assert pool.stats().rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_keeps_its_slot_until_the_job_ends() -> None:
+    release = threading.Event()
+    pool = WorkerPool(workers=1, max_queue=0)
+    try:
+        running = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        await asyncio.sleep(0.05)
+        assert pool.stats().in_flight == 1
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(pow, 2, 2)
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert pool.stats().in_flight == 0
+        assert await pool.run(pow, 2, 2) == 4
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_kind() -> None:
+    pool = WorkerPool(workers=1, max_queue=0, kind="process")
+    try:
+        assert await pool.run(pow, 3, 3) == 27
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_is_replaced_after_a_worker_dies() -> None:
+    pool = WorkerPool(workers=1, max_queue=1, kind="process")
+    try:
+        with pytest.raises(WorkerLostError) as exc_info:
+            await pool.run(os._exit, 1)
+        assert exc_info.value.retry_after == 1
+        for _ in range(3):
+            assert await pool.run(pow, 2, 3) == 8
+    finally:
+        pool.shutdown()
+    assert pool.stats().in_flight == 0
@@ -6,12 +6,12 @@ from io import BytesIO
 from pathlib import Path
 from typing import Any
 
+import pandas as pd
 import pytest
-import xlwt
 
 from backend.domain import FlightRow
 
-from .xls_helper import assert_true_xls
+from .xls_helper import make_xls
 
 MODULE_PATH = Path(__file__).parents[1] / "repository" / "xls_parser.py"
 spec = util.spec_from_file_location("xls_parser", MODULE_PATH)
@@ -21,28 +21,6 @@ spec.loader.exec_module(xls_parser)  # type: ignore[call-arg]
 parse_and_filter_xls = xls_parser.parse_and_filter_xls
 
 
-def _make_xls(rows: list[dict]) -> BytesIO:
-    workbook = xlwt.Workbook()
-    sheet = workbook.add_sheet("Sheet1")
-    if rows:
-        headers = list(rows[0].keys())
-        for col, header in enumerate(headers):
-            sheet.write(0, col, header)
-        date_style = xlwt.easyxf(num_format_str="YYYY-MM-DD HH:MM:SS")
-        for row_index, row in enumerate(rows, 1):
-            for col_index, header in enumerate(headers):
-                value = row.get(header)
-                if isinstance(value, datetime):
-                    sheet.write(row_index, col_index, value, date_style)
-                else:
-                    sheet.write(row_index, col_index, value)
-    buffer = BytesIO()
-    workbook.save(buffer)
-    buffer.seek(0)
-    assert_true_xls(buffer)
-    return buffer
-
-
 def test_parse_commandes() -> None:
     today = date(2025, 7, 10)
     rows = [
@@ -63,13 +41,16 @@ def test_parse_commandes() -> None:
             "SA LOC": datetime(2025, 7, 12, 12, 0),
         },
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     result = parse_and_filter_xls(file_obj, "commandes", today)
     assert len(result) == 1
     assert isinstance(result[0], FlightRow)
     assert result[0].num_vol == "AF1"
     assert result[0].jc == 0
     assert result[0].yc == 0
+    # codes are categorical while parsing, plain strings in the output
+    assert result.depart.dtype == object
+    assert type(result.depart[0]) is str
 
 
 def test_parse_precommandes() -> None:
@@ -92,7 +73,7 @@ def test_parse_precommandes() -> None:
             "SA LOC": datetime(2025, 7, 12, 12, 0),
         },
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     result = parse_and_filter_xls(file_obj, "precommandes", today)
     assert len(result) == 1
     assert isinstance(result[0], FlightRow)
@@ -113,7 +94,7 @@ def test_missing_column_error() -> None:
             "SA LOC": datetime(2025, 7, 11, 12, 0),
         }
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     with pytest.raises(ValueError, match="Missing column: Imma"):
         parse_and_filter_xls(file_obj, "commandes", today)
 
@@ -154,7 +135,7 @@ def test_pairing_sort_order() -> None:
             "SA LOC": datetime(2025, 7, 11, 9, 30),
         },
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     result = parse_and_filter_xls(file_obj, "commandes", today)
     order = [r.num_vol for r in result]
     assert order == ["MD100", "MD101", "MD200", "MD201"]
@@ -177,7 +158,7 @@ def test_return_leg_boost_special_airport() -> None:
             "SA LOC": datetime(2025, 7, 11, 8, 0),
         }
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     result = parse_and_filter_xls(file_obj, "commandes", today)
     assert len(result) == 1
     r = result[0]
@@ -197,7 +178,7 @@ def test_return_leg_boost_default_airport() -> None:
             "SA LOC": datetime(2025, 7, 11, 14, 0),
         }
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     result = parse_and_filter_xls(file_obj, "commandes", today)
     assert len(result) == 1
     r = result[0]
@@ -227,7 +208,7 @@ def test_jc_yc_limits(imma: str, jc_max: int, yc_max: int) -> None:
             "SA LOC": datetime(2025, 7, 11, 8, 0),
         }
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     result = parse_and_filter_xls(file_obj, "commandes", today)
     assert len(result) == 1
     r = result[0]
@@ -248,10 +229,121 @@ def test_return_leg_clamped(monkeypatch: pytest.MonkeyPatch) -> None:
             "SA LOC": datetime(2025, 7, 11, 8, 0),
         }
     ]
-    file_obj = _make_xls(rows)
+    file_obj = make_xls(rows)
     monkeypatch.setitem(xls_parser.CAPACITY_LIMITS, "5RMJF", (1, 1))
     result = parse_and_filter_xls(file_obj, "commandes", today)
     assert len(result) == 1
     r = result[0]
     assert r.jc == 1
     assert r.yc == 1
+
+
+def test_number_departures_cached_and_uncached_agree() -> None:
+    from backend.repository.schedule_cache import ScheduleCache
+
+    row = {
+        "Num Vol": "MD1",
+        "Départ": "TNR",
+        "Arrivée": "NOS",
+        "Imma": "5RMKA",
+        "SD LOC": 45849.25,  # 2025-07-11 06:00 as a plain number cell
+        "SA LOC": 45849.3,
+    }
+    data = make_xls([row]).getvalue()
+    today = date(2025, 7, 10)
+    uncached = parse_and_filter_xls(BytesIO(data), "commandes", today)
+    cached = parse_and_filter_xls(
+        BytesIO(data), "commandes", today, ScheduleCache()
+    )
+    assert [r.num_vol for r in uncached] == ["MD1"]
+    assert [r.num_vol for r in cached] == ["MD1"]
+
+
+def test_order_by_pairing_matches_legacy_order() -> None:
+    from backend.benchmarks.bench_pairing import legacy_order, make_frame
+
+    frame = make_frame(500, seed=3)
+    # Unique departure times so that no ties are left to the sort algorithm
+    frame["SD LOC"] = frame["SD LOC"].min() + pd.to_timedelta(
+        frame.index.to_numpy()[::-1], unit="s"
+    )
+    expected = legacy_order(frame)["Num Vol"].tolist()
+    assert xls_parser.order_by_pairing(frame)["Num Vol"].tolist() == expected
+    encoded = xls_parser.encode_codes(frame.copy())
+    assert xls_parser.order_by_pairing(encoded)["Num Vol"].tolist() == expected
+
+
+def test_order_by_pairing_with_wider_station_dictionary() -> None:
+    # Twelve stations known to the dictionary, four legs in the frame:
+    # (S00, S08) and (S01, S02) must stay distinct pairs
+    stations = [f"S{index:02d}" for index in range(12)]
+    frame = pd.DataFrame(
+        {
+            "Num Vol": ["A", "B", "C", "D"],
+            "Départ": ["S00", "S01", "S02", "S08"],
+            "Arrivée": ["S08", "S02", "S01", "S00"],
+            "Imma": ["5RMKA"] * 4,
+            "SD LOC": pd.to_datetime(
+                [
+                    "2025-07-11 10:00",
+                    "2025-07-11 06:00",
+                    "2025-07-11 08:00",
+                    "2025-07-11 12:00",
+                ]
+            ),
+        }
+    )
+    station_dtype = pd.CategoricalDtype(stations)
+    for column in ("Départ", "Arrivée"):
+        frame[column] = frame[column].astype(station_dtype)
+    ordered = xls_parser.order_by_pairing(frame)
+    assert ordered["Num Vol"].tolist() == ["B", "C", "A", "D"]
+
+
+def test_encode_codes_shares_sorted_station_dictionary() -> None:
+    frame = pd.DataFrame(
+        {
+            "Départ": ["TNR", "NOS", None],
+            "Arrivée": ["NOS", "DIE", "TNR"],
+            "Imma": ["5RMKA", "5RMKA", "5REJB"],
+        }
+    )
+    xls_parser.encode_codes(frame)
+    assert frame["Départ"].cat.categories.tolist() == ["DIE", "NOS", "TNR"]
+    assert frame["Arrivée"].cat.categories.equals(
+        frame["Départ"].cat.categories
+    )
+    assert frame["Départ"].cat.codes.tolist() == [2, 1, -1]
+    assert frame["Imma"].cat.categories.tolist() == ["5REJB", "5RMKA"]
+
+
+def test_parse_horizons_single_pass() -> None:
+    today = date(2025, 7, 10)
+    rows = [
+        {
+            "Num Vol": f"MD{day}",
+            "Départ": "TLE",
+            "Arrivée": "TNR",
+            "Imma": "5REJK",
+            "SD LOC": datetime(2025, 7, day, 8, 0),
+            "SA LOC": datetime(2025, 7, day, 10, 0),
+        }
+        for day in (11, 12, 13, 15)
+    ]
+    file_obj = make_xls(rows)
+    result = xls_parser.parse_and_filter_xls_horizons(
+        file_obj, [3, 1, 2], today
+    )
+    j1, j2, j3 = date(2025, 7, 11), date(2025, 7, 12), date(2025, 7, 13)
+    assert list(result) == [j1, j2, j3]
+    assert [r.num_vol for r in result[j2]] == ["MD12"]
+    # Return leg boost only applies to the commandes horizon (J+1)
+    assert (result[j1][0].jc, result[j1][0].yc) == (2, 2)
+    assert (result[j3][0].jc, result[j3][0].yc) == (0, 0)
+
+
+def test_parse_horizons_rejects_negative_offsets() -> None:
+    with pytest.raises(ValueError, match="Invalid day offsets"):
+        xls_parser.parse_and_filter_xls_horizons(
+            make_xls([]), [-1], date(2025, 7, 10)
+        )
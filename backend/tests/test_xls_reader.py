@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from backend.repository.xls_reader import (
+    REQUIRED_COLUMNS,
+    detect_format,
+    read_schedule,
+)
+
+from .xls_helper import make_xls, make_xlsx
+
+
+def _row(num_vol: str, sd_loc: object, **extra: object) -> dict:
+    return {
+        "Comment": "ignored",
+        "Num Vol": num_vol,
+        "Départ": "TNR",
+        "Arrivée": "TLE",
+        "Imma": "5REJK",
+        "SD LOC": sd_loc,
+        "SA LOC": datetime(2025, 7, 11, 23, 0),
+        **extra,
+    }
+
+
+def test_reads_only_required_columns() -> None:
+    file_obj = make_xls([_row("MD1", datetime(2025, 7, 11, 8, 0))])
+    df = read_schedule(file_obj)
+    assert list(df.columns) == REQUIRED_COLUMNS
+    assert df["SD LOC"].iloc[0] == pd.Timestamp(2025, 7, 11, 8, 0)
+
+
+def test_matches_pandas_without_filter() -> None:
+    rows = [
+        _row("MD1", datetime(2025, 7, 11, 8, 0)),
+        _row("MD2", "2025-07-12 09:00"),
+        _row("MD3", datetime(2025, 7, 12, 23, 59, 59)),
+    ]
+    file_obj = make_xls(rows)
+    expected = pd.read_excel(BytesIO(file_obj.getvalue()))[REQUIRED_COLUMNS]
+    pd.testing.assert_frame_equal(read_schedule(file_obj), expected)
+
+
+def test_drops_rows_outside_target_dates() -> None:
+    rows = [
+        _row("MD1", datetime(2025, 7, 10, 23, 59)),
+        _row("MD2", datetime(2025, 7, 11, 0, 0)),
+        _row("MD3", datetime(2025, 7, 12, 8, 0)),
+        _row("MD4", "2025-07-13 08:00"),
+        _row("MD5", ""),
+    ]
+    df = read_schedule(make_xls(rows), target_dates={date(2025, 7, 11)})
+    # Text departures are left for date coercion to decide
+    assert df["Num Vol"].tolist() == ["MD2", "MD4"]
+
+
+def test_number_departures_are_matched_as_serials() -> None:
+    # 45849 is 2025-07-11 in the 1900 date system
+    rows = [
+        _row("MD1", 45849.5),
+        _row("MD2", 45850.25),
+        _row("MD3", 45848.999),
+    ]
+    df = read_schedule(make_xls(rows), target_dates={date(2025, 7, 11)})
+    assert df["Num Vol"].tolist() == ["MD1"]
+
+
+def test_missing_column_from_header() -> None:
+    row = _row("MD1", datetime(2025, 7, 11, 8, 0))
+    del row["Imma"]
+    with pytest.raises(ValueError, match="Missing column: Imma"):
+        read_schedule(make_xls([row]), target_dates={date(2025, 7, 11)})
+
+
+def test_detect_format_from_signature() -> None:
+    row = _row("MD1", datetime(2025, 7, 11, 8, 0))
+    assert detect_format(make_xls([row]).getvalue()) == "xls"
+    assert detect_format(make_xlsx([row]).getvalue()) == "xlsx"
+    with pytest.raises(ValueError, match="Invalid file type"):
+        detect_format(b"Num Vol;Depart\n")
+
+
+def test_xlsx_matches_pandas() -> None:
+    rows = [
+        _row("MD1", datetime(2025, 7, 11, 8, 0), JC=3),
+        _row("MD2", "2025-07-12 09:00"),
+        _row("MD3", datetime(2025, 7, 12, 23, 59, 59)),
+    ]
+    file_obj = make_xlsx(rows)
+    expected = pd.read_excel(BytesIO(file_obj.getvalue()))[REQUIRED_COLUMNS]
+    pd.testing.assert_frame_equal(read_schedule(file_obj), expected)
+
+
+def test_xlsx_drops_rows_outside_target_dates() -> None:
+    rows = [
+        _row("MD1", datetime(2025, 7, 10, 23, 59)),
+        _row("MD2", datetime(2025, 7, 11, 0, 0)),
+        _row("MD3", datetime(2025, 7, 12, 8, 0)),
+        _row("MD4", "2025-07-13 08:00"),
+    ]
+    df = read_schedule(make_xlsx(rows), target_dates={date(2025, 7, 11)})
+    assert df["Num Vol"].tolist() == ["MD2", "MD4"]
+
+
+def test_xlsx_missing_column_from_header() -> None:
+    row = _row("MD1", datetime(2025, 7, 11, 8, 0))
+    del row["SA LOC"]
+    with pytest.raises(ValueError, match="Missing column: SA LOC"):
+        read_schedule(make_xlsx([row]))
+
+
+@pytest.mark.parametrize("target_dates", [None, {date(2025, 7, 11)}])
+def test_both_formats_drop_empty_rows(target_dates: set[date] | None) -> None:
+    blank = {name: None for name in _row("", None)}
+    rows = [
+        _row("MD1", datetime(2025, 7, 11, 8, 0)),
+        blank,
+        dict(blank, Comment="kept out", **{"Num Vol": ""}),
+        _row("MD2", datetime(2025, 7, 11, 9, 0)),
+        blank,
+    ]
+    xls = read_schedule(make_xls(rows), target_dates)
+    xlsx = read_schedule(make_xlsx(rows), target_dates)
+    pd.testing.assert_frame_equal(xls, xlsx)
+    assert xls["Num Vol"].tolist() == ["MD1", "MD2"]
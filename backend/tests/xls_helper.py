@@ -1,5 +1,9 @@
+from datetime import datetime
 from io import BytesIO
 
+import xlwt
+from openpyxl import Workbook
+
 XLS_HEADER = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
 
 
@@ -9,3 +13,43 @@ def assert_true_xls(file_obj: BytesIO) -> None:
     if start.startswith(b"PK\x03\x04"):
         raise AssertionError("File appears to be .xlsx; expected .xls")
     assert start == XLS_HEADER, "Invalid XLS file header"
+
+
+def make_xls(rows: list[dict]) -> BytesIO:
+    """Write ``rows`` to an `.xls` sheet, headers taken from the first row."""
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet("Sheet1")
+    if rows:
+        headers = list(rows[0].keys())
+        for col, header in enumerate(headers):
+            sheet.write(0, col, header)
+        date_style = xlwt.easyxf(num_format_str="YYYY-MM-DD HH:MM:SS")
+        for row_index, row in enumerate(rows, 1):
+            for col_index, header in enumerate(headers):
+                value = row.get(header)
+                if isinstance(value, datetime):
+                    sheet.write(row_index, col_index, value, date_style)
+                else:
+                    sheet.write(row_index, col_index, value)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    assert_true_xls(buffer)
+    return buffer
+
+
+def make_xlsx(rows: list[dict]) -> BytesIO:
+    """Write ``rows`` to an `.xlsx` sheet; ``""`` values are left blank."""
+    workbook = Workbook()
+    sheet = workbook.active
+    if rows:
+        headers = list(rows[0].keys())
+        sheet.append(headers)
+        for row in rows:
+            sheet.append(
+                [None if row.get(h) == "" else row.get(h) for h in headers]
+            )
+    buffer = BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import zlib
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import cache
+from itertools import chain, islice
+
+from backend.domain import FlightRow
+from backend.domain.modes import MODE_OFFSETS
+from backend.internal.infrastructure import load_env
+from backend.repository.command_sheet import (
+    FORM_NAME,
+    SHEET_TITLES,
+    paginate,
+    render_page,
+    sheet_form,
+)
+from backend.repository.page_cache import PageCache
+from backend.repository.pdf_writer import iter_pdf
+
+# Draws one page: (rows, mode, sheet date, page number) -> content stream
+PageRenderer = Callable[[Sequence[FlightRow], str, date, int], bytes]
+
+# Page number and the flights printed on it
+Page = tuple[int, list[FlightRow]]
+
+ALLOCATION_RANGE = range(0, 100)
+
+# Pages rendered by one task of the parallel mode
+SHARD_PAGES = 16
+
+
+@dataclass(frozen=True)
+class ParallelRendering:
+    """Process pool used for sheets of at least ``threshold`` flights."""
+
+    executor: Executor
+    workers: int
+    threshold: int
+
+
+@cache
+def shared_parallel_rendering() -> ParallelRendering | None:
+    """Return the pool sized by PDF_RENDER_WORKERS, or ``None``.
+
+    Parallel rendering is off with a single worker or a zero
+    PDF_PARALLEL_THRESHOLD.
+    """
+    settings = load_env()
+    workers = settings.pdf_render_workers
+    if workers < 2 or not settings.pdf_parallel_threshold:
+        return None
+    return ParallelRendering(
+        ProcessPoolExecutor(workers), workers, settings.pdf_parallel_threshold
+    )
+
+
+def discard_parallel_rendering(parallel: ParallelRendering) -> None:
+    """Shut down a broken pool; the next shared lookup starts a new one."""
+    parallel.executor.shutdown(wait=False, cancel_futures=True)
+    if (
+        shared_parallel_rendering.cache_info().currsize
+        and shared_parallel_rendering() is parallel
+    ):
+        shared_parallel_rendering.cache_clear()
+
+
+@cache
+def shared_page_cache() -> PageCache:
+    """Return the process-wide page cache sized from the environment."""
+    settings = load_env()
+    return PageCache(
+        max_entries=settings.pdf_page_cache_max_entries,
+        max_bytes=settings.pdf_page_cache_max_bytes,
+    )
+
+
+def validate_rows(flights: Sequence[FlightRow]) -> None:
+    """Raise ``ValueError`` unless every JC and YC is within 0–99."""
+    for index, flight in enumerate(flights):
+        for field in ("jc", "yc"):
+            value = getattr(flight, field)
+            if value not in ALLOCATION_RANGE:
+                raise ValueError(
+                    f"Invalid JC/YC values: {field.upper()}={value} for "
+                    f"flight {flight.num_vol} (row {index + 1})"
+                )
+
+
+def sheet_date(
+    flights: Sequence[FlightRow], mode: str, today: date | None = None
+) -> date:
+    """Date printed on the sheet: the flights' day, else the mode's day."""
+    if flights:
+        return flights[0].sd_loc.date()
+    return (today or date.today()) + timedelta(days=MODE_OFFSETS[mode])
+
+
+def format_filename(mode: str, day: date) -> str:
+    """``Commandes_définitives_YYYY-MM-DD.pdf`` or ``Pré-commandes_...``."""
+    return f"{SHEET_TITLES[mode].replace(' ', '_')}_{day.isoformat()}.pdf"
+
+
+def generate_pdf(
+    flights: Sequence[FlightRow],
+    mode: str,
+    day: date | None = None,
+    render: PageRenderer = render_page,
+    parallel: ParallelRendering | None = None,
+    page_cache: PageCache | None = None,
+) -> Iterator[bytes]:
+    """Yield the PDF document page by page.
+
+    Only the page being drawn is held in memory; each chunk can be sent
+    as soon as it is yielded. The static frame of the mode is written once
+    and pages only carry their flight text. From ``parallel.threshold``
+    flights on, pages are rendered in shards on ``parallel.executor``;
+    the document is byte for byte the one the serial path writes. Pages
+    found in ``page_cache`` are reused instead of being drawn again.
+    """
+    day = day or sheet_date(flights, mode)
+    pages = enumerate(paginate(flights), 1)
+    if parallel is not None and len(flights) >= parallel.threshold:
+        deflated = render_parallel(
+            pages, mode, day, render, parallel, page_cache
+        )
+    else:
+        deflated = render_serial(pages, mode, day, render, page_cache)
+    return iter_pdf(
+        deflated,
+        title=f"{SHEET_TITLES[mode]} {day.isoformat()}",
+        forms={FORM_NAME: sheet_form(mode)},
+        deflated=True,
+    )
+
+
+def render_serial(
+    pages: Iterable[Page],
+    mode: str,
+    day: date,
+    render: PageRenderer,
+    page_cache: PageCache | None = None,
+) -> Iterator[bytes]:
+    """Yield compressed pages, drawing only those not in ``page_cache``."""
+    for number, rows in pages:
+        if page_cache is None:
+            yield zlib.compress(render(rows, mode, day, number))
+            continue
+        key = page_cache.key_for(rows, mode, day, number, _name(render))
+        data = page_cache.get(key)
+        if data is None:
+            data = zlib.compress(render(rows, mode, day, number))
+            page_cache.put(key, data)
+        yield data
+
+
+def render_parallel(
+    pages: Iterable[Page],
+    mode: str,
+    day: date,
+    render: PageRenderer,
+    parallel: ParallelRendering,
+    page_cache: PageCache | None = None,
+) -> Iterator[bytes]:
+    """Yield compressed pages rendered by shards, in document order.
+
+    Shards are runs of :data:`SHARD_PAGES` pages; only pages missing from
+    ``page_cache`` are sent to the pool. At most two shards per worker
+    are pending, so memory stays bounded while the consumer is slower
+    than the pool. If a worker dies, the pool is discarded and the
+    remaining pages are rendered serially.
+    """
+    pages = iter(pages)
+    pending: deque[_Shard] = deque()
+
+    def submit(count: int) -> None:
+        for _ in range(count):
+            shard = list(islice(pages, SHARD_PAGES))
+            if not shard:
+                return
+            keys: list[str | None] = [None] * len(shard)
+            done: list[bytes | None] = [None] * len(shard)
+            if page_cache is not None:
+                for index, (number, rows) in enumerate(shard):
+                    keys[index] = page_cache.key_for(
+                        rows, mode, day, number, _name(render)
+                    )
+                    done[index] = page_cache.get(keys[index])
+            missing = [
+                page for page, data in zip(shard, done) if data is None
+            ]
+            future: Future[list[bytes]] | None = None
+            if missing:
+                try:
+                    future = parallel.executor.submit(
+                        render_shard, missing, mode, day, render
+                    )
+                except BrokenProcessPool as exc:
+                    future = Future()
+                    future.set_exception(exc)
+            pending.append(_Shard(shard, keys, done, future))
+
+    submit(2 * parallel.workers)
+    try:
+        while pending:
+            shard = pending.popleft()
+            try:
+                rendered = iter(shard.future.result() if shard.future else ())
+            except BrokenProcessPool:
+                discard_parallel_rendering(parallel)
+                rest = chain(
+                    shard.pages, *(left.pages for left in pending), pages
+                )
+                pending.clear()
+                yield from render_serial(rest, mode, day, render, page_cache)
+                return
+            submit(1)
+            for key, data in zip(shard.keys, shard.done):
+                if data is None:
+                    data = next(rendered)
+                    if page_cache is not None and key is not None:
+                        page_cache.put(key, data)
+                yield data
+    finally:
+        # The client may disconnect mid-stream
+        for shard in pending:
+            if shard.future is not None:
+                shard.future.cancel()
+
+
+def render_shard(
+    pages: list[Page],
+    mode: str,
+    day: date,
+    render: PageRenderer = render_page,
+) -> list[bytes]:
+    """Render and compress the numbered pages of one shard."""
+    return [
+        zlib.compress(render(rows, mode, day, number))
+        for number, rows in pages
+    ]
+
+
+@dataclass
+class _Shard:
+    pages: list[Page]
+    keys: list[str | None]
+    done: list[bytes | None]
+    future: Future[list[bytes]] | None
+
+
+def _name(render: PageRenderer) -> str:
+    return f"{render.__module__}.{render.__qualname__}"
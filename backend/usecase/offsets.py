@@ -0,0 +1,30 @@
+"""Request horizon parsing, importable without pandas.
+
+The CLI validates its arguments with :func:`resolve_offsets` before any
+heavy module is loaded.
+"""
+
+from __future__ import annotations
+
+from backend.domain.modes import MAX_OFFSET, MODE_OFFSETS
+
+
+def resolve_offsets(mode: str | None, days: str | None) -> list[int] | None:
+    """Return the day offsets of a multi-horizon request.
+
+    ``mode="all"`` selects J+1 and J+2, ``days`` an explicit comma list
+    such as ``"1,2,3"``. ``None`` means a single-mode request.
+    """
+    if days:
+        if mode not in (None, "all"):
+            raise ValueError("days requires mode 'all'")
+        try:
+            offsets = [int(part) for part in days.split(",") if part.strip()]
+        except ValueError as exc:
+            raise ValueError(f"Invalid days: {days}") from exc
+        if not offsets or min(offsets) < 0 or max(offsets) > MAX_OFFSET:
+            raise ValueError(f"Invalid days: {days}")
+        return offsets
+    if mode == "all":
+        return sorted(MODE_OFFSETS.values())
+    return None
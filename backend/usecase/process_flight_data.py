@@ -1,16 +1,279 @@
 from __future__ import annotations
 
-from datetime import date
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import cache
 from typing import BinaryIO
 
-from backend.domain import FlightRow
-from backend.repository.xls_parser import parse_and_filter_xls
+import numpy as np
+
+from backend.domain import (
+    FlightBatch,
+    batches_to_json,
+    iter_batches_json,
+    iter_batches_ndjson,
+)
+from backend.domain.modes import MODE_OFFSETS
+from backend.internal.infrastructure import load_env, stage
+from backend.repository.allocation_rules import AllocationRules, load_rules
+from backend.repository.response_cache import ResponseCache
+from backend.repository.rotation_matching import RotationPairs, batch_rotations
+from backend.repository.schedule_cache import ScheduleCache
+from backend.repository.upload_spool import SpooledUpload, spool_upload
+from backend.repository.xls_parser import (
+    parse_and_filter_xls,
+    parse_and_filter_xls_horizons,
+)
+from backend.repository.xls_reader import WorkbookSource, detect_format
+
+STREAM_FORMATS = ("json", "ndjson")
 
 
 def process_flight_data(
-    file_stream: BinaryIO,
+    file_stream: WorkbookSource,
     mode: str,
     today: date,
-) -> list[FlightRow]:
+    schedule_cache: ScheduleCache | None = None,
+    rules: AllocationRules | None = None,
+    content_hash: str | None = None,
+) -> FlightBatch:
     """Delegate XLS parsing and filtering to repository layer."""
-    return parse_and_filter_xls(file_stream, mode, today)
+    return parse_and_filter_xls(
+        file_stream,
+        mode,
+        today,
+        schedule_cache,
+        rules or shared_allocation_rules(),
+        content_hash,
+    )
+
+
+def process_flight_horizons(
+    file_stream: WorkbookSource,
+    offsets: Sequence[int],
+    today: date,
+    schedule_cache: ScheduleCache | None = None,
+    rules: AllocationRules | None = None,
+    content_hash: str | None = None,
+) -> dict[date, FlightBatch]:
+    """Parse once and return flights for every requested day offset."""
+    return parse_and_filter_xls_horizons(
+        file_stream,
+        offsets,
+        today,
+        schedule_cache,
+        rules or shared_allocation_rules(),
+        content_hash,
+    )
+
+
+@dataclass(frozen=True)
+class FlightRotations:
+    """Flights of the target day and their outbound/return rotations.
+
+    ``returns`` holds the next day's legs that close a rotation. Outbound
+    positions index into ``flights``; inbound positions index into
+    ``flights`` followed by ``returns``.
+    """
+
+    flights: FlightBatch
+    returns: FlightBatch
+    rotations: RotationPairs
+
+    def to_json(self) -> bytes:
+        return (
+            b'{"flights":'
+            + self.flights.to_json()
+            + b',"returns":'
+            + self.returns.to_json()
+            + b',"rotations":'
+            + self.rotations.to_json()
+            + b"}"
+        )
+
+
+def process_flight_rotations(
+    file_stream: WorkbookSource,
+    mode: str,
+    today: date,
+    schedule_cache: ScheduleCache | None = None,
+    rules: AllocationRules | None = None,
+    content_hash: str | None = None,
+) -> FlightRotations:
+    """Return the target day's flights with each outbound's return leg.
+
+    The target and next days are read in one parse, so a return leaving
+    after midnight still closes an evening outbound.
+    """
+    if mode not in MODE_OFFSETS:
+        raise ValueError("Invalid mode")
+    offset = MODE_OFFSETS[mode]
+    target = today + timedelta(days=offset)
+    batches = process_flight_horizons(
+        file_stream,
+        [offset, offset + 1],
+        today,
+        schedule_cache,
+        rules,
+        content_hash,
+    )
+    flights = batches[target]
+    following = batches[target + timedelta(days=1)]
+    with stage("rotations") as timer:
+        rotations = batch_rotations(flights, following)
+        timer.rows = len(rotations)
+    # Keep only the next-day legs that close a rotation
+    size = len(flights)
+    later = np.unique(rotations.inbound[rotations.inbound >= size])
+    inbound = np.where(
+        rotations.inbound >= size,
+        size + np.searchsorted(later, rotations.inbound),
+        rotations.inbound,
+    )
+    return FlightRotations(
+        flights,
+        following.take(later - size),
+        RotationPairs(rotations.outbound, inbound, rotations.turnaround),
+    )
+
+
+def receive_upload(source: BinaryIO, max_bytes: int) -> SpooledUpload:
+    """Spool an upload to disk and check it is a workbook.
+
+    Raises ``UploadTooLargeError`` past ``max_bytes`` and ``ValueError``
+    for content that is not an .xls or .xlsx workbook; no file is left
+    behind in either case.
+    """
+    upload = spool_upload(source, max_bytes)
+    try:
+        detect_format(upload.head)
+    except ValueError:
+        upload.discard()
+        raise
+    return upload
+
+
+def response_key(
+    content_hash: str,
+    mode: str,
+    offsets: list[int] | None,
+    today: date,
+) -> str:
+    """Return the response cache key of a /process request.
+
+    Target dates rather than offsets make the key roll over at midnight;
+    the offsets stay in the key because they select the JC/YC rules.
+    """
+    if offsets is None:
+        if mode not in MODE_OFFSETS:
+            raise ValueError("Invalid mode")
+        offsets = [MODE_OFFSETS[mode]]
+    targets = [
+        (today + timedelta(days=offset), offset)
+        for offset in sorted(set(offsets))
+    ]
+    return ResponseCache.key_for(content_hash, mode, targets)
+
+
+def process_upload(
+    data: bytes | SpooledUpload,
+    mode: str,
+    offsets: list[int] | None,
+    today: date,
+) -> bytes:
+    """Run a whole /process request and return its JSON body.
+
+    Takes plain bytes or a spooled upload and returns bytes so it can run
+    in a thread or process worker; the schedule cache used is the one of
+    the worker process. A spooled upload is parsed through a memory map
+    and its hash is reused as the cache key.
+    """
+    result = process_upload_batches(data, mode, offsets, today)
+    with stage("serialize"):
+        if isinstance(result, FlightBatch):
+            return result.to_json()
+        return batches_to_json(result)
+
+
+def process_upload_batches(
+    data: bytes | SpooledUpload,
+    mode: str,
+    offsets: list[int] | None,
+    today: date,
+) -> FlightBatch | dict[date, FlightBatch]:
+    """Like :func:`process_upload` but return batches for streaming."""
+    if isinstance(data, SpooledUpload):
+        with data.mapped() as view:
+            return _process_contents(view, mode, offsets, today, data.sha256)
+    return _process_contents(data, mode, offsets, today)
+
+
+def _process_contents(
+    data: WorkbookSource,
+    mode: str,
+    offsets: list[int] | None,
+    today: date,
+    content_hash: str | None = None,
+) -> FlightBatch | dict[date, FlightBatch]:
+    schedule_cache = shared_schedule_cache()
+    if offsets is None:
+        return process_flight_data(
+            data, mode, today, schedule_cache, content_hash=content_hash
+        )
+    return process_flight_horizons(
+        data, offsets, today, schedule_cache, content_hash=content_hash
+    )
+
+
+def iter_encoded(
+    result: FlightBatch | dict[date, FlightBatch],
+    output: str,
+) -> Iterator[bytes]:
+    """Yield ``result`` as a chunked JSON body or as NDJSON lines."""
+    if output not in STREAM_FORMATS:
+        raise ValueError(f"Invalid output format: {output}")
+    if isinstance(result, FlightBatch):
+        if output == "ndjson":
+            return result.iter_ndjson()
+        return result.iter_json()
+    if output == "ndjson":
+        return iter_batches_ndjson(result)
+    return iter_batches_json(result)
+
+
+@cache
+def upload_max_bytes() -> int:
+    """Return the UPLOAD_MAX_BYTES limit of /process uploads, 0 for none."""
+    return load_env().upload_max_bytes
+
+
+@cache
+def shared_schedule_cache() -> ScheduleCache:
+    """Return the process-wide schedule cache sized from the environment."""
+    settings = load_env()
+    return ScheduleCache(
+        max_entries=settings.schedule_cache_max_entries,
+        max_bytes=settings.schedule_cache_max_bytes,
+    )
+
+
+@cache
+def shared_response_cache() -> ResponseCache:
+    """Return the process-wide /process response cache."""
+    settings = load_env()
+    return ResponseCache(
+        max_entries=settings.process_cache_max_entries,
+        max_bytes=settings.process_cache_max_bytes,
+        ttl=settings.process_cache_ttl_seconds,
+    )
+
+
+@cache
+def shared_allocation_rules() -> AllocationRules | None:
+    """Return the rules named by ALLOCATION_RULES_PATH, if set.
+
+    ``None`` leaves the packaged rules of the repository layer in effect.
+    """
+    path = load_env().allocation_rules_path
+    return load_rules(path) if path else None
@@ -0,0 +1,305 @@
+"""Batch conversion of many schedule files across a process pool."""
+
+import argparse
+import glob
+import os
+import time
+from collections import Counter, deque
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+from backend.usecase.offsets import resolve_offsets
+
+INPUT_SUFFIXES = (".xls", ".xlsx")
+
+
+@dataclass(frozen=True)
+class FileResult:
+    """Outcome of converting one input file."""
+
+    input_path: str
+    output_path: str
+    rows: int
+    seconds: float
+    error: str | None = None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Convert every schedule in directories or globs to JSON",
+    )
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Directories, files or glob patterns (quote globs)",
+    )
+    parser.add_argument(
+        "--output-dir", required=True, help="Directory for JSON outputs"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["commandes", "precommandes", "all"],
+        help="Filtering mode; 'all' returns J+1 and J+2 from one parse",
+    )
+    parser.add_argument(
+        "--days",
+        help="Comma-separated day offsets, e.g. 1,2,3 (implies --mode all)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="Output format of each file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    return parser
+
+
+def expand_sources(sources: list[str]) -> list[Path]:
+    """Return the sorted, de-duplicated input files named by ``sources``.
+
+    Directories contribute their .xls/.xlsx files, globs every matching
+    file, and plain paths are taken as given.
+    """
+    found: set[Path] = set()
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            found.update(
+                p
+                for p in path.iterdir()
+                if p.is_file() and p.suffix.lower() in INPUT_SUFFIXES
+            )
+        elif glob.has_magic(source):
+            found.update(
+                Path(p)
+                for p in glob.glob(source, recursive=True)
+                if Path(p).is_file()
+            )
+        else:
+            found.add(path)
+    return sorted(found)
+
+
+def output_paths(
+    inputs: list[Path], output_dir: Path, suffix: str
+) -> list[Path]:
+    """Name one output per input, disambiguating repeated file stems.
+
+    A repeated stem gets the first free ``-N`` suffix, so an input whose
+    own stem ends in ``-N`` cannot take the same name.
+    """
+    counts: dict[str, int] = {}
+    taken: set[str] = set()
+    paths = []
+    for input_path in inputs:
+        stem = input_path.stem
+        count = counts.get(stem, 0)
+        name = stem if not count else f"{stem}-{count}"
+        # Compared case-insensitively for case-insensitive file systems
+        while name.lower() in taken:
+            count += 1
+            name = f"{stem}-{count}"
+        counts[stem] = count + 1
+        taken.add(name.lower())
+        paths.append(output_dir / f"{name}{suffix}")
+    return paths
+
+
+def convert_file(
+    input_path: Path,
+    output_path: Path,
+    mode: str | None,
+    offsets: list[int] | None,
+    output_format: str,
+    today: date,
+) -> FileResult:
+    """Convert one file; failures are reported instead of raised."""
+    from backend.domain import FlightBatch
+    from backend.usecase.process_flight_data import (
+        iter_encoded,
+        process_flight_data,
+        process_flight_horizons,
+    )
+
+    start = time.perf_counter()
+    try:
+        # Archive files are read once: no cache, so only target dates
+        # are read and coerced
+        with input_path.open("rb") as f:
+            if offsets is None:
+                result = process_flight_data(f, mode, today)
+            else:
+                result = process_flight_horizons(f, offsets, today)
+        with output_path.open("wb") as out:
+            for chunk in iter_encoded(result, output_format):
+                out.write(chunk)
+    except Exception as exc:  # one bad file must not abort the batch
+        output_path.unlink(missing_ok=True)
+        return FileResult(
+            str(input_path),
+            str(output_path),
+            0,
+            time.perf_counter() - start,
+            f"{type(exc).__name__}: {exc}",
+        )
+    if isinstance(result, FlightBatch):
+        rows = len(result)
+    else:
+        rows = sum(len(batch) for batch in result.values())
+    return FileResult(
+        str(input_path), str(output_path), rows, time.perf_counter() - start
+    )
+
+
+Job = tuple[Path, Path]
+
+
+def run_jobs(
+    jobs: list[Job],
+    workers: int,
+    args: tuple[object, ...],
+    convert: Callable[..., FileResult] = convert_file,
+) -> tuple[list[FileResult], list[Job], list[Job]]:
+    """Convert ``jobs`` on a process pool, ``workers`` jobs at a time.
+
+    Returns the results, the jobs that were running when a worker died
+    (for instance out of memory) instead of raising, and the jobs not
+    started yet. Only running jobs can have killed the worker.
+    """
+    results: list[FileResult] = []
+    broken: list[Job] = []
+    todo = deque(jobs)
+    running: dict[Future[FileResult], Job] = {}
+    with ProcessPoolExecutor(workers) as pool:
+
+        def fill() -> None:
+            while todo and len(running) < workers and not broken:
+                job = todo.popleft()
+                try:
+                    future = pool.submit(convert, *job, *args)
+                except BrokenProcessPool:
+                    todo.appendleft(job)
+                    return
+                running[future] = job
+
+        fill()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                try:
+                    results.append(future.result())
+                except BrokenProcessPool:
+                    broken.append(job)
+                except Exception as exc:
+                    results.append(_failed(*job, exc))
+            fill()
+    return results, broken, list(todo)
+
+
+def convert_all(
+    jobs: list[Job],
+    workers: int,
+    args: tuple[object, ...],
+    convert: Callable[..., FileResult] = convert_file,
+) -> list[FileResult]:
+    """Convert every job, reporting a worker crash as that file's failure.
+
+    A dead worker breaks the whole pool, so the jobs it left are resubmitted
+    to a fresh pool of the same size. A job running when two pools broke is
+    retried alone, and reported as failed if it breaks that pool too.
+    """
+    results: list[FileResult] = []
+    strikes: Counter[Job] = Counter()
+    while jobs:
+        done, broken, not_started = run_jobs(jobs, workers, args, convert)
+        results.extend(done)
+        jobs = []
+        for job in broken:
+            strikes[job] += 1
+            if strikes[job] < 2:
+                jobs.append(job)
+                continue
+            retried, lost, _ = run_jobs([job], 1, args, convert)
+            results.extend(retried)
+            results.extend(
+                _failed(*lost_job, BrokenProcessPool("worker process died"))
+                for lost_job in lost
+            )
+        jobs.extend(not_started)
+    return results
+
+
+def _failed(
+    input_path: Path, output_path: Path, exc: BaseException
+) -> FileResult:
+    return FileResult(
+        str(input_path),
+        str(output_path),
+        0,
+        0.0,
+        f"{type(exc).__name__}: {exc}",
+    )
+
+
+def format_summary(results: list[FileResult], elapsed: float) -> str:
+    failures = [r for r in results if r.error is not None]
+    rows = sum(r.rows for r in results)
+    elapsed = max(elapsed, 1e-9)
+    lines = [
+        f"files: {len(results)} ok: {len(results) - len(failures)} "
+        f"failed: {len(failures)}",
+        f"rows: {rows} elapsed: {elapsed:.2f}s",
+        f"files/sec: {len(results) / elapsed:.2f} "
+        f"rows/sec: {rows / elapsed:.2f}",
+    ]
+    lines.extend(f"FAILED {r.input_path}: {r.error}" for r in failures)
+    return "\n".join(lines)
+
+
+def main(argv: list[str]) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.mode is None and not args.days:
+        parser.error("one of --mode or --days is required")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    try:
+        offsets = resolve_offsets(args.mode, args.days)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    inputs = expand_sources(args.sources)
+    if not inputs:
+        parser.error("no input files found")
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    outputs = output_paths(inputs, output_dir, f".{args.format}")
+
+    today = date.today()
+    start = time.perf_counter()
+    results = convert_all(
+        list(zip(inputs, outputs)),
+        min(args.workers, len(inputs)),
+        (args.mode, offsets, args.format, today),
+    )
+
+    results.sort(key=lambda r: r.input_path)
+    print(format_summary(results, time.perf_counter() - start))
+    return 1 if any(r.error for r in results) else 0
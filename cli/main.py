@@ -1,25 +1,62 @@
 import argparse
-import json
 import sys
+import time
+from contextlib import nullcontext
 from datetime import date
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
-from backend.usecase.process_flight_data import \
-    process_flight_data  # noqa: E402
+from backend.internal.infrastructure import (  # noqa: E402
+    StageProfile,
+    peak_rss_bytes,
+    profile,
+    stage,
+)
+from backend.usecase.offsets import resolve_offsets  # noqa: E402
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Parse XLS and output JSON")
-    parser.add_argument("--input", required=True, help="Path to .xls file")
+    if sys.argv[1:2] == ["batch"]:
+        from cli import batch
+
+        sys.exit(batch.main(sys.argv[2:]))
+    if sys.argv[1:2] == ["serve"]:
+        from cli import serve
+
+        sys.exit(serve.main(sys.argv[2:]))
+
+    parser = argparse.ArgumentParser(
+        description="Parse XLS and output JSON",
+        epilog=(
+            "Run 'main.py batch --help' to convert many files at once, "
+            "'main.py serve --help' for a warm JSON-RPC worker."
+        ),
+    )
+    parser.add_argument(
+        "--input", required=True, help="Path to .xls or .xlsx file"
+    )
     parser.add_argument("--output", required=True, help="Path to JSON output")
     parser.add_argument(
         "--mode",
-        required=True,
-        choices=["commandes", "precommandes"],
-        help="Filtering mode",
+        choices=["commandes", "precommandes", "all"],
+        help="Filtering mode; 'all' returns J+1 and J+2 from one parse",
+    )
+    parser.add_argument(
+        "--days",
+        help="Comma-separated day offsets, e.g. 1,2,3 (implies --mode all)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="Output format; rows are written to --output as they are encoded",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print wall/CPU time, rows per stage and peak RSS to stderr",
     )
     parser.add_argument(
         "--category",
@@ -27,15 +64,72 @@ def main() -> None:
         default="",
     )
     args = parser.parse_args()
+    if args.mode is None and not args.days:
+        parser.error("one of --mode or --days is required")
+    try:
+        offsets = resolve_offsets(args.mode, args.days)
+    except ValueError as exc:
+        parser.error(str(exc))
 
     input_path = Path(args.input)
     output_path = Path(args.output)
 
-    with input_path.open("rb") as f:
-        rows = process_flight_data(f, args.mode, date.today())
+    # Loads pandas; kept out of --help and argument validation
+    from backend.usecase.process_flight_data import (
+        iter_encoded,
+        process_flight_data,
+        process_flight_horizons,
+    )
+
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    with profile() if args.profile else nullcontext() as collected:
+        # A one-shot run never hits a cache; without one only the target
+        # dates are read and coerced
+        with input_path.open("rb") as f:
+            if offsets is None:
+                result = process_flight_data(f, args.mode, date.today())
+            else:
+                result = process_flight_horizons(f, offsets, date.today())
+
+        with stage("write"), output_path.open("wb") as out:
+            for chunk in iter_encoded(result, args.format):
+                out.write(chunk)
 
-    payload = [r.model_dump(mode="json") for r in rows]
-    output_path.write_text(json.dumps(payload, ensure_ascii=False))
+    if collected is not None:
+        print(
+            format_profile(
+                collected,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+                peak_rss_bytes(),
+            ),
+            file=sys.stderr,
+        )
+
+
+def format_profile(
+    collected: StageProfile,
+    wall_s: float,
+    cpu_s: float,
+    peak_rss: int | None,
+) -> str:
+    lines = [f"{'stage':<10} {'wall ms':>10} {'cpu ms':>10} {'rows':>9}"]
+    for timing in collected.stages:
+        rows = "-" if timing.rows is None else str(timing.rows)
+        lines.append(
+            f"{timing.name:<10} {timing.wall_s * 1000:>10.1f} "
+            f"{timing.cpu_s * 1000:>10.1f} {rows:>9}"
+        )
+    lines.append(
+        f"{'total':<10} {wall_s * 1000:>10.1f} {cpu_s * 1000:>10.1f}"
+    )
+    lines.extend(
+        f"{name}: {value}" for name, value in collected.counters.items()
+    )
+    if peak_rss is not None:
+        lines.append(f"peak RSS: {peak_rss / (1 << 20):.1f} MiB")
+    return "\n".join(lines)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,376 @@
+"""Long-lived worker answering JSON-RPC 2.0 requests with pandas loaded.
+
+Requests and responses are single-line JSON objects, over stdin/stdout
+by default or over a Unix socket with ``--socket``. Methods:
+
+``process``
+    ``{"path": str}`` or ``{"data": base64}``, plus ``mode``
+    (commandes, precommandes or all), optional ``days`` ("1,2,3"),
+    ``date`` (ISO, defaults to today) and ``output``. Without ``output``
+    the result is the JSON body ``/process`` would return; with it the
+    rows are written to that file and the result is
+    ``{"output": path, "rows": n}``.
+``ping``
+    Worker status: pid, uptime, requests served and peak RSS.
+``shutdown``
+    Reply, then exit.
+
+The worker exits after ``--idle-timeout`` seconds without a request, and
+recycles itself (exits after replying) once its peak RSS exceeds
+``--max-rss-mb``. Both are announced with a ``recycling`` notification
+so the parent can start a fresh worker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import binascii
+import json
+import os
+import queue
+import select
+import socket
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from backend.internal.infrastructure import peak_rss_bytes
+from backend.usecase.offsets import resolve_offsets
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Server-defined: the schedule itself could not be processed
+PROCESSING_ERROR = -32000
+
+MODES = ("commandes", "precommandes", "all")
+
+
+class RpcError(Exception):
+    """Error reported to the client as a JSON-RPC error object."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+@dataclass
+class WorkerState:
+    """Counters and limits of one worker process."""
+
+    max_rss_bytes: int
+    started: float = field(default_factory=time.monotonic)
+    requests: int = 0
+    stop_reason: str | None = None
+
+
+def handle_line(line: bytes, state: WorkerState) -> bytes | None:
+    """Answer one request line; notifications get no response."""
+    request_id: Any = None
+    notification = False
+    try:
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            raise RpcError(PARSE_ERROR, "Parse error") from exc
+        if not isinstance(request, dict) or not isinstance(
+            request.get("method"), str
+        ):
+            raise RpcError(INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        notification = "id" not in request
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            raise RpcError(INVALID_PARAMS, "params must be an object")
+        result = dispatch(request["method"], params, state)
+    except RpcError as exc:
+        response = _error(request_id, exc.code, exc.message)
+        return None if notification else response
+    except Exception as exc:  # keep serving after unexpected failures
+        response = _error(
+            request_id, INTERNAL_ERROR, f"{type(exc).__name__}: {exc}"
+        )
+        return None if notification else response
+    finally:
+        state.requests += 1
+        peak = peak_rss_bytes()
+        if peak is not None and peak > state.max_rss_bytes:
+            state.stop_reason = state.stop_reason or "memory"
+
+    if notification:
+        return None
+    return (
+        b'{"jsonrpc":"2.0","id":'
+        + json.dumps(request_id).encode()
+        + b',"result":'
+        + result
+        + b"}\n"
+    )
+
+
+def dispatch(
+    method: str, params: dict[str, Any], state: WorkerState
+) -> bytes:
+    """Run ``method`` and return its result already encoded as JSON."""
+    if method == "process":
+        return process(params)
+    if method == "ping":
+        return json.dumps(
+            {
+                "pid": os.getpid(),
+                "uptime_s": round(time.monotonic() - state.started, 3),
+                "requests": state.requests,
+                "peak_rss_bytes": peak_rss_bytes(),
+            }
+        ).encode()
+    if method == "shutdown":
+        state.stop_reason = "shutdown"
+        return b"null"
+    raise RpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+
+def process(params: dict[str, Any]) -> bytes:
+    from backend.usecase.process_flight_data import (
+        iter_encoded,
+        process_upload,
+        process_upload_batches,
+    )
+
+    mode = params.get("mode")
+    if mode not in MODES and not params.get("days"):
+        raise RpcError(INVALID_PARAMS, f"mode must be one of {MODES}")
+    try:
+        offsets = resolve_offsets(mode, params.get("days"))
+        day = params.get("date")
+        today = date.fromisoformat(day) if day else date.today()
+    except (TypeError, ValueError) as exc:
+        raise RpcError(INVALID_PARAMS, str(exc)) from exc
+    data = _upload(params)
+
+    try:
+        output = params.get("output")
+        if output is None:
+            return process_upload(data, mode, offsets, today)
+        result = process_upload_batches(data, mode, offsets, today)
+        with open(output, "wb") as out:
+            for chunk in iter_encoded(result, "json"):
+                out.write(chunk)
+    except ValueError as exc:
+        raise RpcError(PROCESSING_ERROR, str(exc)) from exc
+    except OSError as exc:
+        raise RpcError(
+            PROCESSING_ERROR, f"Cannot write output: {exc}"
+        ) from exc
+    rows = (
+        sum(len(batch) for batch in result.values())
+        if isinstance(result, dict)
+        else len(result)
+    )
+    return json.dumps({"output": output, "rows": rows}).encode()
+
+
+def _upload(params: dict[str, Any]) -> bytes:
+    if "path" in params:
+        try:
+            return Path(params["path"]).read_bytes()
+        except (OSError, TypeError) as exc:
+            raise RpcError(
+                INVALID_PARAMS, f"Cannot read input: {exc}"
+            ) from exc
+    if "data" in params:
+        try:
+            return base64.b64decode(params["data"], validate=True)
+        except (binascii.Error, TypeError) as exc:
+            raise RpcError(INVALID_PARAMS, "data must be base64") from exc
+    raise RpcError(INVALID_PARAMS, "path or data is required")
+
+
+def _error(request_id: Any, code: int, message: str) -> bytes:
+    return (
+        json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {"code": code, "message": message},
+            }
+        ).encode()
+        + b"\n"
+    )
+
+
+def _notification(method: str, **params: Any) -> bytes:
+    return (
+        json.dumps({"jsonrpc": "2.0", "method": method, "params": params})
+        .encode()
+        + b"\n"
+    )
+
+
+class LineChannel:
+    """Newline-framed reads with an idle timeout over a file descriptor."""
+
+    def __init__(self, fileno: int, read: Callable[[int], bytes]) -> None:
+        self.fileno = fileno
+        self._read = read
+        self._buffer = b""
+
+    def read_line(self, timeout: float | None) -> bytes | None:
+        """Return the next line, ``b""`` at end of input, ``None`` if idle."""
+        while b"\n" not in self._buffer:
+            ready, _, _ = select.select([self.fileno], [], [], timeout)
+            if not ready:
+                return None
+            chunk = self._read(1 << 16)
+            if not chunk:
+                line, self._buffer = self._buffer, b""
+                return line
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line + b"\n"
+
+
+class QueuedLineChannel:
+    """Lines read by a background thread, handed over through a queue.
+
+    Pipes cannot be polled with ``select`` on Windows, so stdin is read
+    by a daemon thread and the idle timeout is a timed ``queue.get``.
+    The thread reads the raw descriptor: a daemon thread blocked inside
+    a buffered reader would abort interpreter shutdown.
+    """
+
+    def __init__(self, read: Callable[[int], bytes]) -> None:
+        self._lines: queue.Queue[bytes] = queue.Queue()
+        threading.Thread(
+            target=self._pump, args=(read,), daemon=True
+        ).start()
+
+    def _pump(self, read: Callable[[int], bytes]) -> None:
+        buffer = b""
+        while chunk := read(1 << 16):
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                self._lines.put(line + b"\n")
+        if buffer:
+            self._lines.put(buffer)
+        self._lines.put(b"")
+
+    def read_line(self, timeout: float | None) -> bytes | None:
+        """Return the next line, ``b""`` at end of input, ``None`` if idle."""
+        try:
+            return self._lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def serve(
+    channel: LineChannel | QueuedLineChannel,
+    write: Callable[[bytes], None],
+    state: WorkerState,
+    idle_timeout: float | None,
+) -> str:
+    """Answer requests from ``channel`` until EOF, idle or a stop reason."""
+    while state.stop_reason is None:
+        line = channel.read_line(idle_timeout)
+        if line is None:
+            return "idle"
+        if not line:
+            return "eof"
+        if not line.strip():
+            continue
+        response = handle_line(line, state)
+        if response is not None:
+            write(response)
+    return state.stop_reason
+
+
+def serve_stdio(state: WorkerState, idle_timeout: float | None) -> None:
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
+    def write(payload: bytes) -> None:
+        stdout.write(payload)
+        stdout.flush()
+
+    write(_notification("ready", pid=os.getpid()))
+    channel = QueuedLineChannel(
+        lambda size: os.read(stdin.fileno(), size)
+    )
+    reason = serve(channel, write, state, idle_timeout)
+    if reason in ("idle", "memory"):
+        write(_notification("recycling", reason=reason))
+
+
+def serve_socket(
+    path: str, state: WorkerState, idle_timeout: float | None
+) -> None:
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+        server.listen()
+        print(f"listening on {path}", file=sys.stderr, flush=True)
+        while state.stop_reason is None:
+            ready, _, _ = select.select([server], [], [], idle_timeout)
+            if not ready:
+                state.stop_reason = "idle"
+                break
+            conn, _ = server.accept()
+            with conn:
+                channel = LineChannel(conn.fileno(), conn.recv)
+                reason = serve(channel, conn.sendall, state, idle_timeout)
+                if reason in ("idle", "memory"):
+                    state.stop_reason = reason
+                    conn.sendall(_notification("recycling", reason=reason))
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py serve",
+        description="Warm worker answering JSON-RPC process requests",
+    )
+    parser.add_argument(
+        "--socket", help="Listen on this Unix socket instead of stdin/stdout"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=300.0,
+        help="Exit after this many seconds without a request (0: never)",
+    )
+    parser.add_argument(
+        "--max-rss-mb",
+        type=int,
+        default=1024,
+        help="Recycle once peak memory exceeds this many MiB",
+    )
+    return parser
+
+
+def main(argv: list[str]) -> int:
+    args = build_parser().parse_args(argv)
+    state = WorkerState(max_rss_bytes=args.max_rss_mb << 20)
+    idle_timeout = args.idle_timeout or None
+
+    # Pay pandas and pydantic imports before the first request arrives
+    import backend.usecase.process_flight_data  # noqa: F401
+
+    if args.socket:
+        serve_socket(args.socket, state, idle_timeout)
+    else:
+        serve_stdio(state, idle_timeout)
+    return 0